@@ -0,0 +1,107 @@
+"""Cache of final answers for repeated weather questions.
+
+An answer is reused when the same question (after normalizing case,
+punctuation and spacing) resolves to the same tool calls for the same places
+and local dates, and the forecasts and observations behind it have the same
+``updateTime`` and ``timestamp``. Relative dates are resolved in the
+forecast's timezone, so "tomorrow" asked on two days keys apart, and a new
+NWS forecast or observation changes the key, so a stale answer is never
+served for fresher data; entries also expire after ``ANSWER_CACHE_TTL``
+seconds and the least recently used are evicted past ``ANSWER_CACHE_SIZE``.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from mcp_nws.cache import MISSING, LRUCache
+from mcp_nws.periods import PeriodIndex, resolve_range
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "900"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_question(text):
+    return " ".join(_PUNCTUATION.sub(" ", (text or "").lower()).split())
+
+
+def _place(args, result):
+    """Resolved coordinates when the result has them, else the normalized argument text."""
+    lat, lon = result.get("lat"), result.get("lon")
+    if isinstance(lat, (int, float)) and isinstance(lon, (int, float)) and (lat or lon):
+        return [round(lat, 2), round(lon, 2)]
+    return normalize_question(args.get("location") or f"{args.get('lat')},{args.get('lon')}")
+
+
+def _dates(args, forecast):
+    """The local dates a call asked for, or its normalized date text when they can't be resolved."""
+    text = str(args.get("date") or "")
+    try:
+        days = int(args["days"]) if args.get("days") else None
+    except (TypeError, ValueError):
+        days = None
+    # A throwaway index: the forecast is a per-call copy, so it must not enter the shared index cache
+    dates = resolve_range(text or None, days, PeriodIndex(forecast.get("periods") or []).today())
+    if dates is None:
+        return [normalize_question(text), str(args.get("days") or "")]
+    return [day.isoformat() for day in dates]
+
+
+def answer_key(question, calls, results):
+    """Cache key for an answer, or None when any result is an error or has no forecast time."""
+    parts = []
+    for args, result in zip(calls, results):
+        if not isinstance(result, dict) or result.get("status") == "error":
+            return None
+        forecast = result.get("forecast") or {}
+        update_time = forecast.get("updateTime")
+        if not update_time:
+            return None
+        parts.append([
+            _place(args, result),
+            _dates(args, forecast),
+            str(args.get("daypart") or "").lower(),
+            update_time,
+            (result.get("current") or {}).get("timestamp") or "",
+        ])
+    if not parts:
+        return None
+    raw = json.dumps([normalize_question(question), sorted(parts)], separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class AnswerCache:
+    """Thread-safe LRU/TTL answer store with hit-rate counters."""
+
+    def __init__(self, maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            answer = self._cache.get(key)
+        return None if answer is MISSING else answer
+
+    def set(self, key, answer):
+        with self._lock:
+            self._cache.set(key, answer)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = self._cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+answer_cache = AnswerCache()
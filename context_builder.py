@@ -0,0 +1,179 @@
+"""Prompt context for the LLM node, kept within a token budget.
+
+Weather tool results are condensed into short text digests (a few lines per
+location instead of the raw NWS JSON), identical messages are sent once, and
+the conversation history is trimmed from the oldest end to fit
+``CONTEXT_TOKEN_BUDGET``, with the dropped user questions folded into one
+short recap line. Token counts come from ``estimate_tokens``, a local
+approximation of a BPE tokenizer that needs no model download.
+"""
+import logging
+import os
+import re
+
+from mcp_nws.views import compact_current, compact_period
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MAX_PERIODS = int(os.environ.get("CONTEXT_MAX_PERIODS", "8"))
+# Chat template tokens around each message (role markers, separators)
+MESSAGE_OVERHEAD = 4
+RECAP_QUESTION_CHARS = 80
+# Share of the budget held back for the recap line when history has to be trimmed
+RECAP_SHARE = 0.1
+
+# Word pieces of up to four characters, or single punctuation marks: close to
+# what BPE tokenizers produce for English text and JSON-ish data
+_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Approximate token count of ``text``."""
+    return len(_TOKEN.findall(text or ""))
+
+
+def message_tokens(message):
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+
+
+def _place(result):
+    city = result.get("resolved_city") or ""
+    state = result.get("resolved_state") or ""
+    name = ", ".join(part for part in (city, state) if part) or result.get("location") or "the requested location"
+    lat, lon = result.get("lat"), result.get("lon")
+    if isinstance(lat, (int, float)) and isinstance(lon, (int, float)) and (lat or lon):
+        return f"{name} ({lat:.2f},{lon:.2f})"
+    return name
+
+
+def _current_line(current):
+    now = compact_current(current)
+    parts = [now.get("description")]
+    if now.get("temperature") is not None:
+        parts.append(f"{now['temperature']}F")
+    if now.get("humidity") is not None:
+        parts.append(f"humidity {round(now['humidity'])}%")
+    if now.get("wind_speed") is not None:
+        direction = f" from {round(now['wind_direction'])} deg" if now.get("wind_direction") is not None else ""
+        parts.append(f"wind {now['wind_speed']} mph{direction}")
+    parts = [p for p in parts if p]
+    return "Now: " + ", ".join(parts) if parts else ""
+
+
+def _period_line(period):
+    p = compact_period(period)
+    parts = [f"{p['temperature']}{period.get('temperatureUnit', 'F')}" if p.get("temperature") is not None else None]
+    if p.get("precipitation") is not None:
+        parts.append(f"{p['precipitation']}% precip")
+    parts.append(p.get("shortForecast"))
+    if p.get("wind"):
+        parts.append(f"wind {p['wind']}")
+    return f"- {p.get('name') or p.get('startTime')}: " + ", ".join(x for x in parts if x)
+
+
+def weather_digest(result):
+    """A few lines of text with what the model needs from one get_weather result."""
+    if not isinstance(result, dict):
+        return f"Weather data: {result}"
+    place = _place(result)
+    if result.get("status") == "error":
+        return f"Weather lookup for {place} failed: {result.get('message') or 'unknown error'}"
+    lines = [f"Weather for {place}:"]
+    current_line = _current_line(result.get("current") or {})
+    if current_line:
+        lines.append(current_line)
+    forecast = result.get("forecast") or {}
+    periods = forecast.get("periods") or []
+    if periods:
+        updated = f" (updated {forecast['updateTime']})" if forecast.get("updateTime") else ""
+        lines.append(f"Forecast{updated}:")
+        lines.extend(_period_line(p) for p in periods[:CONTEXT_MAX_PERIODS])
+        if len(periods) > CONTEXT_MAX_PERIODS:
+            lines.append(f"- ... {len(periods) - CONTEXT_MAX_PERIODS} later periods omitted")
+    if result.get("message"):
+        lines.append(f"Note: {result['message']}")
+    return "\n".join(lines)
+
+
+def weather_context(results):
+    """One context message body for one or several get_weather results."""
+    if not isinstance(results, list):
+        return weather_digest(results)
+    return "\n\n".join(weather_digest(r) for r in results)
+
+
+def _dedupe(messages):
+    """Drop repeated identical messages, keeping the latest copy of each."""
+    seen = set()
+    kept = []
+    for message in reversed(messages):
+        key = (message["role"], message["content"])
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+def _recap(dropped, remaining):
+    """One system line with the latest dropped user questions that fit in ``remaining`` tokens."""
+    prefix = "Earlier in this conversation the user asked: "
+    remaining -= estimate_tokens(prefix) + MESSAGE_OVERHEAD
+    questions = []
+    for message in reversed(dropped):
+        if message["role"] != "user":
+            continue
+        question = " ".join(message["content"].split())
+        if len(question) > RECAP_QUESTION_CHARS:
+            question = question[:RECAP_QUESTION_CHARS - 3] + "..."
+        cost = estimate_tokens(question) + 1
+        if cost > remaining:
+            break
+        questions.append(question)
+        remaining -= cost
+    if not questions:
+        return None
+    return {"role": "system", "content": prefix + "; ".join(reversed(questions))}
+
+
+def build_context(system_prompt, history, weather_result=None, budget=None):
+    """Ollama messages for one LLM call: system prompt plus as much recent history as fits ``budget``.
+
+    ``weather_result`` is added as a digest unless the history already
+    carries it. The system prompt and the newest message are always kept.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    history = [
+        {"role": m["role"], "content": m["content"]}
+        for m in history
+        if isinstance(m, dict) and "role" in m and "content" in m
+    ]
+    if weather_result:
+        history.append({"role": "system", "content": weather_context(weather_result)})
+    history = _dedupe(history)
+
+    system = {"role": "system", "content": system_prompt}
+    remaining = budget - message_tokens(system)
+    reserve = 0
+    if sum(message_tokens(m) for m in history) > remaining:
+        reserve = int(budget * RECAP_SHARE)
+        remaining -= reserve
+    kept = []
+    for message in reversed(history):
+        cost = message_tokens(message)
+        if kept and cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+    dropped = history[:len(history) - len(kept)]
+    messages = [system]
+    if dropped:
+        recap = _recap(dropped, remaining + reserve)
+        if recap:
+            messages.append(recap)
+        logger.debug("context: dropped %d older messages", len(dropped))
+    messages.extend(kept)
+    return messages
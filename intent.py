@@ -0,0 +1,177 @@
+"""Rule-based extraction of weather tool calls from common question shapes.
+
+Questions such as "weather in Boston", "forecast for Denver on Monday",
+"will it rain in 02139 tomorrow" or "weather at 42.36, -71.06 tonight" map
+directly to one ``get_weather`` call, so the graph can go straight to the
+tool without asking the LLM to write ``<<CALL_WEATHER ...>>``. Anything less
+clear-cut (several places, relative dates we don't resolve, no weather
+wording, a place that is neither 'City, ST' nor confirmed by the gazetteer)
+gets a low confidence and is left to the LLM.
+"""
+import calendar
+import os
+import re
+from datetime import date, timedelta
+
+from mcp_nws.gazetteer import get_gazetteer
+from mcp_nws.locations import state_abbreviation
+
+INTENT_MIN_CONFIDENCE = float(os.environ.get("INTENT_MIN_CONFIDENCE", "0.8"))
+
+_WEEKDAYS = [name.lower() for name in calendar.day_name]
+_WEATHER = re.compile(
+    r"\b(weather|forecast|temperature|temp|rain\w*|snow\w*|storm\w*|wind\w*|sunny|cloudy|hot|cold|warm|"
+    r"humid\w*|umbrella|jacket|precipitation)\b"
+)
+# Words that point at something the rules don't handle
+_COMPLEX = re.compile(
+    r"\b(and|or|vs|versus|compare\w*|between|than|week|month|days|hours?|weeks|ago|yesterday|last|"
+    r"climate|average|record|history|historical|alerts?|why|how come)\b"
+)
+# (pattern, date, days); a None date is taken from the match
+_DATES = [
+    (re.compile(r"\b(\d{4}-\d{2}-\d{2})\b"), None, None),
+    (re.compile(r"\b(?:on |this )?(" + "|".join(_WEEKDAYS) + r")\b"), None, None),
+    (re.compile(r"\btomorrow\b"), "tomorrow", None),
+    (re.compile(r"\b(?:this )?weekend\b"), "saturday", 2),
+    (re.compile(r"\b(?:today|tonight|right now|now|currently|morning|afternoon|evening|night)\b"), "today", None),
+]
+_NEXT_WEEKDAY = re.compile(r"\bnext (" + "|".join(_WEEKDAYS) + r")\b")
+_DAYPARTS = [
+    (re.compile(r"\b(?:tonight|night|overnight|evening)\b"), "night"),
+    (re.compile(r"\b(?:morning|afternoon|daytime)\b"), "day"),
+]
+_COORDS = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9.'-]*|[,?!;]")
+# Words that introduce a place, and words that end one: dates, times of day,
+# other prepositions and filler
+_PREPOSITIONS = {"in", "for", "at", "near", "around"}
+_TIME_WORDS = {"today", "tonight", "tomorrow", "weekend", "now", "currently", "morning", "afternoon", "evening",
+               "night", "overnight", "noon", "midnight", "daytime"} | set(_WEEKDAYS)
+_STOP_WORDS = _PREPOSITIONS | _TIME_WORDS | {
+    "on", "during", "over", "this", "next", "right", "please", "thanks", "thank", "like", "be", "look",
+    "looking", "going", "gonna", "will", "would", "should", "is", "so", "too", "?", "!", ";",
+}
+# A phrase starting with one of these names no particular place ("the beach", "my area", "near me")
+_DETERMINERS = {"the", "my", "our", "your", "their", "his", "her", "this", "that", "a", "an", "some",
+                "me", "you", "us", "them", "him", "it", "here", "there", "home", "work", "school", "office",
+                "college", "church", "camp", "downtown", "outside"}
+_NOT_PLACES = {"general", "town", "spring", "summer", "fall", "autumn", "winter"}
+
+
+class Intent:
+    def __init__(self, calls, confidence, reason=""):
+        self.calls = calls
+        self.confidence = confidence
+        self.reason = reason
+
+    @property
+    def confident(self):
+        return bool(self.calls) and self.confidence >= INTENT_MIN_CONFIDENCE
+
+    def __repr__(self):
+        return f"Intent(calls={self.calls!r}, confidence={self.confidence}, reason={self.reason!r})"
+
+
+def _date(text, today=None):
+    """Date arguments for the date and daypart phrases in ``text`` (none when it names neither)."""
+    args = {}
+    match = _NEXT_WEEKDAY.search(text)
+    if match:
+        # "next monday" is the one after the monday the server would pick
+        today = today or date.today()
+        ahead = (_WEEKDAYS.index(match.group(1)) - today.weekday()) % 7
+        args["date"] = (today + timedelta(days=ahead + 7)).isoformat()
+    else:
+        for pattern, value, days in _DATES:
+            match = pattern.search(text)
+            if match:
+                args["date"] = value or match.group(1)
+                if days:
+                    args["days"] = str(days)
+                break
+    for pattern, daypart in _DAYPARTS:
+        if pattern.search(text):
+            args["daypart"] = daypart
+            break
+    return args
+
+
+def _places(text):
+    """Word lists of the phrases after 'in'/'for'/'at'/..., cut at the first date, time or filler word."""
+    tokens = _TOKEN.findall(text)
+    places = []
+    for i, token in enumerate(tokens):
+        if token not in _PREPOSITIONS:
+            continue
+        words = []
+        for word in tokens[i + 1:]:
+            if word in _STOP_WORDS:
+                break
+            words.append(word)
+        while words and words[-1] == ",":
+            words.pop()
+        if words:
+            words[-1] = words[-1].rstrip(".")
+        if not words or words[0] in _DETERMINERS or words[0][0].isdigit() or " ".join(words) in _NOT_PLACES:
+            continue
+        places.append(words)
+    return places
+
+
+def _place(words):
+    """(location text, confidence) for a place phrase: 'City, ST' when it ends with a state."""
+    if "," in words:
+        comma = words.index(",")
+        name, state = words[:comma], state_abbreviation(" ".join(w for w in words[comma + 1:] if w != ","))
+    elif len(words) > 1 and state_abbreviation(words[-1]):
+        name, state = words[:-1], state_abbreviation(words[-1])
+    else:
+        name, state = words, ""
+    location = " ".join(name).title() + (f", {state}" if state else "")
+    # A lone state name or code ("LA", "me") is not a city
+    if not name or (not state and len(name) == 1 and state_abbreviation(name[0])):
+        return location, 0.0
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        return location, 0.95 if gazetteer.exact(location) else 0.5
+    # Without a gazetteer only 'City, ST' is trusted; a bare name may be anything
+    return location, 0.9 if state else 0.6
+
+
+def _location(text):
+    """(location args, confidence) for the place the question names, or ({}, 0)."""
+    coords = _COORDS.findall(text)
+    if len(coords) == 1:
+        lat, lon = coords[0]
+        if -90 <= float(lat) <= 90 and -180 <= float(lon) <= 180:
+            return {"lat": lat, "lon": lon}, 1.0
+        return {}, 0.0
+    zips = _ZIP.findall(text)
+    if len(zips) == 1 and not coords:
+        return {"location": zips[0]}, 1.0
+    places = _places(text)
+    if len(places) != 1 or coords or zips:
+        return {}, 0.0
+    location, confidence = _place(places[0])
+    return {"location": location}, confidence
+
+
+def extract_intent(question, today=None):
+    """Tool calls for ``question`` and how sure the rules are about them (0..1).
+
+    ``today`` (default: the local date) anchors "next <weekday>".
+    """
+    text = " ".join((question or "").lower().split())
+    if not text:
+        return Intent([], 0.0, "empty")
+    if not _WEATHER.search(text):
+        return Intent([], 0.0, "no weather wording")
+    if _COMPLEX.search(text):
+        return Intent([], 0.2, "needs the LLM")
+    args, confidence = _location(text)
+    if not args:
+        return Intent([], 0.3, "no single place")
+    args.update(_date(text, today))
+    return Intent([args], confidence, "rules")
@@ -1,37 +1,84 @@
+import logging
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from answer_cache import answer_cache, answer_key
+from context_builder import build_context, estimate_tokens, weather_context
+from intent import extract_intent
 from ollama_llm_node import ollama_llm_node
 from weather_tools import get_weather
 
+logger = logging.getLogger(__name__)
+
+WEATHER_TOOL_CONCURRENCY = int(os.environ.get("WEATHER_TOOL_CONCURRENCY", "4"))
+# Stream chat completions and forward tokens to graph.stream(stream_mode="custom")
+LLM_STREAM = os.environ.get("LLM_STREAM", "1") != "0"
+# Answer common question shapes without the LLM writing the tool call (INTENT_FAST_PATH=0 to disable)
+INTENT_FAST_PATH = os.environ.get("INTENT_FAST_PATH", "1") != "0"
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.2:latest")
+# How long Ollama keeps the model loaded after a call (Ollama's own default is 5m)
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+_CALL = re.compile(r"<<CALL_WEATHER(.*?)>>")
+_ARG = re.compile(r"(\w+)=([^\s>]+)")
+
+
+def parse_tool_calls(output):
+    """All distinct <<CALL_WEATHER key=value ...>> calls in an LLM turn, in order."""
+    calls = []
+    for args_str in _CALL.findall(output):
+        # Find all key=value pairs, allowing for spaces
+        args = dict(_ARG.findall(args_str))
+        if args not in calls:
+            calls.append(args)
+    return calls
+
+
+def intent_router_node(state):
+    """
+    Entry node: when the rules in ``intent`` recognize the question with enough
+    confidence, sets 'tool_calls'/'tool_args' and routes straight to
+    'get_weather', skipping the LLM call that would only write the tool call.
+    Otherwise routes to 'llm'.
+    """
+    state = dict(state)
+    intent = extract_intent(state.get("input", "")) if INTENT_FAST_PATH else None
+    if intent is not None and intent.confident:
+        state["tool_calls"] = intent.calls
+        state["tool_args"] = intent.calls[0]
+        state["tool_call"] = True
+        state["next"] = "get_weather"
+        logger.info("intent fast path: %s (confidence %.2f)", intent.calls, intent.confidence)
+    else:
+        state["next"] = "llm"
+        logger.debug("intent: to the LLM %s", intent)
+    return state
+
+
 def llm_router_node(state):
     """
-    Decides if the LLM output indicates a tool call. If so, routes to 'get_weather'.
+    Decides if the LLM output indicates tool calls. If so, routes to 'get_weather'.
     Otherwise, routes to END.
     Expects state with 'output' from LLM.
-    Adds 'tool_args' to state if tool should be called.
+    Adds 'tool_calls' (every call in the turn) and 'tool_args' (the first) to state.
     """
-    import re
     output = state.get("output", "")
-    print("[DEBUG] LLM output in router:", output)
-    # Match the tool call and extract all key=value pairs
-    match = re.search(r"<<CALL_WEATHER(.*?)>>", output)
-    tool_args = {}
-    if match:
-        args_str = match.group(1)
-        # Find all key=value pairs, allowing for spaces
-        for key, value in re.findall(r"(\w+)=([^\s>]+)", args_str):
-            tool_args[key] = value
-        state = dict(state)
-        state["tool_args"] = tool_args
+    logger.debug("router input: %d chars", len(output))
+    tool_calls = parse_tool_calls(output)
+    state = dict(state)
+    if tool_calls:
+        state["tool_calls"] = tool_calls
+        state["tool_args"] = tool_calls[0]
         state["tool_call"] = True
         state["next"] = "get_weather"
-        print("[DEBUG] llm_router_node return state:", state)
-        return state
+        logger.debug("router: %d tool call(s) %s", len(tool_calls), tool_calls)
     else:
-        state = dict(state)
         state["tool_call"] = False
         state["next"] = "END"
-        print("[DEBUG] llm_router_node return state:", state)
-        return state
+        logger.debug("router: final answer")
+    return state
 
 import ollama
 from weather_tools import get_weather
@@ -48,42 +95,180 @@ You are WeatherBot, a helpful assistant specializing in US weather information.
 - To call the weather tool, output ONLY the following format, including all relevant parameters (such as location, lat, lon, and date):
   <<CALL_WEATHER location=Boston date=tomorrow>>
   <<CALL_WEATHER lat=42.36 lon=-71.06 date=Monday>>
+- To compare several locations or dates, output one CALL_WEATHER line per location in the same reply; all calls are run together.
 - Do NOT answer weather questions directly or guess. Only answer after receiving the tool result.
 - If the user asks a non-weather question, politely redirect them to ask about the weather.
 You should always answer in the same language as the user's ask.
 """
 
+_client = None
+_client_lock = threading.Lock()
+
+
+def ollama_client():
+    """Process-wide Ollama client (one HTTP connection pool; honours OLLAMA_HOST)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ollama.Client()
+    return _client
+
+
+def warm_up_model():
+    """Load the model into Ollama's memory ahead of the first question.
+
+    An empty prompt only loads the model; ``keep_alive`` keeps it resident.
+    Returns the seconds it took.
+    """
+    start = time.perf_counter()
+    ollama_client().generate(model=OLLAMA_MODEL, prompt="", keep_alive=OLLAMA_KEEP_ALIVE)
+    elapsed = time.perf_counter() - start
+    logger.info("llm warm-up: %s loaded in %.0f ms", OLLAMA_MODEL, elapsed * 1000)
+    return elapsed
+
+
+class ToolMarkupFilter:
+    """Passes streamed text through while holding back <<CALL_WEATHER ...>> markup.
+
+    Text that could still turn into a tool call (a trailing '<', '<<CALL', ...)
+    is held until the next chunk decides it. A turn that opens with a tool
+    call is not an answer, so none of it is passed through; leading
+    whitespace is held until the turn's first text decides which it is.
+    """
+    TAG = "<<CALL_WEATHER"
+
+    def __init__(self):
+        self.pending = ""
+        self.in_call = False
+        self.lead = ""
+        self.started = False
+        self.silent = False
+
+    def feed(self, text):
+        self.pending += text
+        out = []
+        while self.pending:
+            if self.in_call:
+                end = self.pending.find(">>")
+                if end < 0:
+                    # Drop the call's arguments, keeping a '>' that may start the closing '>>'
+                    self.pending = self.pending[-1:] if self.pending.endswith(">") else ""
+                    break
+                self.pending = self.pending[end + 2:]
+                self.in_call = False
+                continue
+            start = self.pending.find("<")
+            if start < 0:
+                out.append(self.pending)
+                self.pending = ""
+                break
+            out.append(self.pending[:start])
+            self.pending = self.pending[start:]
+            if self.pending.startswith(self.TAG):
+                self.pending = self.pending[len(self.TAG):]
+                self.in_call = True
+                if not self.started and not (self.lead + "".join(out)).strip():
+                    self.silent = True
+            elif self.TAG.startswith(self.pending):
+                break
+            else:
+                out.append(self.pending[0])
+                self.pending = self.pending[1:]
+        if self.silent:
+            return ""
+        text = "".join(out)
+        if not self.started:
+            text = self.lead + text
+            if not text.strip():
+                self.lead = text
+                return ""
+            self.started = True
+            self.lead = ""
+        return text
+
+    def flush(self):
+        rest = "" if self.in_call or self.silent else self.lead + self.pending
+        self.pending = self.lead = ""
+        return rest
+
+
+def _stream_writer():
+    """The graph's custom stream writer, or None when not running inside a graph."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except (ImportError, RuntimeError):
+        return None
+
+
+def _stream_chat(ollama_messages, writer, start):
+    """Stream a chat completion, forwarding answer tokens (not tool calls) to ``writer``.
+
+    Returns (full output, seconds to the first token or None, the text forwarded).
+    """
+    parts = []
+    shown = []
+    first_token = None
+    markup = ToolMarkupFilter()
+    stream = ollama_client().chat(model=OLLAMA_MODEL, messages=ollama_messages, stream=True, keep_alive=OLLAMA_KEEP_ALIVE)
+    for chunk in stream:
+        piece = chunk["message"]["content"]
+        if not piece:
+            continue
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        parts.append(piece)
+        text = markup.feed(piece)
+        if text:
+            shown.append(text)
+            writer({"token": text})
+    text = markup.flush()
+    if text:
+        shown.append(text)
+        writer({"token": text})
+    return "".join(parts), first_token, "".join(shown)
+
 def ollama_llm_node(state):
-    print("[DEBUG] ollama_llm_node called", flush=True)
     # Prefer multi-turn chat if available
     messages = state.get("messages")
     system_prompt = state.get("system_prompt")
     if not system_prompt:
         system_prompt = get_dynamic_system_prompt()
-    # Build the message list for Ollama
-    ollama_messages = []
-    ollama_messages.append({"role": "system", "content": system_prompt})
-    # If prior messages (multi-turn), add them; else, just use current input
+    # Multi-turn chat if available, else just the current input
     if messages and isinstance(messages, list):
-        for msg in messages:
-            # Ensure each message is a dict with role/content
-            if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                ollama_messages.append({"role": msg["role"], "content": msg["content"]})
+        history = messages
     else:
-        user_input = state.get("input", "")
-        ollama_messages.append({"role": "user", "content": user_input})
-    # If weather_result is present, append as context for the assistant
-    weather_result = state.get("weather_result")
-    if weather_result:
-        ollama_messages.append({"role": "system", "content": f"Weather data: {weather_result}"})
-    print("[DEBUG] ollama_llm_node input messages:", ollama_messages)
-    response = ollama.chat(
-        model="llama3.2:latest",
-        messages=ollama_messages
-    )
-    output = response["message"]["content"]
-    print("[DEBUG] ollama_llm_node LLM response:", output)
+        history = [{"role": "user", "content": state.get("input", "")}]
+        state = {**state, "messages": list(history)}
+    # Condensed weather digest, deduplicated against the history, within the token budget
+    ollama_messages = build_context(system_prompt, history, state.get("weather_result"))
+    start = time.perf_counter()
+    writer = _stream_writer() if LLM_STREAM else None
+    shown = ""
+    if writer is not None:
+        output, first_token, shown = _stream_chat(ollama_messages, writer, start)
+    else:
+        response = ollama_client().chat(
+            model=OLLAMA_MODEL,
+            messages=ollama_messages,
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        output = response["message"]["content"]
+        first_token = None
+    logger.info("llm call: %d messages, ~%d tokens in, %d chars out, %.0f ms%s",
+                len(ollama_messages), sum(estimate_tokens(m["content"]) for m in ollama_messages), len(output),
+                (time.perf_counter() - start) * 1000,
+                f" (first token {first_token * 1000:.0f} ms)" if first_token is not None else "")
     state = dict(state)
+    if "<<CALL_WEATHER" in output:
+        # Text streamed ahead of a tool call stays on screen, so it leads the final answer too
+        state["preamble"] = state.get("preamble", "") + shown
+    else:
+        output = state.get("preamble", "") + output
+        state["preamble"] = ""
+        # A final answer to a question whose tool results were keyed can be reused
+        if state.get("answer_key"):
+            answer_cache.set(state["answer_key"], output)
     state["output"] = output
     # Append LLM response to messages
     messages = state.get("messages", [])
@@ -94,22 +279,68 @@ def ollama_llm_node(state):
     state["messages"] = messages
     return state
 
+def _question(state):
+    """The user question being answered: the input, or the latest user message."""
+    if state.get("input"):
+        return state["input"]
+    for message in reversed(state.get("messages") or []):
+        if isinstance(message, dict) and message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+# The arguments get_weather takes; anything else in the LLM's tool call is dropped
+WEATHER_ARGS = ("location", "lat", "lon", "date", "days", "daypart")
+
+
+def _call_weather(args):
+    """One get_weather call; a failing call becomes an error result instead of ending the turn."""
+    unknown = sorted(set(args) - set(WEATHER_ARGS))
+    if unknown:
+        logger.warning("weather tool: ignoring unknown arguments %s", unknown)
+    try:
+        return get_weather(**{name: value for name, value in args.items() if name in WEATHER_ARGS})
+    except Exception as e:
+        logger.error("weather tool call %s failed: %s", args, e)
+        return {"status": "error", "message": str(e) or type(e).__name__}
+
+
 def weather_tool_node(state):
     """
-    Calls the get_weather tool with arguments from state['tool_args'].
-    Adds 'weather_result' to state.
+    Calls the get_weather tool for each call in state['tool_calls'] (or the
+    single state['tool_args']), running several calls concurrently.
+    Adds 'weather_result' to state: the result, or a list of results for
+    several calls, all merged into one context message. When the answer cache
+    has an answer for the same question and forecasts, sets 'output' and
+    'answer_cached' so the graph can skip the LLM.
     """
-    print("[DEBUG] weather_tool_node state:", state)
-    args = state.get("tool_args", {})
-    print("[DEBUG] weather_tool_node tool_args:", args)
-    result = get_weather(**args)
+    calls = state.get("tool_calls") or [state.get("tool_args", {})]
+    start = time.perf_counter()
+    if len(calls) == 1:
+        results = [_call_weather(calls[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(calls), WEATHER_TOOL_CONCURRENCY))) as pool:
+            results = list(pool.map(_call_weather, calls))
+    logger.info("weather tool: %d call(s) %s -> %s, %.0f ms", len(calls), calls,
+                [r.get("status") if isinstance(r, dict) else "?" for r in results],
+                (time.perf_counter() - start) * 1000)
     state = dict(state)
-    state["weather_result"] = result
-    # Append tool result to messages
+    state["weather_result"] = results[0] if len(results) == 1 else results
+    content = weather_context(state["weather_result"])
+    # Append the tool results' digest to messages as one context message
     messages = state.get("messages", [])
     messages.append({
         "role": "system",
-        "content": f"Weather data: {result}"
+        "content": content
     })
     state["messages"] = messages
+    # Same question, same places, same forecast: reuse the earlier answer and skip the LLM
+    key = answer_key(_question(state), calls, results)
+    cached = answer_cache.get(key) if key else None
+    state["answer_key"] = key
+    state["answer_cached"] = cached is not None
+    if cached is not None:
+        logger.info("answer cache hit (hit rate %.0f%%)", answer_cache.stats()["hit_rate"] * 100)
+        state["output"] = cached
+        messages.append({"role": "assistant", "content": cached})
     return state
@@ -0,0 +1,224 @@
+"""Load test: the FastAPI app against a local stand-in for NWS and Nominatim.
+
+Drives the app in-process (httpx ASGITransport, no sockets) with concurrent
+requests while every upstream call goes to ``stub_upstream.StubUpstream``,
+and reports throughput, latency percentiles and upstream calls per scenario:
+
+* cold:        every location requested once with empty caches
+* warm:        repeated requests for locations already cached
+* date_filter: warm requests with ``date=tomorrow`` and ``days=3&daypart=day``
+* by_name:     requests by city name, starting with empty caches
+
+    python -m mcp_nws.bench.bench_load
+    python -m mcp_nws.bench.bench_load --latency 0.1 --error-rate 0.02 --stall-rate 0.01
+    python -m mcp_nws.bench.bench_load --json results.json
+    python -m mcp_nws.bench.bench_load --baseline results.json --tolerance 0.25
+
+With ``--baseline`` the run exits non-zero when a scenario's p95 latency or
+throughput is worse than the baseline by more than the tolerance.
+"""
+import os
+
+# Reproducible runs: memory-only caches, no local gazetteer or prefetching, and
+# upstream rate limits lifted so the server itself is what gets measured.
+# Set any of these in the environment to override. They are applied only when
+# run as a script, before the server modules read them; importing this module
+# (as the tests do) leaves the environment alone.
+BENCH_ENV = {
+    "MCP_NWS_CACHE_DIR": "",
+    "MCP_NWS_GAZETTEER": "",
+    "MCP_NWS_PREFETCH": "0",
+    "MCP_NWS_LOG_LEVEL": "WARNING",
+    "MCP_NWS_NWS_RATE": "100000",
+    "MCP_NWS_NWS_BURST": "100000",
+    "MCP_NWS_NWS_CONCURRENCY": "1000",
+    "MCP_NWS_NOMINATIM_RATE": "100000",
+    "MCP_NWS_NOMINATIM_BURST": "100000",
+    "MCP_NWS_NOMINATIM_CONCURRENCY": "1000",
+    "MCP_NWS_UPSTREAM_MAX_QUEUE": "100000",
+}
+if __name__ == "__main__":
+    for _name, _value in BENCH_ENV.items():
+        os.environ.setdefault(_name, _value)
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from mcp_nws import main as server
+from mcp_nws import nws_client
+from mcp_nws.bench.stub_upstream import CITIES, StubUpstream, installed
+from mcp_nws.cache import LRUCache, TieredCache
+from mcp_nws.grid import GridEngine
+from mcp_nws.resilience import resilience
+
+SCENARIOS = ("cold", "warm", "date_filter", "by_name")
+
+
+def reset_caches() -> None:
+    """Start from empty, memory-only caches (persistent stores are never touched)."""
+    nws_client.points_cache = TieredCache(LRUCache(maxsize=100000, ttl=nws_client.POINTS_CACHE_TTL))
+    nws_client.geocode_cache = TieredCache(LRUCache(maxsize=100000, ttl=nws_client.GEOCODE_CACHE_TTL))
+    nws_client.grid_engine = GridEngine()
+    for cache in nws_client.response_caches.values():
+        cache.clear()
+    server.body_cache.clear()
+    resilience.breakers.clear()
+    resilience.latency.clear()
+
+
+def locations(count: int) -> List[str]:
+    """``count`` distinct coordinates spread around the stub cities."""
+    points = []
+    for i in range(count):
+        _, _, lat, lon = CITIES[i % len(CITIES)]
+        ring = i // len(CITIES)
+        points.append(f"lat={lat + 0.05 * ring:.4f}&lon={lon - 0.05 * ring:.4f}")
+    return points
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def drive(client: httpx.AsyncClient, urls: List[str], concurrency: int) -> Dict[str, Any]:
+    """Issue ``urls`` with ``concurrency`` workers; returns rps, latency percentiles (ms) and errors."""
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(urls)
+
+    async def worker() -> None:
+        nonlocal errors
+        for url in pending:
+            start = time.perf_counter()
+            resp = await client.get(url)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code != 200 or b'"status":"error"' in resp.content:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "errors": errors,
+    }
+
+
+def scenario_urls(name: str, count: int, requests: int) -> List[str]:
+    points = locations(count)
+    if name == "cold":
+        return [f"/resources/nws-weather?{p}" for p in points]
+    if name == "warm":
+        return [f"/resources/nws-weather?{points[i % count]}" for i in range(requests)]
+    if name == "date_filter":
+        filters = ("date=tomorrow", "days=3&daypart=day")
+        return [f"/resources/nws-weather?{points[i % count]}&{filters[i % 2]}" for i in range(requests)]
+    names = [f"{city}, {state}" for city, state, _, _ in CITIES]
+    return [f"/resources/nws-weather-by-name?location={quote(names[i % len(names)])}" for i in range(requests)]
+
+
+async def run_scenario(name: str, stub: StubUpstream, count: int, requests: int, concurrency: int) -> Dict[str, Any]:
+    reset_caches()
+    urls = scenario_urls(name, count, requests)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        if name in ("warm", "date_filter"):
+            # Fill the caches first; only the repeat traffic is measured
+            await drive(client, scenario_urls("cold", count, requests), concurrency)
+        stub.calls.clear()
+        coalesced = nws_client.singleflight.coalesced
+        result = await drive(client, urls, concurrency)
+    result["upstream"] = dict(sorted(stub.calls.items()))
+    result["coalesced"] = nws_client.singleflight.coalesced - coalesced
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    stub = StubUpstream(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall=args.stall,
+        fixtures=args.fixtures,
+        seed=args.seed,
+    )
+    results = {}
+    async with installed(stub):
+        for name in args.scenarios:
+            results[name] = await run_scenario(name, stub, args.locations, args.requests, args.concurrency)
+    return results
+
+
+def report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'scenario':<12} {'requests':>8} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}  upstream calls")
+    for name, r in results.items():
+        upstream = ", ".join(f"{k}={v}" for k, v in r["upstream"].items()) or "none"
+        print(
+            f"{name:<12} {r['requests']:>8} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['errors']:>6}  {upstream} (coalesced {r['coalesced']})"
+        )
+
+
+def regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Scenarios whose p95 rose or throughput fell by more than ``tolerance`` (a fraction)."""
+    found = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {r['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+        if base["rps"] and r["rps"] < base["rps"] * (1 - tolerance):
+            found.append(f"{name}: {r['rps']:.1f} rps vs baseline {base['rps']:.1f} rps")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--locations", type=int, default=200, help="distinct coordinates")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per warm/date/by-name scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="mean upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="upstream latency standard deviation (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls answered with 500")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of upstream calls that stall")
+    parser.add_argument("--stall", type=float, default=2.0, help="extra seconds a stalled call takes")
+    parser.add_argument("--fixtures", help="directory of recorded responses to replay (points.json, forecast.json, ...)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput regression (fraction)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
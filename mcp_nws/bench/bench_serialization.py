@@ -0,0 +1,99 @@
+"""Micro-benchmark: cost of building and encoding one weather response.
+
+Compares the original path (validated MCPWeatherResponse + pydantic JSON
+serialization + stdlib json, as FastAPI's response_model does) with the
+trusted-construction/fast-encoder path and with a cached pre-encoded body.
+
+    python -m mcp_nws.bench.bench_serialization
+"""
+import argparse
+import json
+import timeit
+
+from pydantic import TypeAdapter
+
+from mcp_nws.encoding import dumps, orjson
+from mcp_nws.main import UNITS, _response, body_cache
+from mcp_nws.mcp_schema import MCPWeatherResponse
+
+
+def sample_forecast(periods: int = 14):
+    return {
+        "units": "us",
+        "forecastGenerator": "BaselineForecastGenerator",
+        "generatedAt": "2026-10-18T09:44:19+00:00",
+        "updateTime": "2026-10-18T05:07:38+00:00",
+        "validTimes": "2026-10-17T23:00:00+00:00/P8DT6H",
+        "elevation": {"unitCode": "wmoUnit:m", "value": 3.9624},
+        "periods": [
+            {
+                "number": i + 1,
+                "name": f"Period {i + 1}",
+                "startTime": "2026-10-18T06:00:00-04:00",
+                "endTime": "2026-10-18T18:00:00-04:00",
+                "isDaytime": i % 2 == 0,
+                "temperature": 60 + i,
+                "temperatureUnit": "F",
+                "temperatureTrend": "",
+                "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": 20},
+                "windSpeed": "9 mph",
+                "windDirection": "W",
+                "icon": "https://api.weather.gov/icons/land/day/rain_showers,20/rain_showers,30?size=medium",
+                "shortForecast": "Chance Rain Showers",
+                "detailedForecast": "A chance of rain showers after 11am. Partly sunny, with a high near 62. "
+                                    "West wind around 9 mph. Chance of precipitation is 30%.",
+            }
+            for i in range(periods)
+        ],
+    }
+
+
+def sample_current():
+    quantity = {"unitCode": "wmoUnit:degC", "value": 12.2, "qualityControl": "V"}
+    return {
+        "@id": "https://api.weather.gov/stations/KBOS/observations/2026-10-18T17:54:00+00:00",
+        "station": "https://api.weather.gov/stations/KBOS",
+        "timestamp": "2026-10-18T17:54:00+00:00",
+        "textDescription": "Mostly Cloudy",
+        **{name: dict(quantity) for name in (
+            "temperature", "dewpoint", "windDirection", "windSpeed", "windGust", "barometricPressure",
+            "seaLevelPressure", "visibility", "relativeHumidity", "windChill", "heatIndex",
+        )},
+        "cloudLayers": [{"base": {"unitCode": "wmoUnit:m", "value": 1200}, "amount": "BKN"}],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args(argv)
+    forecast, current = sample_forecast(), sample_current()
+    adapter = TypeAdapter(MCPWeatherResponse)
+    fields = dict(location="42.36,-71.06", resolved_city="", resolved_state="", lat=42.36, lon=-71.06)
+
+    def validated():
+        model = MCPWeatherResponse(**fields, units=dict(UNITS), current=current, forecast=forecast, status="ok", message="")
+        return json.dumps(adapter.dump_python(model, mode="json")).encode("utf-8")
+
+    def trusted():
+        return dumps(_response("42.36,-71.06", "", "", 42.36, -71.06, current, forecast))
+
+    key = ("42.36,-71.06", "", "", 42.36, -71.06, "ok", "", None, "full", None)
+    body_cache.set(key, (forecast, current, trusted()))
+    cached_body = body_cache.get(key)[2]
+
+    def cached():
+        entry = body_cache.get(key)
+        return entry[2] if entry[0] is forecast and entry[1] is current else None
+
+    assert json.loads(validated()) == json.loads(trusted())
+    print(f"encoder: {'orjson' if orjson is not None else 'json (stdlib)'}, body: {len(cached_body)} bytes")
+    baseline = None
+    for name, fn in (("validated + json", validated), ("trusted + fast encoder", trusted), ("cached body", cached)):
+        per_call = timeit.timeit(fn, number=args.number) / args.number * 1e6
+        baseline = baseline or per_call
+        print(f"{name:<24} {per_call:9.2f} us/request  ({baseline / per_call:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Local stand-in for api.weather.gov and Nominatim.
+
+Answers ``/points``, forecast, gridpoint and observation requests and
+Nominatim searches from an ``httpx.MockTransport``, with configurable
+latency, multi-second stalls and injected 5xx errors, and counts every call
+by endpoint type. Responses are synthesized in the shape NWS returns (grid
+cells follow the real Lambert projection, forecast periods start today), or
+replayed verbatim from recorded JSON files:
+
+    <fixtures>/points.json, forecast.json, gridpoint.json, observation.json, nominatim.json
+
+``installed()`` swaps the shared upstream client in ``nws_client`` for one
+backed by the stub, so the FastAPI app runs unchanged.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from mcp_nws import nws_client
+from mcp_nws.bench.bench_serialization import sample_current
+from mcp_nws.grid import GRID_SPACING, project
+
+# (name, state, lat, lon) used for geocoding and as load-test locations
+CITIES = [
+    ("Boston", "Massachusetts", 42.3601, -71.0589),
+    ("New York", "New York", 40.7128, -74.006),
+    ("Philadelphia", "Pennsylvania", 39.9526, -75.1652),
+    ("Washington", "District of Columbia", 38.9072, -77.0369),
+    ("Atlanta", "Georgia", 33.749, -84.388),
+    ("Miami", "Florida", 25.7617, -80.1918),
+    ("Chicago", "Illinois", 41.8781, -87.6298),
+    ("Detroit", "Michigan", 42.3314, -83.0458),
+    ("Minneapolis", "Minnesota", 44.9778, -93.265),
+    ("St. Louis", "Missouri", 38.627, -90.1994),
+    ("Dallas", "Texas", 32.7767, -96.797),
+    ("Houston", "Texas", 29.7604, -95.3698),
+    ("Denver", "Colorado", 39.7392, -104.9903),
+    ("Phoenix", "Arizona", 33.4484, -112.074),
+    ("Salt Lake City", "Utah", 40.7608, -111.891),
+    ("Las Vegas", "Nevada", 36.1699, -115.1398),
+    ("Los Angeles", "California", 34.0522, -118.2437),
+    ("San Francisco", "California", 37.7749, -122.4194),
+    ("Portland", "Oregon", 45.5152, -122.6784),
+    ("Seattle", "Washington", 47.6062, -122.3321),
+]
+
+# Every stub office shares one grid origin; offices are 6-degree longitude bands
+_ORIGIN = project(20.0, -130.0)
+_UTC_OFFSET = timedelta(hours=-5)
+
+
+class StubUpstream:
+    def __init__(
+        self,
+        latency: float = 0.02,
+        jitter: float = 0.01,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        stall: float = 2.0,
+        max_age: int = 300,
+        fixtures: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.max_age = max_age
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.fixtures: Dict[str, Any] = {}
+        if fixtures:
+            for kind in ("points", "forecast", "gridpoint", "observation", "nominatim"):
+                path = os.path.join(fixtures, f"{kind}.json")
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as f:
+                        self.fixtures[kind] = json.load(f)
+
+    @staticmethod
+    def kind(request: httpx.Request) -> str:
+        path = request.url.path
+        if request.url.host == "nominatim.openstreetmap.org":
+            return "nominatim"
+        if path.endswith("/observations/latest"):
+            return "observation"
+        if path.endswith("/forecast"):
+            return "forecast"
+        if path.startswith("/gridpoints/"):
+            return "gridpoint"
+        return "points"
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        kind = self.kind(request)
+        self.calls[kind] += 1
+        delay = max(self.random.gauss(self.latency, self.jitter), 0.0)
+        if self.random.random() < self.stall_rate:
+            delay += self.stall
+        await asyncio.sleep(delay)
+        if self.random.random() < self.error_rate:
+            self.calls["errors"] += 1
+            return httpx.Response(500, json={"title": "Unexpected Problem", "status": 500})
+        body = self.fixtures.get(kind)
+        if body is None:
+            body = getattr(self, f"_{kind}")(request)
+        if kind == "nominatim":
+            return httpx.Response(200, json=body)
+        etag = '"' + hashlib.md5(request.url.path.encode()).hexdigest() + '"'
+        if request.headers.get("if-none-match") == etag:
+            self.calls["not_modified"] += 1
+            return httpx.Response(304, headers={"cache-control": f"max-age={self.max_age}", "etag": etag})
+        return httpx.Response(200, json=body, headers={"cache-control": f"max-age={self.max_age}", "etag": etag})
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def _nominatim(self, request: httpx.Request):
+        query = request.url.params.get("q", "")
+        name = query.split(",")[0].strip().lower()
+        for city, state, lat, lon in CITIES:
+            if city.lower() == name:
+                break
+        else:
+            # Unknown names still resolve, to a stable spot in CONUS
+            digest = int(hashlib.md5(query.lower().encode()).hexdigest(), 16)
+            city, state = query, ""
+            lat, lon = 30 + (digest % 1500) / 100, -120 + (digest // 1500 % 4500) / 100
+        return [{"lat": str(lat), "lon": str(lon), "address": {"city": city, "state": state}}]
+
+    @staticmethod
+    def grid_cell(lat: float, lon: float) -> Tuple[str, int, int]:
+        x, y = project(lat, lon)
+        office = f"S{int((lon + 130) // 6):02d}"
+        return office, math.floor((x - _ORIGIN[0]) / GRID_SPACING), math.floor((y - _ORIGIN[1]) / GRID_SPACING)
+
+    def _points(self, request: httpx.Request):
+        lat, lon = (float(v) for v in request.url.path.rsplit("/", 1)[1].split(","))
+        office, grid_x, grid_y = self.grid_cell(lat, lon)
+        base = f"{nws_client.NWS_API_BASE}/gridpoints/{office}/{grid_x},{grid_y}"
+        return {"properties": {
+            "gridId": office, "gridX": grid_x, "gridY": grid_y, "timeZone": "America/New_York",
+            "forecast": f"{base}/forecast", "forecastGridData": base,
+        }}
+
+    def _forecast(self, request: httpx.Request):
+        tz = timezone(_UTC_OFFSET)
+        now = datetime.now(tz)
+        start = now.replace(hour=6 if now.hour < 18 else 18, minute=0, second=0, microsecond=0)
+        periods = []
+        for i in range(14):
+            begin = start + timedelta(hours=12 * i)
+            daytime = begin.hour == 6
+            periods.append({
+                "number": i + 1,
+                "name": begin.strftime("%A") + ("" if daytime else " Night"),
+                "startTime": begin.isoformat(),
+                "endTime": (begin + timedelta(hours=12)).isoformat(),
+                "isDaytime": daytime,
+                "temperature": 60 + i % 5 if daytime else 45 + i % 5,
+                "temperatureUnit": "F",
+                "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": 10 * (i % 4)},
+                "windSpeed": "9 mph",
+                "windDirection": "W",
+                "shortForecast": "Chance Rain Showers",
+                "detailedForecast": "A chance of rain showers after 11am. Partly sunny, with a high near 62.",
+            })
+        return {"properties": {"updateTime": now.isoformat(), "periods": periods}}
+
+    def _gridpoint(self, request: httpx.Request):
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+        def layer(uom: str, base: float, step: int):
+            return {"uom": uom, "values": [
+                {"validTime": f"{(start + timedelta(hours=h)).isoformat()}/PT{step}H", "value": base + h % 24 / 2}
+                for h in range(0, 168, step)
+            ]}
+
+        return {"properties": {
+            "temperature": layer("wmoUnit:degC", 8.0, 1),
+            "probabilityOfPrecipitation": layer("wmoUnit:percent", 10.0, 3),
+            "windSpeed": layer("wmoUnit:km_h-1", 12.0, 2),
+        }}
+
+    def _observation(self, request: httpx.Request):
+        return {"properties": sample_current()}
+
+
+@asynccontextmanager
+async def installed(stub: StubUpstream):
+    """Route the shared upstream client through ``stub`` for the duration of the block."""
+    original = nws_client.create_client
+
+    def create_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=stub.transport(), headers={"User-Agent": nws_client.USER_AGENT})
+
+    await nws_client.close_client()
+    nws_client.create_client = create_client
+    try:
+        yield stub
+    finally:
+        await nws_client.close_client()
+        nws_client.create_client = original
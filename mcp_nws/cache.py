@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from mcp_nws.config import CACHE_DIR
+
+# Returned by cache lookups on a miss, so that None can be cached as a value
+MISSING = object()
+
+
+class LRUCache:
+    """In-memory LRU cache with optional per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        entry = self._data.get(key)
+        return entry[0] if entry else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class SQLiteStore:
+    """Size-bounded persistent key/value store backed by a SQLite file.
+
+    Values are stored as JSON. When the table grows past ``maxsize`` the
+    least recently used rows are deleted. The row count is read once and then
+    kept up to date by this instance's writes.
+    """
+
+    def __init__(self, path: str, table: str = "cache", maxsize: int = 20000):
+        self.path = path
+        self.table = table
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        (self._count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count -= 1
+                self.misses += 1
+                return default
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def expires_at(self, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            exists = self._conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            if exists is None:
+                self._count += 1
+            if self._count > self.maxsize:
+                deleted = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                    (self._count - self.maxsize,),
+                ).rowcount
+                self._count -= deleted
+                self.evictions += deleted
+
+    def items(self):
+        """All unexpired (key, value) pairs."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._count -= self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class TieredCache:
+    """Memory LRU in front of an optional persistent store.
+
+    Lookups try memory first, then the store; store hits are promoted into
+    memory with their remaining TTL. Writes go to both tiers. ``aget`` and
+    ``aset`` are for coroutines: they run the store's SQLite calls on a
+    worker thread instead of the event loop.
+    """
+
+    def __init__(self, memory: LRUCache, store: Optional[SQLiteStore] = None):
+        self.memory = memory
+        self.store = store
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING or self.store is None:
+            return default if value is MISSING else value
+        return self._promote(key, *self._load(key), default)
+
+    async def aget(self, key: str, default: Any = MISSING) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING or self.store is None:
+            return default if value is MISSING else value
+        return self._promote(key, *await asyncio.to_thread(self._load, key), default)
+
+    def _load(self, key: str) -> tuple:
+        """(value, expires_at) from the store; runs on a worker thread for ``aget``."""
+        value = self.store.get(key)
+        return value, None if value is MISSING else self.store.expires_at(key)
+
+    def _promote(self, key: str, value: Any, expires_at: Optional[float], default: Any) -> Any:
+        if value is MISSING:
+            return default
+        self.memory.set(key, value, ttl=None if expires_at is None else max(expires_at - time.time(), 0))
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.memory.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.store is not None:
+            self.store.set(key, value, ttl=ttl)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.memory.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        disk = self.store.stats() if self.store is not None else None
+        hits = memory["hits"] + (disk["hits"] if disk else 0)
+        misses = disk["misses"] if disk else memory["misses"]
+        return {"memory": memory, "disk": disk, "hits": hits, "misses": misses}
+
+
+def open_store(filename: str, table: str = "cache", maxsize: int = 20000) -> Optional[SQLiteStore]:
+    """Open a persistent store under CACHE_DIR, or return None if persistence is disabled or unavailable."""
+    if not CACHE_DIR:
+        return None
+    try:
+        return SQLiteStore(os.path.join(CACHE_DIR, filename), table=table, maxsize=maxsize)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,26 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+# Directory for persistent caches; set MCP_NWS_CACHE_DIR="" to keep caches in memory only
+CACHE_DIR = os.environ.get("MCP_NWS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mcp_nws"))
@@ -0,0 +1,236 @@
+"""Offline US gazetteer: city/state and ZIP lookups from a memory-mapped index.
+
+The index is a single binary file of fixed-size records sorted by normalized
+key (see ``locations.normalize_location``), so opening it is just an mmap
+and lookups are a binary search that touches only a few pages, regardless of
+how many places it holds. Build one from the Census Gazetteer files (or any
+CSV with name/state/lat/lon columns) with::
+
+    python -m mcp_nws.gazetteer build 2023_Gaz_place_national.txt 2023_Gaz_zcta_national.txt \\
+        --output mcp_nws/data/gazetteer.idx
+"""
+import argparse
+import csv
+import difflib
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mcp_nws.locations import STATE_ABBREVIATIONS, normalize_location, state_abbreviation, state_name
+
+MAGIC = b"MCPGAZ1\0"
+_HEADER = struct.Struct("<8sI")
+# key, lat, lon, city, state abbreviation
+_RECORD = struct.Struct("<48sdd40s2s")
+KEY_SIZE = 48
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.environ.get(
+    "MCP_NWS_GAZETTEER", os.path.join(os.path.dirname(__file__), "data", "gazetteer.idx")
+)
+
+# Census place names carry a legal/statistical suffix ("Boston city", "Ames CDP")
+_PLACE_SUFFIX_RE = re.compile(
+    r"\s+(city|town|village|borough|CDP|municipality|city and borough|consolidated government"
+    r"|unified government|metro government|metropolitan government|urban county)(\s*\(.*\))?$",
+    re.IGNORECASE,
+)
+
+
+class Gazetteer:
+    """Read-only view over a gazetteer index file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a gazetteer index")
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _offset(self, i: int) -> int:
+        return _HEADER.size + i * _RECORD.size
+
+    def _key(self, i: int) -> bytes:
+        offset = self._offset(i)
+        return self._mm[offset:offset + KEY_SIZE].rstrip(b"\0")
+
+    def _record(self, i: int) -> Dict[str, object]:
+        key, lat, lon, city, state = _RECORD.unpack_from(self._mm, self._offset(i))
+        abbr = state.decode("ascii").strip("\0")
+        return {
+            "lat": lat,
+            "lon": lon,
+            "city": city.rstrip(b"\0").decode("utf-8", errors="ignore"),
+            "state": state_name(abbr) if abbr else "",
+        }
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def exact(self, query: str) -> Optional[Dict[str, object]]:
+        key = normalize_location(query).encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self.count and self._key(i) == key:
+            return self._record(i)
+        return None
+
+    def prefix(self, query: str, limit: int = 10) -> List[Dict[str, object]]:
+        return [self._record(i) for i, _ in self._prefix_scan(normalize_location(query).encode("utf-8"), limit)]
+
+    def _prefix_scan(self, prefix: bytes, limit: int) -> Iterable[Tuple[int, bytes]]:
+        i = self._lower_bound(prefix)
+        found = 0
+        while i < self.count and found < limit:
+            key = self._key(i)
+            if not key.startswith(prefix):
+                break
+            yield i, key
+            found += 1
+            i += 1
+
+    def fuzzy(self, query: str, limit: int = 5, cutoff: float = 0.85, scan: int = 5000) -> List[Dict[str, object]]:
+        """Closest keys by similarity ratio among keys sharing the first two letters.
+
+        The candidate scan is bounded by ``scan`` records so a lookup stays
+        fast even on the full dataset.
+        """
+        key = normalize_location(query)
+        if not key:
+            return []
+        candidates = {k.decode("utf-8"): i for i, k in self._prefix_scan(key[:2].encode("utf-8"), scan)}
+        matches = difflib.get_close_matches(key, candidates, n=limit, cutoff=cutoff)
+        return [self._record(candidates[m]) for m in matches]
+
+    def resolve(self, query: str) -> Optional[Dict[str, object]]:
+        """Best single match for a geocoding query: exact, else a close match in the same state."""
+        result = self.exact(query)
+        if result is not None:
+            return result
+        return self.close_match(query)
+
+    def close_match(self, query: str) -> Optional[Dict[str, object]]:
+        """A close spelling of 'City, ST' in the same state (the fuzzy half of ``resolve``).
+
+        This is a difflib scan and costs milliseconds; async callers run it in a thread.
+        """
+        key = normalize_location(query)
+        words = key.split(" ")
+        if len(words) < 2 or words[-1].upper() not in STATE_ABBREVIATIONS:
+            return None
+        state = state_name(words[-1])
+        for candidate in self.fuzzy(key, limit=3, cutoff=0.9):
+            if candidate["state"] == state:
+                return candidate
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_loaded = False
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The shared gazetteer, opened on first use; None when no index file is installed."""
+    global _gazetteer, _gazetteer_loaded
+    if not _gazetteer_loaded:
+        _gazetteer_loaded = True
+        if DEFAULT_PATH and os.path.exists(DEFAULT_PATH):
+            try:
+                _gazetteer = Gazetteer(DEFAULT_PATH)
+            except (OSError, ValueError) as e:
+                logger.warning("could not open gazetteer", extra={"fields": {"path": DEFAULT_PATH, "error": str(e)}})
+    return _gazetteer
+
+
+def _read_rows(path: str) -> Iterable[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.readline()
+        f.seek(0)
+        delimiter = "\t" if "\t" in sample else ","
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+
+
+def _entries(rows: Iterable[Dict[str, str]]) -> Iterable[Tuple[str, float, float, str, str, float]]:
+    """(key, lat, lon, city, state, rank) tuples from Census Gazetteer or simple CSV rows."""
+    for row in rows:
+        lat = row.get("lat") or row.get("intptlat")
+        lon = row.get("lon") or row.get("intptlong")
+        if not lat or not lon:
+            continue
+        lat, lon = float(lat), float(lon)
+        zip_code = row.get("zip") or (row.get("geoid") if "name" not in row else "")
+        name = _PLACE_SUFFIX_RE.sub("", row.get("name", ""))
+        state = state_abbreviation(row.get("state") or row.get("usps") or "")
+        rank = float(row.get("population") or row.get("aland") or 0)
+        if zip_code and len(zip_code) == 5 and zip_code.isdigit():
+            yield zip_code, lat, lon, name, state, rank
+        if name and state:
+            yield normalize_location(f"{name}, {state}"), lat, lon, name, state, rank
+            # A bare city name resolves to the largest place of that name
+            yield normalize_location(name), lat, lon, name, state, rank
+
+
+def build(inputs: List[str], output: str) -> int:
+    """Write a gazetteer index from Census Gazetteer/CSV files. Returns the record count."""
+    best: Dict[bytes, Tuple[float, float, float, str, str]] = {}
+    for path in inputs:
+        for key, lat, lon, city, state, rank in _entries(_read_rows(path)):
+            encoded = key.encode("utf-8")
+            if not encoded or len(encoded) > KEY_SIZE:
+                continue
+            if encoded not in best or rank > best[encoded][0]:
+                best[encoded] = (rank, lat, lon, city, state)
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = output + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(best)))
+        for key in sorted(best):
+            _, lat, lon, city, state = best[key]
+            f.write(_RECORD.pack(key, lat, lon, city.encode("utf-8")[:40], state.encode("ascii")))
+    os.replace(tmp, output)
+    return len(best)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline US gazetteer tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Build an index from Census Gazetteer or CSV files")
+    build_parser.add_argument("inputs", nargs="+")
+    build_parser.add_argument("--output", default=DEFAULT_PATH)
+    lookup_parser = sub.add_parser("lookup", help="Look up a location in an index")
+    lookup_parser.add_argument("query")
+    lookup_parser.add_argument("--index", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build(args.inputs, args.output)
+        print(f"Wrote {count} entries to {args.output}")
+    else:
+        gazetteer = Gazetteer(args.index)
+        print(gazetteer.resolve(args.query) or gazetteer.prefix(args.query, limit=5) or "No match")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
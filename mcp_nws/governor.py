@@ -0,0 +1,259 @@
+"""Per-host upstream rate limiting, concurrency caps and backpressure.
+
+Every upstream request first takes a slot from its host's governor: a token
+bucket caps the request rate (Nominatim's policy is about one request per
+second), a concurrency cap bounds requests in flight, and callers that have
+to wait queue up fairly. Waiters are grouped into flows ("live" requests,
+"background" refreshes) served in weighted round robin, FIFO within a flow,
+so background work cannot crowd out live traffic and vice versa.
+
+The queue is bounded in length and in waiting time. When it is full, when a
+slot would not be granted within ``max_wait`` seconds, or while the host has
+asked us to back off with ``Retry-After``, ``UpstreamOverloaded`` is raised
+immediately so the endpoint can answer 503 instead of piling up requests.
+"""
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+
+from mcp_nws.config import env_float, env_int
+
+# Flow of the current task; background refreshes set it to "background"
+flow: contextvars.ContextVar = contextvars.ContextVar("upstream_flow", default="live")
+FLOW_WEIGHTS = {"live": 4, "background": 1}
+
+
+class UpstreamOverloaded(Exception):
+    """The upstream host's queue is full or it asked us to back off."""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"{host} is overloaded; retry after {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - (time.time() if now is None else now), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class HostGovernor:
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        burst: float,
+        max_concurrency: int,
+        max_queue: int = 100,
+        max_wait: float = 5.0,
+        default_backoff: float = 5.0,
+    ):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.default_backoff = default_backoff
+        self.active = 0
+        self.blocked_until = 0.0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._vtime: Dict[str, float] = {}
+        self._clock = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _bind(self) -> None:
+        # Futures and timers belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queues.clear()
+            self._timer = None
+            self.active = 0
+
+    def _delay(self, now: float) -> float:
+        return max(self.bucket.delay(now), self.blocked_until - now)
+
+    def _estimated_wait(self, now: float) -> float:
+        """Rough time until a newly queued request would be granted."""
+        backlog = self.waiting() + max(self.active - self.max_concurrency + 1, 0)
+        return self._delay(now) + backlog / self.bucket.rate
+
+    async def acquire(self) -> None:
+        self._bind()
+        now = time.monotonic()
+        if not self.waiting() and self.active < self.max_concurrency and self._delay(now) <= 0:
+            self._grant()
+            return
+        if self.waiting() >= self.max_queue or self._estimated_wait(now) > self.max_wait:
+            self.rejected += 1
+            raise UpstreamOverloaded(self.host, max(self._delay(now), 1.0))
+        name = flow.get()
+        queue = self._queues.setdefault(name, deque())
+        if not queue:
+            # A flow that was idle rejoins at the current virtual time instead of catching up
+            self._vtime[name] = max(self._vtime.get(name, 0.0), self._clock)
+        waiter = self._loop.create_future()
+        queue.append(waiter)
+        self.queued += 1
+        if self._timer is None:
+            self._schedule()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(name, waiter)
+            self.rejected += 1
+            raise UpstreamOverloaded(self.host, max(self._delay(time.monotonic()), 1.0))
+        except asyncio.CancelledError:
+            self._abandon(name, waiter)
+            raise
+
+    def _abandon(self, name: str, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Granted just as we gave up: hand the slot back
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._queues[name].remove(waiter)
+        except ValueError:
+            pass
+
+    def _grant(self) -> None:
+        self.bucket.take()
+        self.active += 1
+        self.granted += 1
+
+    def _next_flow(self) -> Optional[str]:
+        ready = [name for name, queue in self._queues.items() if queue]
+        return min(ready, key=lambda name: self._vtime[name]) if ready else None
+
+    def _schedule(self) -> None:
+        """Grant slots to waiters while capacity and tokens allow; otherwise set a timer."""
+        self._timer = None
+        while self.active < self.max_concurrency:
+            name = self._next_flow()
+            if name is None:
+                return
+            delay = self._delay(time.monotonic())
+            if delay > 0:
+                self._timer = self._loop.call_later(delay, self._schedule)
+                return
+            waiter = self._queues[name].popleft()
+            if waiter.done():
+                continue
+            self._clock = self._vtime[name]
+            self._vtime[name] += 1.0 / FLOW_WEIGHTS.get(name, 1)
+            self._grant()
+            waiter.set_result(None)
+
+    def release(self) -> None:
+        self.active = max(self.active - 1, 0)
+        if self._timer is None and self._loop is not None:
+            self._schedule()
+
+    def back_off(self, retry_after: Optional[float]) -> float:
+        """The host answered 429/503: hold all requests until Retry-After has passed."""
+        self.throttled += 1
+        seconds = self.default_backoff if retry_after is None else retry_after
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        return seconds
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting(),
+            "granted": self.granted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+class Governor:
+    """One HostGovernor per configured host; other hosts are not limited."""
+
+    def __init__(self, hosts: Dict[str, HostGovernor]):
+        self.hosts = hosts
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        governor = self.hosts.get(host)
+        if governor is None:
+            yield
+            return
+        await governor.acquire()
+        try:
+            yield
+        finally:
+            governor.release()
+
+    def back_off(self, host: str, retry_after: Optional[float]) -> float:
+        """Record a throttling response; returns the seconds clients should wait."""
+        governor = self.hosts.get(host)
+        if governor is None:
+            return retry_after or 1.0
+        return governor.back_off(retry_after)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {host: governor.stats() for host, governor in self.hosts.items()}
+
+
+def _host_governor(host: str, prefix: str, rate: float, burst: float, concurrency: int) -> HostGovernor:
+    return HostGovernor(
+        host,
+        rate=env_float(f"MCP_NWS_{prefix}_RATE", rate),
+        burst=env_float(f"MCP_NWS_{prefix}_BURST", burst),
+        max_concurrency=env_int(f"MCP_NWS_{prefix}_CONCURRENCY", concurrency),
+        max_queue=env_int("MCP_NWS_UPSTREAM_MAX_QUEUE", 100),
+        max_wait=env_float("MCP_NWS_UPSTREAM_MAX_WAIT", 5.0),
+    )
+
+
+governor = Governor({
+    "api.weather.gov": _host_governor("api.weather.gov", "NWS", rate=20.0, burst=40.0, concurrency=16),
+    "nominatim.openstreetmap.org": _host_governor("nominatim.openstreetmap.org", "NOMINATIM", rate=1.0, burst=1.0, concurrency=1),
+})
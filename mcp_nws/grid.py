@@ -0,0 +1,424 @@
+"""Local lat/lon -> NWS forecast grid cell projection.
+
+Every CONUS forecast office grid is a window onto the same Lambert conformal
+conic projection (NDFD 2.5 km grid: standard parallel 25N, central meridian
+95W, spherical earth of radius 6371.2 km), differing only in its origin. The
+engine learns each office's origin from ``/points`` answers it has already
+seen: every sample narrows the interval in which the origin must lie, and a
+coordinate is mapped locally only when every origin still consistent with
+the samples puts it in the same cell. Which office covers a coordinate is
+decided by the office boundary polygon, loaded from the NWS county warning
+area GeoJSON or else learned as the convex hull of the samples. Real
+coverage areas are not convex, so a learned hull can spill into a
+neighbour's area: it is only trusted after many samples, shrunk by a wider
+margin, and never for a point that another office's polygon also contains.
+Anything near a cell edge or office boundary is left to ``/points``.
+"""
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mcp_nws.cache import SQLiteStore
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for locate_many
+    np = None
+
+EARTH_RADIUS = 6371200.0
+STANDARD_PARALLEL = math.radians(25.0)
+CENTRAL_MERIDIAN = math.radians(-95.0)
+GRID_SPACING = 2539.703
+
+# Offices outside CONUS use other projections (polar stereographic/mercator)
+NON_CONUS_OFFICES = {"AFC", "AFG", "AJK", "HFO", "GUM", "SJU", "PPG"}
+
+_N = math.sin(STANDARD_PARALLEL)
+_F = math.cos(STANDARD_PARALLEL) * math.tan(math.pi / 4 + STANDARD_PARALLEL / 2) ** _N / _N
+_RHO0 = EARTH_RADIUS * _F / math.tan(math.pi / 4 + STANDARD_PARALLEL / 2) ** _N
+
+
+def project(lat: float, lon: float) -> Tuple[float, float]:
+    """Project a coordinate onto the NDFD Lambert conformal plane (meters)."""
+    rho = EARTH_RADIUS * _F / math.tan(math.pi / 4 + math.radians(lat) / 2) ** _N
+    theta = _N * (math.radians(lon) - CENTRAL_MERIDIAN)
+    return rho * math.sin(theta), _RHO0 - rho * math.cos(theta)
+
+
+def project_many(lats, lons):
+    """Vectorized ``project`` over NumPy arrays."""
+    rho = EARTH_RADIUS * _F / np.tan(np.pi / 4 + np.radians(lats) / 2) ** _N
+    theta = _N * (np.radians(lons) - CENTRAL_MERIDIAN)
+    return rho * np.sin(theta), _RHO0 - rho * np.cos(theta)
+
+
+def convex_hull(points: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Counter-clockwise convex hull (monotone chain) of (lon, lat) points."""
+    pts = sorted(set((float(x), float(y)) for x, y in points))
+    if len(pts) <= 2:
+        return pts
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: List[Tuple[float, float]] = []
+    upper: List[Tuple[float, float]] = []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _segment_distance(px: float, py: float, a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((px - a[0]) * dx + (py - a[1]) * dy) / length))
+    return math.hypot(px - (a[0] + t * dx), py - (a[1] + t * dy))
+
+
+def point_in_polygon(lon: float, lat: float, polygon: Sequence[Tuple[float, float]], margin: float = 0.0) -> bool:
+    """Ray-casting containment test; with a margin the point must also be that far (degrees) from every edge."""
+    if len(polygon) < 3:
+        return False
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        (xi, yi), (xj, yj) = polygon[i], polygon[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    if not inside or margin <= 0:
+        return inside
+    return all(_segment_distance(lon, lat, polygon[i - 1], polygon[i]) > margin for i in range(len(polygon)))
+
+
+class _Axis:
+    """Feasible origin intervals for one grid axis, under both index directions."""
+
+    def __init__(self, spacing: float, bounds: Optional[Dict[str, List[float]]] = None):
+        self.spacing = spacing
+        # sign -> [lo, hi): origin o satisfies index == floor((sign * p - o) / spacing)
+        self.bounds: Dict[int, List[float]] = {1: [-math.inf, math.inf], -1: [-math.inf, math.inf]}
+        if bounds is not None:
+            self.bounds = {int(k): list(v) for k, v in bounds.items()}
+
+    def learn(self, p: float, index: int) -> None:
+        for sign in list(self.bounds):
+            lo, hi = self.bounds[sign]
+            v = sign * p
+            lo = max(lo, v - (index + 1) * self.spacing)
+            hi = min(hi, v - index * self.spacing)
+            if lo >= hi:
+                del self.bounds[sign]  # this direction contradicts the samples
+            else:
+                self.bounds[sign] = [lo, hi]
+
+    def predict(self, p: float) -> Optional[int]:
+        """Grid index if every consistent origin agrees, else None."""
+        if not self.bounds:
+            return None
+        predictions = set()
+        for sign, (lo, hi) in self.bounds.items():
+            if math.isinf(lo) or math.isinf(hi):
+                return None
+            v = sign * p
+            first = math.floor((v - hi) / self.spacing + 1e-9)
+            last = math.floor((v - lo) / self.spacing)
+            if first != last:
+                return None
+            predictions.add(first)
+        return predictions.pop() if len(predictions) == 1 else None
+
+    def predict_many(self, p):
+        """Vectorized ``predict``: (indices, mask of entries where every origin agrees)."""
+        indices = np.zeros(p.shape, dtype=np.int64)
+        agreed = np.zeros(p.shape, dtype=bool)
+        if not self.bounds or any(math.isinf(b) for bounds in self.bounds.values() for b in bounds):
+            return indices, agreed
+        agreed[:] = True
+        guesses = []
+        for sign, (lo, hi) in self.bounds.items():
+            v = sign * p
+            first = np.floor((v - hi) / self.spacing + 1e-9).astype(np.int64)
+            last = np.floor((v - lo) / self.spacing).astype(np.int64)
+            agreed &= first == last
+            guesses.append(first)
+        for guess in guesses[1:]:
+            agreed &= guess == guesses[0]
+        return guesses[0], agreed
+
+
+class OfficeGrid:
+    """What is known about one forecast office's grid and coverage area."""
+
+    def __init__(self, office: str, spacing: float = GRID_SPACING, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.office = office
+        self.x = _Axis(spacing, data.get("x"))
+        self.y = _Axis(spacing, data.get("y"))
+        self.samples = int(data.get("samples", 0))
+        self.hull: List[Tuple[float, float]] = [tuple(p) for p in data.get("hull", [])]
+        self.boundary: Optional[List[Tuple[float, float]]] = (
+            [tuple(p) for p in data["boundary"]] if data.get("boundary") else None
+        )
+        # IANA zones seen in /points answers; some offices straddle two
+        self.time_zones: List[str] = list(data.get("time_zones", []))
+        self._bbox: Optional[Tuple[float, float, float, float]] = None
+
+    @property
+    def polygon(self) -> List[Tuple[float, float]]:
+        return self.boundary or self.hull
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        if self._bbox is None:
+            xs = [p[0] for p in self.polygon] or [0.0]
+            ys = [p[1] for p in self.polygon] or [0.0]
+            self._bbox = (min(xs), min(ys), max(xs), max(ys))
+        return self._bbox
+
+    @property
+    def time_zone(self) -> Optional[str]:
+        """The office's timezone when every sample agreed on one."""
+        return self.time_zones[0] if len(self.time_zones) == 1 else None
+
+    @property
+    def consistent(self) -> bool:
+        return bool(self.x.bounds) and bool(self.y.bounds)
+
+    def learn(self, lat: float, lon: float, grid_x: int, grid_y: int, time_zone: Optional[str] = None) -> None:
+        px, py = project(lat, lon)
+        if time_zone and time_zone not in self.time_zones:
+            self.time_zones.append(time_zone)
+        self.x.learn(px, grid_x)
+        self.y.learn(py, grid_y)
+        self.samples += 1
+        self.hull = convex_hull(self.hull + [(lon, lat)])
+        self._bbox = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "x": self.x.bounds,
+            "y": self.y.bounds,
+            "samples": self.samples,
+            "hull": self.hull,
+            "boundary": self.boundary,
+            "time_zones": self.time_zones,
+        }
+
+
+class GridEngine:
+    """Maps coordinates to (office, gridX, gridY) without calling ``/points``."""
+
+    def __init__(
+        self,
+        store: Optional[SQLiteStore] = None,
+        min_samples: int = 3,
+        margin: float = 0.02,
+        cell: float = 1.0,
+        hull_samples: int = 25,
+        hull_margin: float = 0.1,
+    ):
+        self.store = store
+        # Offices with a loaded boundary need min_samples to pin the grid
+        # origin; a learned hull needs hull_samples and keeps hull_margin
+        # degrees away from its edges
+        self.min_samples = min_samples
+        self.margin = margin
+        self.hull_samples = hull_samples
+        self.hull_margin = hull_margin
+        self.cell = cell
+        self.offices: Dict[str, OfficeGrid] = {}
+        self._index: Dict[Tuple[int, int], List[str]] = {}
+        self._office_cells: Dict[str, List[Tuple[int, int]]] = {}
+        self.local_hits = 0
+        self.boundary_cases = 0
+        if store is not None:
+            for office, data in store.items():
+                self.offices[office] = OfficeGrid(office, data=data)
+        self._reindex()
+
+    def _cells(self, bbox: Tuple[float, float, float, float]):
+        x0, y0, x1, y1 = bbox
+        for i in range(math.floor(x0 / self.cell), math.floor(x1 / self.cell) + 1):
+            for j in range(math.floor(y0 / self.cell), math.floor(y1 / self.cell) + 1):
+                yield i, j
+
+    def _reindex(self) -> None:
+        """Rebuild the spatial index: a uniform lat/lon bucket grid of office bounding boxes."""
+        self._index = {}
+        self._office_cells = {}
+        for office in self.offices:
+            self._index_office(office)
+
+    def _index_office(self, office: str) -> None:
+        """Move one office to the buckets its current bounding box covers."""
+        for cell in self._office_cells.pop(office, ()):
+            offices = self._index.get(cell)
+            if offices and office in offices:
+                offices.remove(office)
+                if not offices:
+                    del self._index[cell]
+        grid = self.offices[office]
+        if len(grid.polygon) >= 3:
+            cells = list(self._cells(grid.bbox))
+            for cell in cells:
+                self._index.setdefault(cell, []).append(office)
+            self._office_cells[office] = cells
+
+    def _candidates(self, lat: float, lon: float) -> List[str]:
+        return self._index.get((math.floor(lon / self.cell), math.floor(lat / self.cell)), [])
+
+    def _usable(self, grid: OfficeGrid) -> bool:
+        needed = self.min_samples if grid.boundary else self.hull_samples
+        return grid.samples >= needed and grid.consistent and grid.office not in NON_CONUS_OFFICES
+
+    def _margin(self, grid: OfficeGrid) -> float:
+        return self.margin if grid.boundary else self.hull_margin
+
+    def locate(self, lat: float, lon: float) -> Optional[Tuple[str, int, int]]:
+        """(office, gridX, gridY) when it can be computed confidently, else None."""
+        claimed = [
+            office for office in self._candidates(lat, lon)
+            if point_in_polygon(lon, lat, self.offices[office].polygon)
+        ]
+        # Exactly one office may claim the point, and well inside its polygon
+        if len(claimed) != 1:
+            self.boundary_cases += 1
+            return None
+        grid = self.offices[claimed[0]]
+        if not self._usable(grid) or not point_in_polygon(lon, lat, grid.polygon, self._margin(grid)):
+            self.boundary_cases += 1
+            return None
+        px, py = project(lat, lon)
+        grid_x, grid_y = grid.x.predict(px), grid.y.predict(py)
+        if grid_x is None or grid_y is None:
+            self.boundary_cases += 1
+            return None
+        self.local_hits += 1
+        return grid.office, grid_x, grid_y
+
+    @property
+    def vectorized(self) -> bool:
+        """Whether ``locate_many`` is available (it needs numpy)."""
+        return np is not None
+
+    def locate_many(self, lats, lons):
+        """Vectorized ``locate`` for batches.
+
+        Returns (offices, grid_x, grid_y, resolved) arrays; entries where
+        ``resolved`` is False have an empty office and should be looked up
+        with ``/points``. Counts hits and boundary cases like ``locate``.
+        """
+        if np is None:
+            raise RuntimeError("locate_many requires numpy")
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        px, py = project_many(lats, lons)
+        offices = np.full(lats.shape, "", dtype=object)
+        grid_x = np.zeros(lats.shape, dtype=np.int64)
+        grid_y = np.zeros(lats.shape, dtype=np.int64)
+        hits = np.zeros(lats.shape, dtype=np.int64)
+        agreed = np.zeros(lats.shape, dtype=bool)
+        for office, grid in self.offices.items():
+            if len(grid.polygon) < 3:
+                continue
+            x0, y0, x1, y1 = grid.bbox
+            candidates = np.nonzero((lons >= x0) & (lons <= x1) & (lats >= y0) & (lats <= y1))[0]
+            claimed = [i for i in candidates if point_in_polygon(lons[i], lats[i], grid.polygon)]
+            if not claimed:
+                continue
+            # Every claiming office counts, usable or not, so overlaps defer to /points
+            hits[np.asarray(claimed)] += 1
+            if not self._usable(grid):
+                continue
+            margin = self._margin(grid)
+            inside = [i for i in claimed if point_in_polygon(lons[i], lats[i], grid.polygon, margin)]
+            if not inside:
+                continue
+            inside = np.asarray(inside)
+            offices[inside] = office
+            grid_x[inside], x_ok = grid.x.predict_many(px[inside])
+            grid_y[inside], y_ok = grid.y.predict_many(py[inside])
+            agreed[inside] = x_ok & y_ok
+        resolved = (hits == 1) & agreed
+        offices[~resolved] = ""
+        resolved_count = int(resolved.sum())
+        self.local_hits += resolved_count
+        self.boundary_cases += int(resolved.size) - resolved_count
+        return offices, grid_x, grid_y, resolved
+
+    def learn(
+        self,
+        lat: float,
+        lon: float,
+        office: str,
+        grid_x: int,
+        grid_y: int,
+        time_zone: Optional[str] = None,
+        persist: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Record a ``/points`` answer.
+
+        Returns the office's updated definition (None for offices that are
+        not learned). With ``persist=False`` it is not written to the store,
+        so async callers can write it from a worker thread.
+        """
+        if office in NON_CONUS_OFFICES:
+            return None
+        grid = self.offices.get(office)
+        if grid is None:
+            grid = self.offices[office] = OfficeGrid(office)
+        grid.learn(lat, lon, grid_x, grid_y, time_zone)
+        self._index_office(office)
+        definition = grid.to_dict()
+        if persist and self.store is not None:
+            self.store.set(office, definition)
+        return definition
+
+    def time_zone(self, office: str) -> Optional[str]:
+        """IANA timezone of a located office, or None when unknown or ambiguous."""
+        grid = self.offices.get(office)
+        return grid.time_zone if grid is not None else None
+
+    def load_boundaries(self, path: str, office_property: str = "CWA") -> int:
+        """Load office boundary polygons from a GeoJSON FeatureCollection (e.g. NWS CWA boundaries).
+
+        Multipolygons keep their largest ring. Returns the number of offices loaded.
+        """
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+        loaded = 0
+        for feature in collection.get("features", []):
+            office = (feature.get("properties") or {}).get(office_property)
+            geometry = feature.get("geometry") or {}
+            if not office:
+                continue
+            if geometry.get("type") == "Polygon":
+                rings = [geometry["coordinates"][0]]
+            elif geometry.get("type") == "MultiPolygon":
+                rings = [polygon[0] for polygon in geometry["coordinates"]]
+            else:
+                continue
+            ring = max(rings, key=len)
+            grid = self.offices.get(office)
+            if grid is None:
+                grid = self.offices[office] = OfficeGrid(office)
+            grid.boundary = [(float(x), float(y)) for x, y in ring]
+            grid._bbox = None
+            loaded += 1
+        self._reindex()
+        return loaded
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "offices": len(self.offices),
+            "usable_offices": sum(1 for g in self.offices.values() if self._usable(g)),
+            "local_hits": self.local_hits,
+            "boundary_cases": self.boundary_cases,
+        }
@@ -0,0 +1,218 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+
+@dataclass
+class CachedResponse:
+    """A parsed upstream JSON body plus the validators needed to revalidate it."""
+    body: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    expires_at: float
+    size: int
+    stale_until: float = 0.0
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def is_usable_stale(self, now: Optional[float] = None) -> bool:
+        """Stale, but still within its stale-while-revalidate window."""
+        now = now if now is not None else time.time()
+        return self.expires_at <= now < self.stale_until
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds a response may be served without revalidation, per RFC 9111.
+
+    Returns None when the response must not be stored at all.
+    """
+    now = time.time() if now is None else now
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                lifetime = float(directives[name])
+            except ValueError:
+                continue
+            try:
+                lifetime -= float(headers.get("age", 0))
+            except ValueError:
+                pass
+            return max(lifetime, 0.0)
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(expires - date, 0.0)
+    # Heuristic freshness: 10% of the time since the resource last changed
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(min((date - last_modified) * 0.1, 3600.0), 0.0)
+    return 0.0
+
+
+def stale_while_revalidate(headers: Mapping[str, str], default: float = 0.0) -> float:
+    """Seconds past expiry a response may still be served while it is refreshed (RFC 5861).
+
+    ``default`` only applies to responses with explicit freshness (max-age or
+    Expires); one cached on heuristics or not at all is never served stale.
+    """
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "must-revalidate" in directives or "no-cache" in directives:
+        return 0.0
+    try:
+        return float(directives["stale-while-revalidate"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    explicit = directives.get("s-maxage") or directives.get("max-age") or _http_date(headers.get("expires")) is not None
+    return default if explicit else 0.0
+
+
+class HTTPCache:
+    """LRU cache of upstream JSON responses honoring HTTP caching headers.
+
+    Fresh entries are served locally; stale entries are kept (within the
+    memory caps) so they can be revalidated with If-None-Match /
+    If-Modified-Since, where a 304 only refreshes their lifetime. For
+    ``stale_while_revalidate`` seconds after expiry (unless the response sets
+    its own window, or has no explicit max-age/Expires) a stale entry may be
+    served while it is refreshed in the background.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, stale_while_revalidate: float = 0.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def lookup(self, key: str) -> Tuple[Optional[CachedResponse], bool]:
+        """(entry to serve now, whether it is stale), counting hits, stale hits and misses.
+
+        A fresh entry, or a stale one within its stale-while-revalidate
+        window, is served; anything else is a miss (None).
+        """
+        entry = self.get(key)
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+            return entry, False
+        if entry is not None and entry.is_usable_stale():
+            self.stale_hits += 1
+            return entry, True
+        self.misses += 1
+        return None, False
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: str, response: httpx.Response, body: Any) -> Optional[CachedResponse]:
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now)
+        if lifetime is None:
+            self.delete(key)
+            return None
+        entry = CachedResponse(
+            body=body,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            stored_at=now,
+            expires_at=now + lifetime,
+            size=len(response.content),
+        )
+        entry.stale_until = entry.expires_at + stale_while_revalidate(response.headers, self.stale_while_revalidate)
+        if entry.size > self.max_bytes:
+            return None
+        self.delete(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        self._evict()
+        return entry
+
+    def revalidated(self, key: str, response: httpx.Response) -> Optional[CachedResponse]:
+        """Refresh an entry's lifetime and validators after a 304 Not Modified."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now)
+        entry.stored_at = now
+        entry.expires_at = now + (lifetime or 0.0)
+        entry.stale_until = entry.expires_at + stale_while_revalidate(response.headers, self.stale_while_revalidate)
+        entry.etag = response.headers.get("etag", entry.etag)
+        entry.last_modified = response.headers.get("last-modified", entry.last_modified)
+        self.revalidations += 1
+        return entry
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self.bytes -= entry.size
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+        }
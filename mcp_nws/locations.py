@@ -0,0 +1,66 @@
+import re
+
+US_STATES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "district of columbia": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID", "illinois": "IL",
+    "indiana": "IN", "iowa": "IA", "kansas": "KS", "kentucky": "KY", "louisiana": "LA",
+    "maine": "ME", "maryland": "MD", "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC", "south dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+    "puerto rico": "PR", "guam": "GU", "american samoa": "AS", "us virgin islands": "VI",
+    "northern mariana islands": "MP",
+}
+STATE_ABBREVIATIONS = set(US_STATES.values())
+STATE_NAMES = {abbr: " ".join(w if w == "of" else w.capitalize() for w in name.split()) for name, abbr in US_STATES.items()}
+STATE_NAMES["VI"] = "U.S. Virgin Islands"
+
+_ZIP_RE = re.compile(r"^(\d{5})(?:-\d{4})?$")
+_NON_WORD_RE = re.compile(r"[^\w\s-]+")
+_SPACE_RE = re.compile(r"[\s_]+")
+_SUFFIXES = (", usa", ", us", ", united states")
+
+
+def state_abbreviation(name: str) -> str:
+    """Return the two-letter code for a state name or code, or '' if unknown."""
+    name = name.strip().lower()
+    if name.upper() in STATE_ABBREVIATIONS:
+        return name.upper()
+    return US_STATES.get(name, "")
+
+
+def normalize_location(query: str) -> str:
+    """Canonical form of a location query, used as a cache/lookup key.
+
+    Case, punctuation and whitespace are folded and a trailing state name is
+    replaced by its abbreviation, so "Boston, MA", "boston ma", "Boston,MA"
+    and "Boston, Massachusetts" all normalize to "boston ma". ZIP+4 codes are
+    reduced to the 5-digit ZIP.
+    """
+    text = query.strip().lower()
+    zip_match = _ZIP_RE.match(text)
+    if zip_match:
+        return zip_match.group(1)
+    for suffix in _SUFFIXES:
+        if text.endswith(suffix):
+            text = text[: -len(suffix)]
+    text = _NON_WORD_RE.sub(" ", text)
+    words = _SPACE_RE.sub(" ", text).strip().split(" ")
+    # Replace a trailing (possibly multi-word) state name, but keep a bare
+    # state name like "washington" as is since it may also be a city.
+    for size in (3, 2, 1):
+        if len(words) > size:
+            tail = " ".join(words[-size:])
+            if tail in US_STATES:
+                words = words[:-size] + [US_STATES[tail].lower()]
+                break
+    return " ".join(words)
+
+
+def state_name(abbreviation: str) -> str:
+    """Full state name for a two-letter code (e.g. 'MA' -> 'Massachusetts'), or the input if unknown."""
+    return STATE_NAMES.get(abbreviation.upper(), abbreviation)
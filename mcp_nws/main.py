@@ -1,8 +1,119 @@
-from fastapi import FastAPI, Query, HTTPException
-from mcp_nws.mcp_schema import MCPResource, MCPResourceList, MCPWeatherResponse
-from mcp_nws.nws_client import get_points, get_forecast, get_current_weather, geocode_location
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from fastapi import FastAPI, Query, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from mcp_nws.mcp_schema import MCPResource, MCPResourceList, MCPWeatherResponse, MCPBatchItem, MCPBatchRequest, MCPBatchResult, MCPTimeSeriesResponse
+from mcp_nws.nws_client import get_points, locate_points, points_key, get_forecast, get_current_weather, get_gridpoint, geocode_location, start_client, close_client, cache_stats, singleflight
+from mcp_nws.config import env_float, env_int
+from mcp_nws.views import shape_response
+from mcp_nws.periods import MAX_DAYS, DateRange, index_for, resolve_range
+from mcp_nws.timeseries import DEFAULT_LAYERS, MAX_HOURS, hourly_series
+from mcp_nws.encoding import FastJSONResponse, dumps
+from mcp_nws.cache import MISSING, LRUCache
+from mcp_nws.governor import UpstreamOverloaded, governor
+from mcp_nws.resilience import CircuitOpen, resilience
+from mcp_nws.prefetch import PREFETCH_ENABLED, prefetcher, tracker
+from mcp_nws.observability import Counter, Gauge, configure_logging, observe_stage, render_metrics, request_duration, stage
 
-app = FastAPI(title="MCP NWS Server")
+logger = configure_logging()
+
+UNITS = {"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"}
+# Upper bound on each upstream leg (geocode, points, forecast, observation)
+LEG_TIMEOUT = env_float("MCP_NWS_LEG_TIMEOUT", 8.0)
+# Encoded response bodies, reused while the upstream forecast/observation objects are unchanged
+body_cache = LRUCache(maxsize=env_int("MCP_NWS_BODY_CACHE_SIZE", 512))
+
+ERROR_LOCATION_NOT_FOUND = "Location not found in NWS API."
+ERROR_GEOCODE = "Could not geocode location name."
+ERROR_INVALID_DATE = "Invalid date parameter. Use ISO date, 'today', 'tomorrow', weekday name, or a range 'first..last'."
+ERROR_NO_LOCATION = "Must provide location name or lat/lon."
+ERROR_GRIDPOINT = "Hourly gridpoint data unavailable from NWS API."
+ERROR_OVERLOADED = "Upstream weather service is busy; retry after {seconds} seconds."
+BATCH_MAX_ITEMS = env_int("MCP_NWS_BATCH_MAX_ITEMS", 500)
+BATCH_MAX_CONCURRENCY = env_int("MCP_NWS_BATCH_MAX_CONCURRENCY", 32)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled upstream client for the lifetime of the server
+    await start_client()
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+    yield
+    await prefetcher.stop()
+    await close_client()
+
+
+app = FastAPI(title="MCP NWS Server", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    route = request.scope.get("route")
+    # Label by route template, not raw path, to keep metric cardinality bounded
+    endpoint = getattr(route, "path", "unmatched")
+    request_duration.observe(elapsed, endpoint=endpoint)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("request", extra={"fields": {
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "stages": response.headers.get("server-timing", ""),
+        }})
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition: latency histograms, upstream status counters and cache hit ratios."""
+    stats = cache_stats()
+    flight = singleflight.stats()
+    extra = []
+
+    def metric(kind, name, help, value=None, **labels):
+        found = next((m for m in extra if m.name == name), None)
+        if found is None:
+            found = kind(name, help)
+            extra.append(found)
+        if value is not None:
+            found.set(value, **labels)
+        return found
+
+    metric(Counter, "mcp_nws_singleflight_calls_total", "Calls through request coalescing.", flight["calls"])
+    metric(Counter, "mcp_nws_singleflight_coalesced_total", "Calls that joined an in-flight request.", flight["coalesced"])
+    metric(Gauge, "mcp_nws_singleflight_inflight", "Upstream requests in flight.", flight["inflight"])
+    if "grid" in stats:
+        grid = stats.pop("grid")
+        metric(Counter, "mcp_nws_grid_local_hits_total", "Grid cells computed locally.", grid["local_hits"])
+        metric(Counter, "mcp_nws_grid_boundary_cases_total", "Coordinates left to /points.", grid["boundary_cases"])
+    prefetch = prefetcher.stats()
+    metric(Gauge, "mcp_nws_prefetch_tracked", "Locations tracked for prefetching.", prefetch.pop("tracked"))
+    for name, value in prefetch.items():
+        metric(Counter, f"mcp_nws_prefetch_{name}_total", f"Prefetch {name.replace('_', ' ')}.", value)
+    guard = resilience.stats()
+    metric(Gauge, "mcp_nws_open_circuits", "Circuit breakers not closed.", guard["open_circuits"])
+    metric(Gauge, "mcp_nws_retry_budget_tokens", "Retries currently allowed by the retry budget.", guard["retry_tokens"])
+    hedge = metric(Gauge, "mcp_nws_hedge_delay_seconds", "Delay before a hedged request, by endpoint type.")
+    for kind, delay in guard["hedge_delay"].items():
+        hedge.set(delay, kind=kind)
+    for host, host_stats in governor.stats().items():
+        for name, value in host_stats.items():
+            if name in ("active", "waiting"):
+                metric(Gauge, f"mcp_nws_upstream_{name}", f"Upstream requests {name}, by host.", value, host=host)
+            else:
+                metric(Counter, f"mcp_nws_upstream_{name}_total", f"Upstream requests {name}, by host.", value, host=host)
+    stats["body"] = body_cache.stats()
+    return PlainTextResponse(render_metrics(stats, extra), media_type="text/plain; version=0.0.4")
 
 @app.get("/resources", response_model=MCPResourceList)
 def list_resources():
@@ -11,7 +122,15 @@ def list_resources():
             id="nws-weather",
             name="National Weather Service Weather",
             description="Get current and forecast weather for a given latitude and longitude.",
-            parameters={"lat": "float", "lon": "float"},
+            parameters={
+                "lat": "float",
+                "lon": "float",
+                "date": "str (optional, ISO date, 'today', 'tomorrow', weekday name, or range 'first..last')",
+                "days": f"int (optional, 1-{MAX_DAYS}, number of days from 'date' or today)",
+                "daypart": "str (optional, 'day' or 'night')",
+                "view": "str (optional, 'full', 'compact' or 'summary')",
+                "fields": "str (optional, comma-separated paths, e.g. 'forecast.periods.name,forecast.periods.temperature')"
+            },
             examples=[
                 {"query": "/resources/nws-weather?lat=42.36&lon=-71.06", "description": "Get weather for Boston, MA by coordinates."}
             ]
@@ -20,218 +139,455 @@ def list_resources():
             id="nws-weather-by-name",
             name="National Weather Service Weather by Location Name",
             description="Get current and forecast weather for a given US location name (city, state, or zip).",
-            parameters={"location": "str (US city, state, or zip)"},
+            parameters={
+                "location": "str (US city, state, or zip)",
+                "date": "str (optional, ISO date, 'today', 'tomorrow', weekday name, or range 'first..last')",
+                "days": f"int (optional, 1-{MAX_DAYS}, number of days from 'date' or today)",
+                "daypart": "str (optional, 'day' or 'night')",
+                "view": "str (optional, 'full', 'compact' or 'summary')",
+                "fields": "str (optional, comma-separated paths, e.g. 'forecast.periods.name,forecast.periods.temperature')"
+            },
+            examples=[
+                {"query": "/resources/nws-weather-by-name?location=Boston,MA", "description": "Get weather for Boston, MA by name."},
+                {"query": "/resources/nws-weather-by-name?location=Boston,MA&view=compact", "description": "Compact period list for Boston, MA."},
+                {"query": "/resources/nws-weather-by-name?location=Boston,MA&days=3&daypart=day", "description": "Daytime forecast for the next three days."},
+                {"query": "/resources/nws-weather-by-name?location=Boston,MA&date=friday..sunday", "description": "Forecast for the weekend."}
+            ]
+        ),
+        MCPResource(
+            id="nws-weather-batch",
+            name="National Weather Service Weather for Many Locations",
+            description="POST a list of coordinates and/or location names; results stream back as newline-delimited JSON in completion order.",
+            parameters={
+                "items": "list of {location: str} or {lat: float, lon: float}, each with optional date, days and daypart",
+                "concurrency": "int (optional, default 8)",
+                "view": "str (optional, 'full', 'compact' or 'summary')",
+                "fields": "str (optional, comma-separated paths)"
+            },
             examples=[
-                {"query": "/resources/nws-weather-by-name?location=Boston,MA", "description": "Get weather for Boston, MA by name."}
+                {
+                    "query": "/resources/nws-weather-batch",
+                    "body": {"items": [{"location": "Boston,MA"}, {"lat": 39.74, "lon": -104.99, "date": "tomorrow"}]},
+                    "description": "Get weather for Boston by name and Denver by coordinates."
+                }
             ]
         )
     ]
+    hourly_parameters = {
+        "layers": f"str (optional, comma-separated NWS gridpoint layers, default '{','.join(DEFAULT_LAYERS)}')",
+        "hours": f"int (optional, 1-{MAX_HOURS}, default 48)",
+        "aggregate": "str (optional, 'daily' for min/max/mean per local day)"
+    }
+    resources += [
+        MCPResource(
+            id="nws-hourly",
+            name="National Weather Service Hourly Series",
+            description="Get hourly series (temperature, precipitation probability, wind, ...) from NWS raw gridpoint data for a latitude and longitude.",
+            parameters={"lat": "float", "lon": "float", **hourly_parameters},
+            examples=[
+                {"query": "/resources/nws-hourly?lat=42.36&lon=-71.06&hours=72&aggregate=daily", "description": "Next 72 hours for Boston, MA with daily min/max/mean."}
+            ]
+        ),
+        MCPResource(
+            id="nws-hourly-by-name",
+            name="National Weather Service Hourly Series by Location Name",
+            description="Get hourly series from NWS raw gridpoint data for a US location name (city, state, or zip).",
+            parameters={"location": "str (US city, state, or zip)", **hourly_parameters},
+            examples=[
+                {"query": "/resources/nws-hourly-by-name?location=Denver,CO&layers=temperature,windGust", "description": "Hourly temperature and wind gusts for Denver, CO."}
+            ]
+        ),
+    ]
     resource_examples = [
         {"query": "/resources", "description": "List all available weather resources."}
     ]
     return MCPResourceList(resources=resources, examples=resource_examples)
 
-@app.get("/resources/nws-weather", response_model=MCPWeatherResponse)
-async def get_weather_resource(
-    lat: float = Query(..., description="Latitude"),
-    lon: float = Query(..., description="Longitude"),
-    date: str = Query(None, description="Optional. ISO date 'YYYY-MM-DD', 'today', 'tomorrow', or weekday name 'Monday'-'Sunday'")
-):
-    print(f"[DEBUG] [MCP] Received request: /resources/nws-weather?lat={lat}&lon={lon}&date={date}")
-    print(f"[DEBUG] /resources/nws-weather called with lat={lat}, lon={lon}, date={date}")
-    print("[DEBUG] Calling get_points...")
-    points = await get_points(lat, lon)
-    print(f"[DEBUG] get_points result: {points}")
-    if not points:
-        return MCPWeatherResponse(
-            location=f"{lat},{lon}",
-            resolved_city="",
-            resolved_state="",
-            lat=lat,
-            lon=lon,
-            units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-            current={},
-            forecast={},
-            status="error",
-            message="Location not found in NWS API."
-        )
-    grid_id = points["properties"]["gridId"]
-    grid_x = points["properties"]["gridX"]
-    grid_y = points["properties"]["gridY"]
-    forecast = await get_forecast(grid_id, grid_x, grid_y)
-    current = await get_current_weather(lat, lon)
-    forecast_data = forecast["properties"] if forecast else {}
-    if date and forecast_data.get("periods"):
-        from datetime import datetime, timedelta
-        import calendar
-        now = datetime.now()
-        date_lower = date.lower()
-        target = None
-        date_parse_error = False
-        if date_lower == "today":
-            target = now.date()
-        elif date_lower == "tomorrow":
-            target = (now + timedelta(days=1)).date()
-        elif date_lower in [d.lower() for d in calendar.day_name]:
-            days_ahead = (list(calendar.day_name).index(date_lower.capitalize()) - now.weekday()) % 7
-            target = (now + timedelta(days=days_ahead)).date()
-        else:
-            try:
-                target = datetime.strptime(date, "%Y-%m-%d").date()
-            except Exception:
-                date_parse_error = True
-        if date_parse_error or target is None:
-            return MCPWeatherResponse(
-                location=f"{lat},{lon}",
-                resolved_city="",
-                resolved_state="",
-                lat=lat,
-                lon=lon,
-                units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-                current=current["properties"] if current else {},
-                forecast={},
-                status="error",
-                message="Invalid date parameter. Use ISO date, 'today', 'tomorrow', or weekday name."
-            )
-        filtered = [p for p in forecast_data["periods"] if datetime.fromisoformat(p["startTime"]).date() == target]
-        if not filtered:
-            return MCPWeatherResponse(
-                location=f"{lat},{lon}",
-                resolved_city="",
-                resolved_state="",
-                lat=lat,
-                lon=lon,
-                units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-                current=current["properties"] if current else {},
-                forecast={},
-                status="error",
-                message=f"No forecast available for date: {date}"
-            )
-        forecast_data = {**forecast_data, "periods": filtered}
-    return MCPWeatherResponse(
-        location=f"{lat},{lon}",
-        resolved_city="",
-        resolved_state="",
+async def _timed_leg(name: str, coro, timings: Dict[str, float], timeout: Optional[float] = None) -> Optional[Any]:
+    """Await one upstream call with a timeout, recording its duration in ms.
+
+    A timeout or transport error yields None so the remaining legs can still
+    produce a partial response.
+    """
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(coro, LEG_TIMEOUT if timeout is None else timeout)
+    except (asyncio.TimeoutError, httpx.HTTPError, ValueError, CircuitOpen) as e:
+        logger.warning("upstream leg failed", extra={"fields": {"stage": name, "error": repr(e)}})
+        return None
+    finally:
+        elapsed = time.perf_counter() - start
+        observe_stage(name, elapsed)
+        timings[name] = elapsed * 1000
+
+
+def _response(
+    location: str,
+    city: str,
+    state: str,
+    lat: float,
+    lon: float,
+    current: Dict[str, Any],
+    forecast: Dict[str, Any],
+    status: str = "ok",
+    message: str = "",
+) -> MCPWeatherResponse:
+    # Every value comes from this module or already-parsed upstream JSON, so
+    # skip pydantic validation of the (large) nested forecast dicts.
+    return MCPWeatherResponse.model_construct(
+        location=location,
+        resolved_city=city,
+        resolved_state=state,
         lat=lat,
         lon=lon,
-        units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-        current=current["properties"] if current else {},
-        forecast=forecast_data,
-        status="ok",
-        message=""
+        units=UNITS,
+        current=current,
+        forecast=forecast,
+        status=status,
+        message=message,
     )
 
-@app.get("/resources/nws-weather-by-name", response_model=MCPWeatherResponse)
-async def get_weather_by_name(
-    location: str = Query(..., description="US city, state, or zip"),
-    date: str = Query(None, description="Optional. ISO date 'YYYY-MM-DD', 'today', 'tomorrow', or weekday name 'Monday'-'Sunday'")
-):
-    print(f"[DEBUG] [MCP] Received request: /resources/nws-weather-by-name?location={location}&date={date}")
-    print(f"[DEBUG] /resources/nws-weather-by-name called with location={location}, date={date}")
-    print("[DEBUG] Calling geocode_location...")
-    geo = await geocode_location(location)
-    print(f"[DEBUG] geocode_location result: {geo}")
-    if not geo:
-        return MCPWeatherResponse(
-            location=location,
-            resolved_city="",
-            resolved_state="",
-            lat=0.0,
-            lon=0.0,
-            units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-            current={},
-            forecast={},
-            status="error",
-            message="Could not geocode location name."
+
+def _server_timing(response: Response, timings: Dict[str, float]) -> None:
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
+def _retry_after(error: UpstreamOverloaded) -> int:
+    return max(math.ceil(error.retry_after), 1)
+
+
+def _overloaded(
+    location: str, lat: float, lon: float, error: UpstreamOverloaded, series: bool = False
+) -> FastJSONResponse:
+    """503 with the usual error envelope (the time-series one for ``series``), so clients back off instead of retrying at once."""
+    seconds = _retry_after(error)
+    message = ERROR_OVERLOADED.format(seconds=seconds)
+    if series:
+        result = _series_response(location, lat, lon, "error", message)
+    else:
+        result = _response(location, "", "", lat, lon, {}, {}, "error", message)
+    return FastJSONResponse(dumps(result), status_code=503, headers={"Retry-After": str(seconds)})
+
+
+def _shape(result: MCPWeatherResponse, view: str, fields: Optional[str]) -> MCPWeatherResponse:
+    """Apply the requested view and field projection to current/forecast."""
+    if view != "full" or fields:
+        result.current, result.forecast = shape_response(view, fields, result.current, result.forecast)
+    return result
+
+
+def _render(
+    result: MCPWeatherResponse,
+    view: str,
+    fields: Optional[str],
+    timings: Dict[str, float],
+    sources: Dict[str, Any],
+) -> FastJSONResponse:
+    """Shape and encode a response, reusing a cached body when nothing it depends on changed.
+
+    The body depends on the request shape and on the upstream forecast and
+    observation objects; the HTTP cache hands out the same objects until they
+    are refetched, so an identity check is enough to tell the body is current.
+    The resolved date range is part of the key, so "today" moves on at the
+    forecast's local midnight.
+    """
+    body = None
+    if sources:
+        key = (
+            result.location, result.resolved_city, result.resolved_state, result.lat, result.lon,
+            result.status, result.message, sources.get("dates"), view, fields,
         )
-    lat, lon = geo["lat"], geo["lon"]
-    city = geo.get("city", "")
-    state = geo.get("state", "")
-    # Round to 4 decimal places to avoid NWS redirect
-    lat = round(lat, 4)
-    lon = round(lon, 4)
-    points = await get_points(lat, lon)
+        cached = body_cache.get(key)
+        if cached is not MISSING and cached[0] is sources.get("forecast") and cached[1] is sources.get("current"):
+            body = cached[2]
+    if body is None:
+        with stage("serialization", timings):
+            body = dumps(_shape(result, view, fields))
+        if sources:
+            body_cache.set(key, (sources.get("forecast"), sources.get("current"), body))
+    response = FastJSONResponse(body)
+    _server_timing(response, timings)
+    return response
+
+
+def _filter_forecast_by_date(
+    forecast_data: Dict[str, Any], date: Optional[str], days: Optional[int], daypart: Optional[str]
+) -> Tuple[Dict[str, Any], Optional[DateRange], str]:
+    """Keep only the forecast periods in the requested local date range and daypart.
+
+    Returns (forecast, resolved range, error message).
+    """
+    index = index_for(forecast_data)
+    dates = resolve_range(date, days, index.today())
+    if dates is None:
+        return {}, None, ERROR_INVALID_DATE
+    filtered = index.select(dates[0], dates[1], daypart)
+    if not filtered:
+        return {}, dates, f"No forecast available for date: {date or dates[0].isoformat()}"
+    return {**forecast_data, "periods": filtered}, dates, ""
+
+
+async def _weather_for_point(
+    location: str,
+    city: str,
+    state: str,
+    lat: float,
+    lon: float,
+    date: Optional[str],
+    timings: Dict[str, float],
+    sources: Optional[Dict[str, Any]] = None,
+    days: Optional[int] = None,
+    daypart: Optional[str] = None,
+    points: Optional[Dict[str, Any]] = None,
+    local: bool = True,
+) -> MCPWeatherResponse:
+    """Shared pipeline: grid lookup, then forecast and observation fetched concurrently.
+
+    The raw upstream bodies, and the date range the forecast was filtered
+    to, are recorded in ``sources`` when given. ``points`` is a grid cell
+    already resolved by the caller; ``local=False`` skips the local grid
+    lookup for a point the caller already failed to resolve.
+    """
+    if points is None:
+        points = await _timed_leg("points", get_points(lat, lon, local=local), timings)
     if not points:
-        return MCPWeatherResponse(
-            location=f"{location} ({lat},{lon})",
-            resolved_city=city,
-            resolved_state=state,
-            lat=lat,
-            lon=lon,
-            units={"temperature": "F", "wind_speed": "mph", "precipitation": "%", "distance": "mi"},
-            current={},
-            forecast={},
-            status="error",
-            message="Location not found in NWS API."
-        )
+        return _response(location, city, state, lat, lon, {}, {}, "error", ERROR_LOCATION_NOT_FOUND)
     grid_id = points["properties"]["gridId"]
     grid_x = points["properties"]["gridX"]
     grid_y = points["properties"]["gridY"]
-    forecast = await get_forecast(grid_id, grid_x, grid_y)
-    current = await get_current_weather(lat, lon)
-    units = {
-        "temperature": "F",
-        "wind_speed": "mph",
-        "precipitation": "%",
-        "distance": "mi"
-    }
+    tracker.record(lat, lon, grid_id, grid_x, grid_y)
+    # The two legs are independent, so latency is the slower of the two
+    forecast, current = await asyncio.gather(
+        _timed_leg("forecast", get_forecast(grid_id, grid_x, grid_y), timings),
+        _timed_leg("observation", get_current_weather(lat, lon), timings),
+    )
+    if sources is not None:
+        sources["forecast"], sources["current"] = forecast, current
+    missing = [name for name, data in (("forecast", forecast), ("current conditions", current)) if not data]
     forecast_data = forecast["properties"] if forecast else {}
-    if date and forecast_data.get("periods"):
-        from datetime import datetime, timedelta
-        import calendar
-        now = datetime.now()
-        date_lower = date.lower()
-        target = None
-        date_parse_error = False
-        if date_lower == "today":
-            target = now.date()
-        elif date_lower == "tomorrow":
-            target = (now + timedelta(days=1)).date()
-        elif date_lower in [d.lower() for d in calendar.day_name]:
-            days_ahead = (list(calendar.day_name).index(date_lower.capitalize()) - now.weekday()) % 7
-            target = (now + timedelta(days=days_ahead)).date()
-        else:
-            try:
-                target = datetime.strptime(date, "%Y-%m-%d").date()
-            except Exception:
-                date_parse_error = True
-        if date_parse_error or target is None:
-            return MCPWeatherResponse(
-                location=f"{location} ({lat},{lon})",
-                resolved_city=city,
-                resolved_state=state,
-                lat=lat,
-                lon=lon,
-                units=units,
-                current=current["properties"] if current else {},
-                forecast={},
-                status="error",
-                message="Invalid date parameter. Use ISO date, 'today', 'tomorrow', or weekday name."
+    current_data = current["properties"] if current else {}
+    if (date or days or daypart) and forecast_data.get("periods"):
+        with stage("date_filter", timings):
+            forecast_data, dates, error = _filter_forecast_by_date(forecast_data, date, days, daypart)
+        if sources is not None:
+            sources["dates"] = (dates, daypart)
+        if error:
+            return _response(location, city, state, lat, lon, current_data, {}, "error", error)
+    message = f"Partial result: {' and '.join(missing)} unavailable." if missing else ""
+    return _response(location, city, state, lat, lon, current_data, forecast_data, "ok", message)
+
+@app.get("/resources/nws-weather", response_model=MCPWeatherResponse, response_class=FastJSONResponse)
+async def get_weather_resource(
+    lat: float = Query(..., description="Latitude"),
+    lon: float = Query(..., description="Longitude"),
+    date: str = Query(None, description="Optional. ISO date 'YYYY-MM-DD', 'today', 'tomorrow', weekday name 'Monday'-'Sunday', or a range 'first..last' of those"),
+    days: int = Query(None, ge=1, le=MAX_DAYS, description="Optional. Number of days starting at 'date' (default today), e.g. 3 for the next three days"),
+    daypart: str = Query(None, pattern="^(day|night)$", description="Optional. Only 'day' or only 'night' periods"),
+    view: str = Query("full", pattern="^(full|compact|summary)$", description="Optional. 'full' (raw NWS data), 'compact' (normalized period list) or 'summary'"),
+    fields: str = Query(None, description="Optional. Comma-separated paths to keep, e.g. 'forecast.periods.name,forecast.periods.temperature,current.textDescription'")
+):
+    logger.debug("nws-weather", extra={"fields": {"lat": lat, "lon": lon, "date": date, "days": days, "view": view}})
+    timings: Dict[str, float] = {}
+    sources: Dict[str, Any] = {}
+    try:
+        result = await _weather_for_point(f"{lat},{lon}", "", "", lat, lon, date, timings, sources, days, daypart)
+    except UpstreamOverloaded as e:
+        return _overloaded(f"{lat},{lon}", lat, lon, e)
+    return _render(result, view, fields, timings, sources)
+
+async def _weather_by_name(
+    location: str,
+    date: Optional[str],
+    timings: Dict[str, float],
+    sources: Optional[Dict[str, Any]] = None,
+    days: Optional[int] = None,
+    daypart: Optional[str] = None,
+) -> MCPWeatherResponse:
+    geo = await _timed_leg("geocode", geocode_location(location), timings)
+    if not geo:
+        return _response(location, "", "", 0.0, 0.0, {}, {}, "error", ERROR_GEOCODE)
+    # Round to 4 decimal places to avoid NWS redirect
+    lat = round(geo["lat"], 4)
+    lon = round(geo["lon"], 4)
+    return await _weather_for_point(
+        f"{location} ({lat},{lon})", geo.get("city", ""), geo.get("state", ""), lat, lon, date, timings, sources, days, daypart
+    )
+
+@app.get("/resources/nws-weather-by-name", response_model=MCPWeatherResponse, response_class=FastJSONResponse)
+async def get_weather_by_name(
+    location: str = Query(..., description="US city, state, or zip"),
+    date: str = Query(None, description="Optional. ISO date 'YYYY-MM-DD', 'today', 'tomorrow', weekday name 'Monday'-'Sunday', or a range 'first..last' of those"),
+    days: int = Query(None, ge=1, le=MAX_DAYS, description="Optional. Number of days starting at 'date' (default today), e.g. 3 for the next three days"),
+    daypart: str = Query(None, pattern="^(day|night)$", description="Optional. Only 'day' or only 'night' periods"),
+    view: str = Query("full", pattern="^(full|compact|summary)$", description="Optional. 'full' (raw NWS data), 'compact' (normalized period list) or 'summary'"),
+    fields: str = Query(None, description="Optional. Comma-separated paths to keep, e.g. 'forecast.periods.name,forecast.periods.temperature,current.textDescription'")
+):
+    logger.debug("nws-weather-by-name", extra={"fields": {"location": location, "date": date, "days": days, "view": view}})
+    timings: Dict[str, float] = {}
+    sources: Dict[str, Any] = {}
+    try:
+        result = await _weather_by_name(location, date, timings, sources, days, daypart)
+    except UpstreamOverloaded as e:
+        return _overloaded(location, 0.0, 0.0, e)
+    return _render(result, view, fields, timings, sources)
+
+async def fetch_weather(
+    location: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    date: Optional[str] = None,
+    days: Optional[int] = None,
+    daypart: Optional[str] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
+    points: Optional[Dict[str, Any]] = None,
+    local: bool = True,
+) -> MCPWeatherResponse:
+    """Weather for a name or a point without going through HTTP.
+
+    Used by batch items and by in-process callers (``weather_tools``), which
+    share this process's caches and upstream client. Errors, including an
+    overloaded upstream, come back as an error envelope rather than raising.
+    ``points`` and ``local`` are passed on for a lat/lon lookup.
+    """
+    timings: Dict[str, float] = {}
+    try:
+        if location:
+            result = await _weather_by_name(location, date, timings, None, days, daypart)
+        elif lat is not None and lon is not None:
+            result = await _weather_for_point(
+                f"{lat},{lon}", "", "", lat, lon, date, timings, None, days, daypart, points, local
             )
-        filtered = [p for p in forecast_data["periods"] if datetime.fromisoformat(p["startTime"]).date() == target]
-        if not filtered:
-            return MCPWeatherResponse(
-                location=f"{location} ({lat},{lon})",
-                resolved_city=city,
-                resolved_state=state,
-                lat=lat,
-                lon=lon,
-                units=units,
-                current=current["properties"] if current else {},
-                forecast={},
-                status="error",
-                message=f"No forecast available for date: {date}"
+        else:
+            return _response("", "", "", 0.0, 0.0, {}, {}, "error", ERROR_NO_LOCATION)
+    except UpstreamOverloaded as e:
+        message = ERROR_OVERLOADED.format(seconds=_retry_after(e))
+        return _response(location or "", "", "", lat or 0.0, lon or 0.0, {}, {}, "error", message)
+    return _shape(result, view, fields)
+
+async def _stream_batch(items, concurrency: int, view: str = "full", fields: Optional[str] = None):
+    """Yield one NDJSON line per item as soon as it completes."""
+    semaphore = asyncio.Semaphore(concurrency)
+    # Resolve the grid cells of all lat/lon items in one vectorized pass
+    located = await locate_points(
+        (item.lat, item.lon) for item in items if not item.location and item.lat is not None and item.lon is not None
+    )
+
+    async def run(index: int, item: MCPBatchItem) -> MCPBatchResult:
+        points, local = None, True
+        if not item.location and item.lat is not None and item.lon is not None:
+            key = points_key(item.lat, item.lon)
+            if key in located:
+                points, local = located[key], False
+        async with semaphore:
+            result = await fetch_weather(
+                item.location, item.lat, item.lon, item.date, item.days, item.daypart, view, fields, points, local
             )
-        forecast_data = {**forecast_data, "periods": filtered}
-    return MCPWeatherResponse(
-        location=f"{location} ({lat},{lon})",
-        resolved_city=city,
-        resolved_state=state,
+            return MCPBatchResult.model_construct(index=index, result=result)
+
+    tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            yield dumps(result) + b"\n"
+    finally:
+        # Client went away or something failed: don't keep fetching for nobody
+        for task in tasks:
+            task.cancel()
+
+@app.post("/resources/nws-weather-batch", response_class=StreamingResponse)
+async def get_weather_batch(request: MCPBatchRequest):
+    logger.debug("nws-weather-batch", extra={"fields": {"items": len(request.items), "concurrency": request.concurrency}})
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items; the limit is {BATCH_MAX_ITEMS}.")
+    concurrency = min(request.concurrency, BATCH_MAX_CONCURRENCY)
+    return StreamingResponse(_stream_batch(request.items, concurrency, request.view, request.fields), media_type="application/x-ndjson")
+
+
+def _zone(name: Optional[str]):
+    try:
+        return ZoneInfo(name) if name else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def _series_response(location: str, lat: float, lon: float, status: str = "ok", message: str = "", **data: Any) -> MCPTimeSeriesResponse:
+    return MCPTimeSeriesResponse.model_construct(
+        location=location,
         lat=lat,
         lon=lon,
-        units=units,
-        current=current["properties"] if current else {},
-        forecast=forecast_data,
-        status="ok",
-        message=""
+        time_zone=data.pop("time_zone", "UTC"),
+        start=data.get("start", ""),
+        step=data.get("step", "PT1H"),
+        hours=data.get("hours", 0),
+        units=data.get("units", {}),
+        series=data.get("series", {}),
+        daily=data.get("daily", {}),
+        status=status,
+        message=message,
     )
+
+
+async def _hourly_for_point(
+    location: str, lat: float, lon: float, layers: str, hours: int, aggregate: Optional[str], timings: Dict[str, float]
+) -> MCPTimeSeriesResponse:
+    """Grid lookup, then the raw gridpoint layers decoded to hourly series from the current hour."""
+    # Daily buckets need the local timezone, which a locally computed cell may lack
+    points = await _timed_leg("points", get_points(lat, lon, need_time_zone=aggregate == "daily"), timings)
+    if not points:
+        return _series_response(location, lat, lon, "error", ERROR_LOCATION_NOT_FOUND)
+    props = points["properties"]
+    gridpoint = await _timed_leg("gridpoint", get_gridpoint(props["gridId"], props["gridX"], props["gridY"]), timings)
+    if not gridpoint:
+        return _series_response(location, lat, lon, "error", ERROR_GRIDPOINT)
+    tz = _zone(props.get("timeZone"))
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    names = [name.strip() for name in layers.split(",") if name.strip()]
+    with stage("decode", timings):
+        data = hourly_series(gridpoint["properties"], names, start, hours, tz, aggregate)
+    return _series_response(location, lat, lon, time_zone=str(tz), **data)
+
+
+def _render_series(result: MCPTimeSeriesResponse, timings: Dict[str, float]) -> FastJSONResponse:
+    with stage("serialization", timings):
+        response = FastJSONResponse(dumps(result))
+    _server_timing(response, timings)
+    return response
+
+
+@app.get("/resources/nws-hourly", response_model=MCPTimeSeriesResponse, response_class=FastJSONResponse)
+async def get_hourly_resource(
+    lat: float = Query(..., description="Latitude"),
+    lon: float = Query(..., description="Longitude"),
+    layers: str = Query(",".join(DEFAULT_LAYERS), description="Optional. Comma-separated NWS gridpoint layers, e.g. 'temperature,dewpoint,windGust,quantitativePrecipitation'"),
+    hours: int = Query(48, ge=1, le=MAX_HOURS, description="Optional. Number of hourly slots from the current hour"),
+    aggregate: str = Query(None, pattern="^daily$", description="Optional. 'daily' adds min/max/mean per local day")
+):
+    logger.debug("nws-hourly", extra={"fields": {"lat": lat, "lon": lon, "layers": layers, "hours": hours}})
+    timings: Dict[str, float] = {}
+    try:
+        result = await _hourly_for_point(f"{lat},{lon}", lat, lon, layers, hours, aggregate, timings)
+    except UpstreamOverloaded as e:
+        return _overloaded(f"{lat},{lon}", lat, lon, e, series=True)
+    return _render_series(result, timings)
+
+
+@app.get("/resources/nws-hourly-by-name", response_model=MCPTimeSeriesResponse, response_class=FastJSONResponse)
+async def get_hourly_by_name(
+    location: str = Query(..., description="US city, state, or zip"),
+    layers: str = Query(",".join(DEFAULT_LAYERS), description="Optional. Comma-separated NWS gridpoint layers, e.g. 'temperature,dewpoint,windGust,quantitativePrecipitation'"),
+    hours: int = Query(48, ge=1, le=MAX_HOURS, description="Optional. Number of hourly slots from the current hour"),
+    aggregate: str = Query(None, pattern="^daily$", description="Optional. 'daily' adds min/max/mean per local day")
+):
+    logger.debug("nws-hourly-by-name", extra={"fields": {"location": location, "layers": layers, "hours": hours}})
+    timings: Dict[str, float] = {}
+    try:
+        geo = await _timed_leg("geocode", geocode_location(location), timings)
+        if not geo:
+            result = _series_response(location, 0.0, 0.0, "error", ERROR_GEOCODE)
+        else:
+            lat, lon = round(geo["lat"], 4), round(geo["lon"], 4)
+            result = await _hourly_for_point(f"{location} ({lat},{lon})", lat, lon, layers, hours, aggregate, timings)
+    except UpstreamOverloaded as e:
+        return _overloaded(location, 0.0, 0.0, e, series=True)
+    return _render_series(result, timings)
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Optional
+
+from mcp_nws.periods import MAX_DAYS
 
 class MCPResource(BaseModel):
     id: str
@@ -29,3 +31,35 @@ class MCPWeatherResponse(BaseModel):
     forecast: Dict[str, Any] = Field(..., description="Full NWS forecast data.")
     status: str = Field("ok", description="Status of the response, e.g., 'ok' or 'error'.")
     message: str = Field("", description="Additional information or error message.")
+
+class MCPBatchItem(BaseModel):
+    location: Optional[str] = Field(None, description="US city, state, or zip. Used instead of lat/lon when given.")
+    lat: Optional[float] = Field(None, description="Latitude (degrees, WGS84).")
+    lon: Optional[float] = Field(None, description="Longitude (degrees, WGS84).")
+    date: Optional[str] = Field(None, description="Optional ISO date 'YYYY-MM-DD', 'today', 'tomorrow', weekday name, or a range 'first..last'.")
+    days: Optional[int] = Field(None, ge=1, le=MAX_DAYS, description="Optional number of days starting at date (default today).")
+    daypart: Optional[Literal["day", "night"]] = Field(None, description="Optional: only 'day' or only 'night' periods.")
+
+class MCPBatchRequest(BaseModel):
+    items: List[MCPBatchItem] = Field(..., description="Locations to fetch weather for.")
+    concurrency: int = Field(8, ge=1, description="Maximum number of items processed at the same time.")
+    view: Literal["full", "compact", "summary"] = Field("full", description="Response view applied to every item.")
+    fields: Optional[str] = Field(None, description="Comma-separated paths to keep in every item.")
+
+class MCPBatchResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request.")
+    result: MCPWeatherResponse = Field(..., description="Weather response for the item.")
+
+class MCPTimeSeriesResponse(BaseModel):
+    location: str = Field(..., description="User-provided or resolved location name.")
+    lat: float = Field(..., description="Latitude used for NWS query (degrees, WGS84, 4 decimal places).")
+    lon: float = Field(..., description="Longitude used for NWS query (degrees, WGS84, 4 decimal places).")
+    time_zone: str = Field("UTC", description="Timezone used for daily aggregation.")
+    start: str = Field("", description="Start of the first hourly slot (ISO 8601, UTC).")
+    step: str = Field("PT1H", description="Spacing of the hourly slots.")
+    hours: int = Field(0, description="Number of hourly slots in each series.")
+    units: Dict[str, str] = Field(default_factory=dict, description="Unit of each series, e.g. temperature (F), windSpeed (mph).")
+    series: Dict[str, List[Optional[float]]] = Field(default_factory=dict, description="Hourly values per layer; null where NWS has no data.")
+    daily: Dict[str, Dict[str, List[Any]]] = Field(default_factory=dict, description="Per local day date/min/max/mean (and sum for accumulations) per layer, when aggregate=daily.")
+    status: str = Field("ok", description="Status of the response, e.g., 'ok' or 'error'.")
+    message: str = Field("", description="Additional information or error message.")
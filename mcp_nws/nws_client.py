@@ -1,11 +1,282 @@
+import asyncio
+import logging
+import os
+import time
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Tuple
+from urllib.parse import urlsplit
+from mcp_nws.config import env_int, env_float, env_bool
+from mcp_nws.cache import MISSING, LRUCache, TieredCache, open_store
+from mcp_nws.locations import normalize_location
+from mcp_nws.gazetteer import get_gazetteer
+from mcp_nws.grid import GridEngine
+from mcp_nws.http_cache import HTTPCache
+from mcp_nws.singleflight import SingleFlight
+from mcp_nws.governor import UpstreamOverloaded, flow, governor, parse_retry_after
+from mcp_nws.resilience import CircuitOpen, RETRYABLE, resilience
+from mcp_nws.observability import resilience_events, upstream_responses
 
 NWS_API_BASE = "https://api.weather.gov"
 NOMINATIM_API_BASE = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "mcp-nws-demo/1.0 (contact: example@example.com)"
+
+logger = logging.getLogger(__name__)
+
+# Upstream connection pool settings (override with environment variables)
+MAX_CONNECTIONS = env_int("MCP_NWS_MAX_CONNECTIONS", 100)
+MAX_KEEPALIVE_CONNECTIONS = env_int("MCP_NWS_MAX_KEEPALIVE_CONNECTIONS", 20)
+KEEPALIVE_EXPIRY = env_float("MCP_NWS_KEEPALIVE_EXPIRY", 30.0)
+HTTP2_ENABLED = env_bool("MCP_NWS_HTTP2", True)
+
+# Per-host timeouts; anything not listed uses DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = httpx.Timeout(env_float("MCP_NWS_TIMEOUT", 10.0), connect=5.0)
+HOST_TIMEOUTS = {
+    "api.weather.gov": httpx.Timeout(env_float("MCP_NWS_NWS_TIMEOUT", 10.0), connect=5.0),
+    "nominatim.openstreetmap.org": httpx.Timeout(env_float("MCP_NWS_NOMINATIM_TIMEOUT", 5.0), connect=3.0),
+}
+
+# Grid point lookups (/points) almost never change for a coordinate, so they
+# are cached for a long time in memory and on disk.
+POINTS_CACHE_TTL = env_float("MCP_NWS_POINTS_CACHE_TTL", 30 * 24 * 3600.0)
+points_cache = TieredCache(
+    LRUCache(maxsize=env_int("MCP_NWS_POINTS_CACHE_SIZE", 4096), ttl=POINTS_CACHE_TTL),
+    open_store("points.sqlite3", table="points", maxsize=env_int("MCP_NWS_POINTS_CACHE_DISK_SIZE", 20000)),
+)
+
+# Geocoding results keyed by the normalized query. Names Nominatim cannot
+# resolve are cached as None for a shorter time.
+GEOCODE_CACHE_TTL = env_float("MCP_NWS_GEOCODE_CACHE_TTL", 30 * 24 * 3600.0)
+GEOCODE_NEGATIVE_TTL = env_float("MCP_NWS_GEOCODE_NEGATIVE_TTL", 3600.0)
+geocode_cache = TieredCache(
+    LRUCache(maxsize=env_int("MCP_NWS_GEOCODE_CACHE_SIZE", 10000), ttl=GEOCODE_CACHE_TTL),
+    open_store("geocode.sqlite3", table="geocode") if env_bool("MCP_NWS_GEOCODE_CACHE_PERSIST", True) else None,
+)
+
+# Forecast and observation responses, cached per endpoint type according to
+# their Cache-Control/Expires headers and revalidated with ETag/Last-Modified.
+# Stale entries with explicit freshness headers are served for up to
+# STALE_WHILE_REVALIDATE seconds past expiry while a background request
+# refreshes them.
+STALE_WHILE_REVALIDATE = env_float("MCP_NWS_STALE_WHILE_REVALIDATE", 600.0)
+response_caches = {
+    "forecast": HTTPCache(
+        max_entries=env_int("MCP_NWS_FORECAST_CACHE_SIZE", 2000),
+        max_bytes=env_int("MCP_NWS_FORECAST_CACHE_BYTES", 64 * 1024 * 1024),
+        stale_while_revalidate=STALE_WHILE_REVALIDATE,
+    ),
+    "observation": HTTPCache(
+        max_entries=env_int("MCP_NWS_OBSERVATION_CACHE_SIZE", 2000),
+        max_bytes=env_int("MCP_NWS_OBSERVATION_CACHE_BYTES", 16 * 1024 * 1024),
+        stale_while_revalidate=STALE_WHILE_REVALIDATE,
+    ),
+    # Raw gridpoint bodies are large (every weather element for 7 days)
+    "gridpoint": HTTPCache(
+        max_entries=env_int("MCP_NWS_GRIDPOINT_CACHE_SIZE", 500),
+        max_bytes=env_int("MCP_NWS_GRIDPOINT_CACHE_BYTES", 128 * 1024 * 1024),
+        stale_while_revalidate=STALE_WHILE_REVALIDATE,
+    ),
+}
+
+# Grid cells computed locally from learned office grid definitions, so most
+# /points round trips can be skipped (see mcp_nws/grid.py)
+LOCAL_GRID_ENABLED = env_bool("MCP_NWS_LOCAL_GRID", True)
+grid_engine = GridEngine(open_store("grid.sqlite3", table="offices"))
+if os.environ.get("MCP_NWS_CWA_BOUNDARIES"):
+    grid_engine.load_boundaries(os.environ["MCP_NWS_CWA_BOUNDARIES"])
+
+# Identical upstream requests in flight at the same time share one call
+singleflight = SingleFlight()
+
+# Background refreshes started for stale-while-revalidate; kept so they aren't garbage collected
+_background: set = set()
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (installed by httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client() -> httpx.AsyncClient:
+    """Build a pooled upstream client shared by all NWS and Nominatim calls."""
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED and _http2_available(),
+        limits=limits,
+        timeout=DEFAULT_TIMEOUT,
+        headers={"User-Agent": USER_AGENT},
+        follow_redirects=True,
+    )
+
+
+async def start_client() -> httpx.AsyncClient:
+    """Open the shared client. Called from the FastAPI lifespan on startup."""
+    return get_client()
+
+
+async def close_client() -> None:
+    """Close the shared client and release pooled connections."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily for the running event loop.
+
+    Pooled connections are bound to the loop that opened them, so a client
+    created under a different loop (e.g. a TestClient used without its
+    lifespan) is replaced rather than reused.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = create_client()
+        _client_loop = loop
+    return _client
+
+
+def cache_stats() -> Dict[str, Any]:
+    stats = {"points": points_cache.stats(), "geocode": geocode_cache.stats(), "grid": grid_engine.stats()}
+    for kind, cache in response_caches.items():
+        stats[kind] = cache.stats()
+    return stats
+
+
+def timeout_for(url: str) -> httpx.Timeout:
+    return HOST_TIMEOUTS.get(urlsplit(url).hostname or "", DEFAULT_TIMEOUT)
+
+
+async def _get(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GET through the host's governor; raises UpstreamOverloaded when throttled or queued too long."""
+    host = urlsplit(url).hostname or ""
+    async with governor.slot(host):
+        try:
+            resp = await get_client().get(url, params=params, headers=headers, timeout=timeout_for(url))
+        except httpx.HTTPError as e:
+            upstream_responses.inc(host=host, status=type(e).__name__)
+            raise
+    upstream_responses.inc(host=host, status=str(resp.status_code))
+    retry_after = parse_retry_after(resp.headers.get("retry-after"))
+    if resp.status_code == 429 or (resp.status_code == 503 and retry_after is not None):
+        raise UpstreamOverloaded(host, governor.back_off(host, retry_after))
+    return resp
+
+
+async def _get_cached_json(url: str, kind: str) -> Optional[Dict[str, Any]]:
+    """GET a JSON resource through the HTTP cache for its endpoint type."""
+    entry, stale = response_caches[kind].lookup(url)
+    if entry is None:
+        return await refresh(url, kind)
+    if stale:
+        _refresh_in_background(url, kind)
+    return entry.body
+
+
+async def refresh(url: str, kind: str) -> Optional[Dict[str, Any]]:
+    """Fetch or revalidate a cached resource now, sharing any request already in flight."""
+    cache = response_caches[kind]
+    return await singleflight.do(("GET", url), lambda: _fetch_cached_json(url, kind, cache))
+
+
+async def _background_refresh(url: str, kind: str) -> None:
+    flow.set("background")
+    await refresh(url, kind)
+
+
+def _refresh_in_background(url: str, kind: str) -> None:
+    task = asyncio.ensure_future(_background_refresh(url, kind))
+    _background.add(task)
+    task.add_done_callback(_background_done)
+
+
+def _background_done(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("background refresh failed", extra={"fields": {"error": repr(task.exception())}})
+
+
+def expires_in(url: str, kind: str) -> Optional[float]:
+    """Seconds until a cached resource goes stale (negative once stale), or None if not cached."""
+    entry = response_caches[kind].get(url)
+    return None if entry is None else entry.expires_at - time.time()
+
+
+def _server_error(resp: httpx.Response) -> bool:
+    return resp.status_code >= 500
+
+
+def breaker_key(url: str, kind: str) -> str:
+    """Forecast and gridpoint calls are isolated per forecast office; other endpoint types share one breaker."""
+    if kind in ("forecast", "gridpoint") and "/gridpoints/" in url:
+        return url.split("/gridpoints/", 1)[1].split("/", 1)[0]
+    return kind
+
+
+async def _fetch_cached_json(url: str, kind: str, cache: HTTPCache) -> Optional[Dict[str, Any]]:
+    entry = cache.get(url)
+    try:
+        resp = await resilience.call(
+            kind, breaker_key(url, kind), lambda: _get(url, headers=cache.conditional_headers(entry)), _server_error
+        )
+    except (CircuitOpen, UpstreamOverloaded) + RETRYABLE:
+        if entry is None:
+            raise
+        resp = None
+    if (resp is None or _server_error(resp)) and entry is not None:
+        # Upstream is failing: an old answer beats no answer
+        resilience_events.inc(event="cache_fallback", kind=kind)
+        return entry.body
+    if resp.status_code == 304 and entry is not None:
+        cache.revalidated(url, resp)
+        return entry.body
+    if resp.status_code == 200:
+        body = resp.json()
+        cache.store(url, resp, body)
+        return body
+    return None
+
 
 async def geocode_location(location: str) -> Optional[Dict[str, float]]:
-    """Geocode a location name to latitude and longitude using Nominatim."""
+    """Geocode a location name to latitude and longitude.
+
+    An exact offline gazetteer match is tried first, then the geocode cache;
+    on a miss the gazetteer's fuzzy match and finally Nominatim are asked.
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        result = gazetteer.exact(location)
+        if result is not None:
+            return result
+    key = normalize_location(location)
+    cached = await geocode_cache.aget(key)
+    if cached is not MISSING:
+        return cached
+    return await singleflight.do(("geocode", key), lambda: _resolve_geocode(location, key))
+
+async def _resolve_geocode(location: str, key: str) -> Optional[Dict[str, float]]:
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        # The fuzzy scan is CPU-bound: keep it off the event loop, and cache
+        # what it finds so repeats stop at the geocode cache
+        result = await asyncio.to_thread(gazetteer.close_match, location)
+        if result is not None:
+            await geocode_cache.aset(key, result)
+            return result
+    return await _fetch_geocode(location, key)
+
+async def _fetch_geocode(location: str, key: str) -> Optional[Dict[str, float]]:
     params = {
         "q": location,
         "format": "json",
@@ -13,37 +284,115 @@ async def geocode_location(location: str) -> Optional[Dict[str, float]]:
         "limit": 1,
         "countrycodes": "us"
     }
-    headers = {"User-Agent": "mcp-nws-demo/1.0 (contact: example@example.com)"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(NOMINATIM_API_BASE, params=params, headers=headers)
-        if resp.status_code == 200 and resp.json():
-            data = resp.json()[0]
-            address = data.get("address", {})
-            city = address.get("city") or address.get("town") or address.get("village") or address.get("hamlet") or address.get("municipality") or address.get("county") or ""
-            state = address.get("state") or address.get("state_code") or ""
-            return {"lat": float(data["lat"]), "lon": float(data["lon"]), "city": city, "state": state}
-        return None
-
-async def get_points(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    resp = await _get(NOMINATIM_API_BASE, params=params)
+    if resp.status_code == 200 and resp.json():
+        data = resp.json()[0]
+        address = data.get("address", {})
+        city = address.get("city") or address.get("town") or address.get("village") or address.get("hamlet") or address.get("municipality") or address.get("county") or ""
+        state = address.get("state") or address.get("state_code") or ""
+        result = {"lat": float(data["lat"]), "lon": float(data["lon"]), "city": city, "state": state}
+        await geocode_cache.aset(key, result)
+        return result
+    if resp.status_code == 200:
+        # Nominatim answered but found nothing; don't ask again for a while
+        await geocode_cache.aset(key, None, ttl=GEOCODE_NEGATIVE_TTL)
+    return None
+
+def points_key(lat: float, lon: float) -> str:
+    # NWS only accepts 4 decimal places, so that is the natural cache granularity
+    return f"{round(lat, 4)},{round(lon, 4)}"
+
+async def get_points(
+    lat: float, lon: float, need_time_zone: bool = False, local: bool = True
+) -> Optional[Dict[str, Any]]:
+    """Grid cell (and timeZone when known) for a coordinate.
+
+    A locally computed cell carries the office's learned timezone; with
+    ``need_time_zone`` a cell whose timezone is unknown is fetched from
+    ``/points`` instead. ``local=False`` skips the local lookup, for points
+    that ``locate_points`` already failed to resolve.
+    """
+    key = points_key(lat, lon)
+    cached = await points_cache.aget(key)
+    if cached is not MISSING:
+        return cached
+    if local and LOCAL_GRID_ENABLED:
+        located = grid_engine.locate(lat, lon)
+        if located is not None:
+            points = _local_points(*located, need_time_zone=need_time_zone)
+            if points is not None:
+                return points
+    return await singleflight.do(("points", key), lambda: _fetch_points(lat, lon, key))
+
+def _local_points(grid_id: str, grid_x: int, grid_y: int, need_time_zone: bool = False) -> Optional[Dict[str, Any]]:
+    props = {"gridId": grid_id, "gridX": grid_x, "gridY": grid_y}
+    time_zone = grid_engine.time_zone(grid_id)
+    if time_zone:
+        props["timeZone"] = time_zone
+    if time_zone or not need_time_zone:
+        return {"properties": props}
+    return None
+
+async def locate_points(coords: Iterable[Tuple[float, float]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Grid cells for a batch of coordinates, computed in one vectorized pass.
+
+    Maps ``points_key`` to the cached or locally computed answer, or to None
+    when the point needs ``/points`` (fetch it with ``get_points(...,
+    local=False)``). Coordinates missing from the result were not looked up
+    locally at all, e.g. when numpy or the local grid is unavailable.
+    """
+    located: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending: Dict[str, Tuple[float, float]] = {}
+    for lat, lon in coords:
+        key = points_key(lat, lon)
+        if key in located or key in pending:
+            continue
+        cached = await points_cache.aget(key)
+        if cached is not MISSING:
+            located[key] = cached
+        else:
+            pending[key] = (lat, lon)
+    if not pending or not LOCAL_GRID_ENABLED or not grid_engine.vectorized:
+        return located
+    lats, lons = zip(*pending.values())
+    offices, grid_x, grid_y, resolved = grid_engine.locate_many(lats, lons)
+    for i, key in enumerate(pending):
+        located[key] = _local_points(offices[i], int(grid_x[i]), int(grid_y[i])) if resolved[i] else None
+    return located
+
+async def _fetch_points(lat: float, lon: float, key: str) -> Optional[Dict[str, Any]]:
     url = f"{NWS_API_BASE}/points/{lat},{lon}"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, follow_redirects=True)
-        if resp.status_code == 200:
-            return resp.json()
-        return None
+    resp = await resilience.call("points", "points", lambda: _get(url), _server_error)
+    if resp.status_code == 200:
+        data = resp.json()
+        await points_cache.aset(key, data)
+        props = data.get("properties") or {}
+        if {"gridId", "gridX", "gridY"} <= props.keys():
+            office = props["gridId"]
+            definition = grid_engine.learn(
+                lat, lon, office, props["gridX"], props["gridY"], props.get("timeZone"), persist=False
+            )
+            if definition is not None and grid_engine.store is not None:
+                # Keep the SQLite write off the event loop
+                await asyncio.to_thread(grid_engine.store.set, office, definition)
+        return data
+    return None
+
+def forecast_url(grid_id: str, grid_x: int, grid_y: int) -> str:
+    return f"{NWS_API_BASE}/gridpoints/{grid_id}/{grid_x},{grid_y}/forecast"
+
+def gridpoint_url(grid_id: str, grid_x: int, grid_y: int) -> str:
+    return f"{NWS_API_BASE}/gridpoints/{grid_id}/{grid_x},{grid_y}"
+
+def observation_url(lat: float, lon: float) -> str:
+    return f"{NWS_API_BASE}/points/{lat},{lon}/observations/latest"
 
 async def get_forecast(grid_id: str, grid_x: int, grid_y: int) -> Optional[Dict[str, Any]]:
-    url = f"{NWS_API_BASE}/gridpoints/{grid_id}/{grid_x},{grid_y}/forecast"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, follow_redirects=True)
-        if resp.status_code == 200:
-            return resp.json()
-        return None
+    return await _get_cached_json(forecast_url(grid_id, grid_x, grid_y), "forecast")
+
+async def get_gridpoint(grid_id: str, grid_x: int, grid_y: int) -> Optional[Dict[str, Any]]:
+    """Raw gridpoint data: every weather element as validTime-interval time series."""
+    return await _get_cached_json(gridpoint_url(grid_id, grid_x, grid_y), "gridpoint")
 
 async def get_current_weather(lat: float, lon: float) -> Optional[Dict[str, Any]]:
-    url = f"{NWS_API_BASE}/points/{lat},{lon}/observations/latest"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, follow_redirects=True)
-        if resp.status_code == 200:
-            return resp.json()
-        return None
+    return await _get_cached_json(observation_url(lat, lon), "observation")
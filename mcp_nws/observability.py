@@ -0,0 +1,178 @@
+"""Structured logging, stage timing and Prometheus-style metrics."""
+import json
+import logging
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LOG_LEVEL = os.environ.get("MCP_NWS_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("MCP_NWS_LOG_FORMAT", "json")
+
+# Seconds; spans cache hits (sub-millisecond) to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any ``fields`` passed via extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(name: str = "mcp_nws") -> logging.Logger:
+    """Attach a stderr handler to the package logger once; level/format come from the environment."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        if LOG_FORMAT == "json":
+            handler.setFormatter(JSONFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    return logger
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: Iterable[Tuple[str, str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        """Record a total that is counted elsewhere (e.g. a component's stats)."""
+        self.values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self.values.items())]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        series = self.series.get(key)
+        if series is None:
+            # one count per bucket, then sum and count
+            series = self.series[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+
+class Gauge(Counter):
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+request_duration = Histogram("mcp_nws_request_duration_seconds", "End-to-end request latency by endpoint.")
+stage_duration = Histogram("mcp_nws_stage_duration_seconds", "Latency of each request stage.")
+upstream_responses = Counter("mcp_nws_upstream_responses_total", "Upstream HTTP responses by host and status.")
+resilience_events = Counter("mcp_nws_resilience_events_total", "Hedges, retries, circuit breaker and cache fallback events by endpoint type.")
+
+METRICS = [request_duration, stage_duration, upstream_responses, resilience_events]
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    stage_duration.observe(seconds, stage=name)
+
+
+@contextmanager
+def stage(name: str, timings: Optional[Dict[str, float]] = None):
+    """Time a block as a named stage; also records milliseconds into ``timings`` when given."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe_stage(name, elapsed)
+        if timings is not None:
+            timings[name] = elapsed * 1000
+
+
+def _cache_metrics(cache_stats: Dict[str, Dict]) -> List[str]:
+    hits = Counter("mcp_nws_cache_hits_total", "Cache hits by cache.")
+    misses = Counter("mcp_nws_cache_misses_total", "Cache misses by cache.")
+    ratio = Gauge("mcp_nws_cache_hit_ratio", "Cache hit ratio by cache.")
+    size = Gauge("mcp_nws_cache_entries", "Entries held by cache.")
+    stale = Counter("mcp_nws_cache_stale_hits_total", "Stale entries served while being refreshed, by cache.")
+    for name, stats in cache_stats.items():
+        if not stats or "hits" not in stats:
+            continue
+        hits.set(stats["hits"], cache=name)
+        misses.set(stats["misses"], cache=name)
+        total = stats["hits"] + stats["misses"]
+        ratio.set(stats["hits"] / total if total else 0.0, cache=name)
+        if "size" in stats:
+            size.set(stats["size"], cache=name)
+        elif stats.get("memory"):
+            size.set(stats["memory"]["size"], cache=name)
+        if "stale_hits" in stats:
+            stale.set(stats["stale_hits"], cache=name)
+    return hits.render() + misses.render() + ratio.render() + size.render() + stale.render()
+
+
+def render_metrics(cache_stats: Dict[str, Dict], extra: Optional[Iterable] = None) -> str:
+    """Prometheus text exposition of all metrics plus cache statistics and ``extra`` metrics."""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _cache_metrics(cache_stats)
+    for metric in extra or ():
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,117 @@
+"""Forecast period index and date/date-range resolution.
+
+NWS forecast periods carry local start times (``2026-10-18T18:00:00-04:00``).
+The index parses them once per forecast body and groups periods by local
+date and daypart (``day``/``night``), so date filters are dictionary lookups
+and "today" is evaluated in the forecast's own timezone rather than the
+server's.
+"""
+import calendar
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_nws.cache import MISSING, LRUCache
+from mcp_nws.config import env_int
+
+DAYPARTS = ("day", "night")
+# NWS forecasts cover about a week; longer spans only select nothing
+MAX_DAYS = 14
+# Inclusive (first, last) local dates
+DateRange = Tuple[date, date]
+
+_WEEKDAYS = [name.lower() for name in calendar.day_name]
+
+
+class PeriodIndex:
+    def __init__(self, periods: List[Dict[str, Any]]):
+        self.periods = periods
+        self.tz: Optional[tzinfo] = None
+        self.by_date: Dict[date, List[int]] = {}
+        self.by_daypart: Dict[Tuple[date, str], List[int]] = {}
+        for i, period in enumerate(periods):
+            try:
+                start = datetime.fromisoformat(period["startTime"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if self.tz is None:
+                self.tz = start.tzinfo
+            day = start.date()
+            self.by_date.setdefault(day, []).append(i)
+            daypart = "day" if period.get("isDaytime", True) else "night"
+            self.by_daypart.setdefault((day, daypart), []).append(i)
+        self.dates = sorted(self.by_date)
+
+    def today(self, now: Optional[datetime] = None) -> date:
+        """Today's date where the forecast is, not where the server is."""
+        if now is None:
+            return datetime.now(self.tz).date()
+        return now.astimezone(self.tz).date() if self.tz is not None else now.date()
+
+    def select(self, first: date, last: date, daypart: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Periods starting on a local date in [first, last], optionally only day or night ones."""
+        selected: List[Dict[str, Any]] = []
+        for day in self.dates:
+            if first <= day <= last:
+                indices = self.by_daypart.get((day, daypart), []) if daypart else self.by_date[day]
+                selected.extend(self.periods[i] for i in indices)
+        return selected
+
+
+# Indexes are keyed by the identity of the forecast properties the HTTP cache
+# hands out; a refetched forecast is a new object and gets a new index.
+_indexes = LRUCache(maxsize=env_int("MCP_NWS_PERIOD_INDEX_SIZE", 1024))
+
+
+def index_for(forecast: Dict[str, Any]) -> PeriodIndex:
+    key = id(forecast)
+    cached = _indexes.get(key)
+    if cached is not MISSING and cached[0] is forecast:
+        return cached[1]
+    index = PeriodIndex(forecast.get("periods") or [])
+    _indexes.set(key, (forecast, index))
+    return index
+
+
+def resolve_date(text: str, today: date) -> Optional[date]:
+    """Map 'today', 'tomorrow', a weekday name or 'YYYY-MM-DD' to a date, or None if invalid."""
+    text = text.strip().lower()
+    if text == "today":
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+    try:
+        if text in _WEEKDAYS:
+            return today + timedelta(days=(_WEEKDAYS.index(text) - today.weekday()) % 7)
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except (OverflowError, ValueError):
+        return None
+
+
+def resolve_range(text: Optional[str], days: Optional[int], today: date) -> Optional[DateRange]:
+    """Resolve a ``date`` value and optional ``days`` count to an inclusive date range.
+
+    ``date`` is a single date or ``first..last`` (each part as accepted by
+    ``resolve_date``, a weekday ``last`` counted from ``first``); ``days``
+    (1 to ``MAX_DAYS``) counts days from the date, or from today if no date is
+    given. Returns None for invalid input.
+    """
+    if days is not None and not 1 <= days <= MAX_DAYS:
+        return None
+    if text and ".." in text:
+        if days is not None:
+            return None
+        first_text, _, last_text = text.partition("..")
+        first = resolve_date(first_text, today)
+        # A weekday ends the range on its first occurrence from the start, so
+        # "friday..sunday" is one weekend whichever day it is asked on
+        last = resolve_date(last_text, first if first and last_text.strip().lower() in _WEEKDAYS else today)
+        if first is None or last is None or last < first:
+            return None
+        return first, last
+    first = resolve_date(text, today) if text else today
+    if first is None:
+        return None
+    try:
+        return first, first + timedelta(days=(days or 1) - 1)
+    except OverflowError:
+        return None
@@ -0,0 +1,188 @@
+"""Background refresh of forecasts and observations for popular locations.
+
+Requests record which grid cells they hit; a scheduler periodically picks the
+most popular ones (decayed request count, so recent traffic dominates) and
+refreshes their cached forecast and observation shortly before they expire,
+so the next request is served from a fresh cache entry. Each cycle is capped
+in size and concurrency and is skipped while live traffic has many upstream
+calls in flight, so prefetching never competes with real requests.
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from mcp_nws import nws_client
+from mcp_nws.config import env_bool, env_float, env_int
+from mcp_nws.governor import flow
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = env_bool("MCP_NWS_PREFETCH", True)
+
+LocationKey = Tuple[float, float]
+
+
+@dataclass
+class HotLocation:
+    lat: float
+    lon: float
+    grid_id: str
+    grid_x: int
+    grid_y: int
+    score: float
+    last_seen: float
+
+
+class PopularityTracker:
+    """Exponentially decayed request counts per location, bounded to ``maxsize`` entries.
+
+    A request adds 1 to its location's score; scores halve every
+    ``half_life`` seconds, so a location that was busy an hour ago ranks
+    below one that is moderately busy now.
+    """
+
+    def __init__(self, maxsize: int = 1000, half_life: float = 1800.0):
+        self.maxsize = maxsize
+        self.half_life = half_life
+        self._entries: Dict[LocationKey, HotLocation] = {}
+
+    def _decayed(self, entry: HotLocation, now: float) -> float:
+        return entry.score * math.pow(0.5, (now - entry.last_seen) / self.half_life)
+
+    def record(self, lat: float, lon: float, grid_id: str, grid_x: int, grid_y: int, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        key = (round(lat, 4), round(lon, 4))
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.maxsize:
+                coldest = min(self._entries, key=lambda k: self._decayed(self._entries[k], now))
+                del self._entries[coldest]
+            self._entries[key] = HotLocation(key[0], key[1], grid_id, grid_x, grid_y, 1.0, now)
+            return
+        entry.score = self._decayed(entry, now) + 1.0
+        entry.last_seen = now
+        entry.grid_id, entry.grid_x, entry.grid_y = grid_id, grid_x, grid_y
+
+    def top(self, n: int, now: Optional[float] = None) -> List[HotLocation]:
+        now = time.time() if now is None else now
+        ranked = sorted(self._entries.values(), key=lambda e: self._decayed(e, now), reverse=True)
+        return ranked[:n]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Prefetcher:
+    """Periodically refresh the hottest locations' cache entries before they expire."""
+
+    def __init__(
+        self,
+        tracker: PopularityTracker,
+        interval: float = 60.0,
+        top_n: int = 50,
+        max_per_cycle: int = 20,
+        concurrency: int = 2,
+        lead_time: float = 120.0,
+        max_inflight: int = 50,
+    ):
+        self.tracker = tracker
+        self.interval = interval
+        self.top_n = top_n
+        self.max_per_cycle = max_per_cycle
+        self.concurrency = concurrency
+        self.lead_time = lead_time
+        self.max_inflight = max_inflight
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.skipped_cycles = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def due(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """(url, kind) pairs for hot locations whose cached data is missing or expires within the lead time."""
+        jobs: List[Tuple[str, str]] = []
+        for hot in self.tracker.top(self.top_n, now):
+            for url, kind in (
+                (nws_client.forecast_url(hot.grid_id, hot.grid_x, hot.grid_y), "forecast"),
+                (nws_client.observation_url(hot.lat, hot.lon), "observation"),
+            ):
+                remaining = nws_client.expires_in(url, kind)
+                if remaining is None or remaining < self.lead_time:
+                    jobs.append((url, kind))
+                if len(jobs) >= self.max_per_cycle:
+                    return jobs
+        return jobs
+
+    async def run_once(self) -> int:
+        """Run one prefetch cycle; returns the number of refreshes attempted."""
+        self.cycles += 1
+        if nws_client.singleflight.inflight() > self.max_inflight:
+            self.skipped_cycles += 1
+            return 0
+        jobs = self.due()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(url: str, kind: str) -> None:
+            # Queued behind live requests at the upstream governor
+            flow.set("background")
+            async with semaphore:
+                try:
+                    await nws_client.refresh(url, kind)
+                    self.refreshes += 1
+                except Exception as exc:
+                    self.failures += 1
+                    logger.debug("prefetch failed", extra={"fields": {"url": url, "error": repr(exc)}})
+
+        await asyncio.gather(*(refresh(url, kind) for url, kind in jobs))
+        return len(jobs)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("prefetch cycle failed")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tracked": len(self.tracker),
+            "cycles": self.cycles,
+            "skipped_cycles": self.skipped_cycles,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+tracker = PopularityTracker(
+    maxsize=env_int("MCP_NWS_PREFETCH_TRACKED", 1000),
+    half_life=env_float("MCP_NWS_PREFETCH_HALF_LIFE", 1800.0),
+)
+prefetcher = Prefetcher(
+    tracker,
+    interval=env_float("MCP_NWS_PREFETCH_INTERVAL", 60.0),
+    top_n=env_int("MCP_NWS_PREFETCH_TOP", 50),
+    max_per_cycle=env_int("MCP_NWS_PREFETCH_MAX_PER_CYCLE", 20),
+    concurrency=env_int("MCP_NWS_PREFETCH_CONCURRENCY", 2),
+    lead_time=env_float("MCP_NWS_PREFETCH_LEAD_TIME", 120.0),
+    max_inflight=env_int("MCP_NWS_PREFETCH_MAX_INFLIGHT", 50),
+)
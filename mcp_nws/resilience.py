@@ -0,0 +1,274 @@
+"""Tail-latency protection for upstream calls: hedging, retries and circuit breakers.
+
+* Hedged requests: when an attempt has not answered after the recent p95
+  latency for its endpoint type, a second identical attempt is started and
+  whichever answers first wins.
+* Retries: failed attempts (transport errors, attempt timeouts, 5xx) are
+  retried with full-jitter exponential backoff.
+* Retry budget: hedges and retries draw from one token bucket that refills
+  with a fraction of normal traffic, so a struggling upstream sees at most
+  ``ratio`` extra load instead of a retry storm.
+* Circuit breakers: after ``threshold`` consecutive failed calls for a key
+  (a forecast office, or the endpoint type) calls fail fast with
+  ``CircuitOpen`` for ``reset_timeout`` seconds, then a single probe is let
+  through. Callers fall back to cached data while the circuit is open.
+
+Every decision is counted in ``mcp_nws_resilience_events_total``.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from mcp_nws.config import env_bool, env_float, env_int
+from mcp_nws.observability import resilience_events
+
+T = TypeVar("T")
+
+# Failures worth another attempt; UpstreamOverloaded is backpressure and is never retried
+RETRYABLE = (httpx.TransportError, asyncio.TimeoutError)
+
+
+class CircuitOpen(Exception):
+    """Calls for this key are failing fast until the breaker's reset timeout passes."""
+
+    def __init__(self, key: str):
+        super().__init__(f"circuit open for {key}")
+        self.key = key
+
+
+class LatencyTracker:
+    """Sliding window of attempt latencies; ``delay()`` is the hedge delay."""
+
+    def __init__(self, window: int = 256, quantile: float = 0.95, initial: float = 1.0, floor: float = 0.05, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.quantile = quantile
+        self.initial = initial
+        self.floor = floor
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def delay(self) -> float:
+        if len(self.samples) < self.min_samples:
+            return self.initial
+        ordered = sorted(self.samples)
+        return max(ordered[min(int(len(ordered) * self.quantile), len(ordered) - 1)], self.floor)
+
+
+class RetryBudget:
+    """Tokens for extra attempts: ``ratio`` per call plus ``min_per_second``, capped at ``capacity``."""
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, capacity: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.min_per_second)
+        self.updated = now
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.probing = False
+        if self.state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call; returns True if this opened the circuit."""
+        self.failures += 1
+        self.probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            opened = self.state != self.OPEN
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return opened
+        return False
+
+    def release(self) -> None:
+        """The call ended without a verdict (e.g. shed by the governor); let another probe through."""
+        self.probing = False
+
+
+class Resilience:
+    def __init__(
+        self,
+        hedging: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_initial_delay: float = 1.0,
+        hedge_min_delay: float = 0.05,
+        max_retries: int = 2,
+        backoff: float = 0.1,
+        attempt_timeout: float = 4.0,
+        budget: Optional[RetryBudget] = None,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.attempt_timeout = attempt_timeout
+        self.budget = budget or RetryBudget()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.latency: Dict[str, LatencyTracker] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def tracker(self, kind: str) -> LatencyTracker:
+        tracker = self.latency.get(kind)
+        if tracker is None:
+            tracker = self.latency[kind] = LatencyTracker(
+                quantile=self.hedge_quantile, initial=self.hedge_initial_delay, floor=self.hedge_min_delay
+            )
+        return tracker
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+        return breaker
+
+    async def call(
+        self,
+        kind: str,
+        key: str,
+        attempt: Callable[[], Awaitable[T]],
+        is_failure: Callable[[T], bool] = lambda result: False,
+    ) -> T:
+        """Run ``attempt`` with hedging and retries behind the circuit breaker for ``key``.
+
+        Returns the last result even if ``is_failure`` still holds after the
+        retries, so callers see the upstream's own error response.
+        """
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            resilience_events.inc(event="short_circuit", kind=kind)
+            raise CircuitOpen(key)
+        self.budget.deposit()
+        retries = 0
+        while True:
+            error: Optional[BaseException] = None
+            try:
+                result = await self._hedged(kind, attempt)
+            except RETRYABLE as e:
+                error = e
+            except BaseException:
+                breaker.release()
+                raise
+            if error is None and not is_failure(result):
+                breaker.record_success()
+                return result
+            if retries >= self.max_retries or not self.budget.withdraw():
+                if retries < self.max_retries:
+                    resilience_events.inc(event="retry_denied", kind=kind)
+                if breaker.record_failure():
+                    resilience_events.inc(event="circuit_opened", kind=kind)
+                if error is not None:
+                    raise error
+                return result
+            retries += 1
+            resilience_events.inc(event="retry", kind=kind)
+            # Full jitter: spread retries out instead of synchronizing them
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** retries))
+
+    async def _attempt(self, kind: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(), self.attempt_timeout)
+        except asyncio.CancelledError:
+            # A losing hedge: its latency is at least this long, keep the tail in the window
+            self.tracker(kind).observe(time.perf_counter() - start)
+            raise
+        self.tracker(kind).observe(time.perf_counter() - start)
+        return result
+
+    async def _hedged(self, kind: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        first = asyncio.ensure_future(self._attempt(kind, attempt))
+        tasks = {first}
+        try:
+            if self.hedging:
+                done, _ = await asyncio.wait(tasks, timeout=self.tracker(kind).delay())
+                if not done and self.budget.withdraw():
+                    resilience_events.inc(event="hedge", kind=kind)
+                    tasks.add(asyncio.ensure_future(self._attempt(kind, attempt)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not first:
+                            resilience_events.inc(event="hedge_won", kind=kind)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_circuits": sum(1 for b in self.breakers.values() if b.state != CircuitBreaker.CLOSED),
+            "retry_tokens": round(self.budget.tokens, 2),
+            "hedge_delay": {kind: round(t.delay(), 4) for kind, t in self.latency.items()},
+        }
+
+
+resilience = Resilience(
+    hedging=env_bool("MCP_NWS_HEDGE", True),
+    hedge_quantile=env_float("MCP_NWS_HEDGE_QUANTILE", 0.95),
+    hedge_initial_delay=env_float("MCP_NWS_HEDGE_INITIAL_DELAY", 1.0),
+    hedge_min_delay=env_float("MCP_NWS_HEDGE_MIN_DELAY", 0.05),
+    max_retries=env_int("MCP_NWS_MAX_RETRIES", 2),
+    backoff=env_float("MCP_NWS_RETRY_BACKOFF", 0.1),
+    attempt_timeout=env_float("MCP_NWS_ATTEMPT_TIMEOUT", 4.0),
+    budget=RetryBudget(
+        ratio=env_float("MCP_NWS_RETRY_BUDGET_RATIO", 0.1),
+        min_per_second=env_float("MCP_NWS_RETRY_BUDGET_MIN_RATE", 1.0),
+        capacity=env_float("MCP_NWS_RETRY_BUDGET_CAPACITY", 10.0),
+    ),
+    breaker_threshold=env_int("MCP_NWS_BREAKER_THRESHOLD", 5),
+    breaker_reset=env_float("MCP_NWS_BREAKER_RESET", 30.0),
+)
@@ -0,0 +1,5 @@
+import os
+
+# Keep the suite out of the developer's ~/.cache/mcp_nws: every persistent
+# store falls back to memory. This runs before any test module imports mcp_nws.
+os.environ["MCP_NWS_CACHE_DIR"] = ""
@@ -0,0 +1,53 @@
+import json
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from mcp_nws.main import app
+
+client = TestClient(app)
+
+POINTS = {"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}
+FORECAST = {"properties": {"periods": []}}
+
+
+def test_batch_streams_ndjson_per_item():
+    with patch('mcp_nws.main.get_points', return_value=POINTS), \
+         patch('mcp_nws.main.get_forecast', return_value=FORECAST), \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": {}}), \
+         patch('mcp_nws.main.geocode_location', return_value={"lat": 42.36, "lon": -71.06, "city": "Boston", "state": "MA"}):
+        resp = client.post("/resources/nws-weather-batch", json={
+            "items": [{"location": "Boston,MA"}, {"lat": 42.36, "lon": -71.06}, {"date": "today"}],
+            "concurrency": 2,
+        })
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    by_index = {line["index"]: line["result"] for line in lines}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["resolved_city"] == "Boston"
+    assert by_index[1]["status"] == "ok"
+    assert by_index[2]["status"] == "error"
+
+
+def test_batch_resolves_grid_cells_together():
+    async def locate(coords):
+        assert list(coords) == [(42.36, -71.06), (10.0, -10.0)]
+        return {"42.36,-71.06": POINTS, "10.0,-10.0": None}
+
+    with patch('mcp_nws.main.locate_points', side_effect=locate), \
+         patch('mcp_nws.main.get_points', return_value=None) as get_points, \
+         patch('mcp_nws.main.get_forecast', return_value=FORECAST), \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": {}}):
+        resp = client.post("/resources/nws-weather-batch", json={
+            "items": [{"lat": 42.36, "lon": -71.06}, {"lat": 10.0, "lon": -10.0}],
+        })
+    by_index = {line["index"]: line["result"] for line in map(json.loads, resp.text.splitlines())}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["status"] == "error"
+    # Only the point the local grid could not resolve goes to /points, without a second local lookup
+    get_points.assert_called_once_with(10.0, -10.0, local=False)
+
+
+def test_batch_rejects_oversized_request():
+    with patch('mcp_nws.main.BATCH_MAX_ITEMS', 1):
+        resp = client.post("/resources/nws-weather-batch", json={"items": [{"location": "a"}, {"location": "b"}]})
+    assert resp.status_code == 413
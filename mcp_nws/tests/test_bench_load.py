@@ -0,0 +1,29 @@
+import os
+import pytest
+from mcp_nws import nws_client
+from mcp_nws.bench import bench_load
+from mcp_nws.bench.stub_upstream import StubUpstream, installed
+from mcp_nws.governor import governor
+
+
+@pytest.mark.asyncio
+async def test_load_scenarios_against_stub(monkeypatch):
+    # reset_caches swaps these for fresh memory-only caches; restore them afterwards
+    for name in ("points_cache", "geocode_cache", "grid_engine"):
+        monkeypatch.setattr(nws_client, name, getattr(nws_client, name))
+    # Measure the server, not Nominatim's one-request-per-second limit
+    monkeypatch.setattr(governor, "hosts", {})
+    stub = StubUpstream(latency=0.001, jitter=0)
+    async with installed(stub):
+        cold = await bench_load.run_scenario("cold", stub, count=5, requests=10, concurrency=4)
+        warm = await bench_load.run_scenario("warm", stub, count=5, requests=10, concurrency=4)
+        by_name = await bench_load.run_scenario("by_name", stub, count=5, requests=10, concurrency=4)
+    assert cold["requests"] == 5 and cold["errors"] == 0
+    assert cold["upstream"]["points"] == 5
+    assert warm["errors"] == 0 and warm["upstream"] == {}
+    assert by_name["errors"] == 0 and by_name["upstream"]["nominatim"] <= 10
+    assert bench_load.regressions({"warm": warm}, {"warm": {**warm, "p95_ms": warm["p95_ms"] / 10}}, 0.2)
+
+
+def test_import_leaves_environment_alone():
+    assert all(os.environ.get(name) != value for name, value in bench_load.BENCH_ENV.items() if name != "MCP_NWS_CACHE_DIR")
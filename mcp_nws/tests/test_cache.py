@@ -0,0 +1,90 @@
+import threading
+import time
+import pytest
+from mcp_nws.cache import MISSING, LRUCache, SQLiteStore, TieredCache
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_lru_ttl_expiry():
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", None)
+    assert cache.get("a") is None
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+
+
+def test_sqlite_store_persists_and_bounds_size(tmp_path):
+    path = str(tmp_path / "points.sqlite3")
+    store = SQLiteStore(path, maxsize=2)
+    store.set("a", {"gridId": "BOX"})
+    store.set("b", 2)
+    store.set("c", 3)
+    assert len(store) == 2
+    assert store.get("a") is MISSING
+    store.close()
+    reopened = SQLiteStore(path, maxsize=2)
+    assert reopened.get("c") == 3
+    assert len(reopened) == 2
+
+
+def test_sqlite_store_keeps_its_row_count(tmp_path):
+    store = SQLiteStore(str(tmp_path / "c.sqlite3"), maxsize=3)
+    store.set("a", 1)
+    store.set("a", 2)
+    store.set("b", 1, ttl=-1)
+    assert len(store) == 2
+    assert store.get("b") is MISSING  # expired rows are deleted on read
+    store.delete("a")
+    store.delete("missing")
+    assert len(store) == 0
+    for key in "wxyz":
+        store.set(key, key)
+    assert len(store) == 3 and store.evictions == 1
+    (rows,) = store._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+    assert rows == len(store)
+    store.clear()
+    assert len(store) == 0
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    store = SQLiteStore(str(tmp_path / "c.sqlite3"))
+    store.set("k", [1, 2], ttl=60)
+    cache = TieredCache(LRUCache(), store)
+    assert cache.get("k") == [1, 2]
+    assert "k" in cache.memory
+    assert cache.get("k") == [1, 2]
+    stats = cache.stats()
+    assert stats["memory"]["hits"] == 1
+    assert stats["disk"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_async_calls_use_a_worker_thread(tmp_path):
+    threads = []
+
+    class Store(SQLiteStore):
+        def get(self, key, default=MISSING):
+            threads.append(threading.current_thread())
+            return super().get(key, default)
+
+        def set(self, key, value, ttl=None):
+            threads.append(threading.current_thread())
+            super().set(key, value, ttl)
+
+    cache = TieredCache(LRUCache(), Store(str(tmp_path / "c.sqlite3")))
+    await cache.aset("k", 1, ttl=60)
+    cache.memory.clear()
+    assert await cache.aget("k") == 1
+    assert await cache.aget("k") == 1  # promoted: served from memory
+    assert await cache.aget("missing") is MISSING
+    assert len(threads) == 3 and threading.main_thread() not in threads
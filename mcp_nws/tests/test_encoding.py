@@ -0,0 +1,32 @@
+import json
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from mcp_nws import main
+from mcp_nws.encoding import dumps
+from mcp_nws.mcp_schema import MCPWeatherResponse
+
+client = TestClient(main.app)
+
+
+def test_dumps_matches_validated_model():
+    model = MCPWeatherResponse(
+        location="x", resolved_city="", resolved_state="", lat=1.0, lon=2.0,
+        units=main.UNITS, current={}, forecast={"periods": [{"name": "Today"}]},
+    )
+    assert json.loads(dumps(model)) == json.loads(model.model_dump_json())
+
+
+def test_encoded_body_reused_until_upstream_changes():
+    forecast = {"properties": {"periods": []}}
+    main.body_cache.clear()
+    main.body_cache.hits = 0
+    with patch('mcp_nws.main.get_points', return_value={"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}), \
+         patch('mcp_nws.main.get_forecast', return_value=forecast) as mock_forecast, \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": {}}):
+        first = client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+        second = client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+        assert main.body_cache.hits == 1
+        assert first.content == second.content
+        mock_forecast.return_value = {"properties": {"periods": [{"name": "Tonight"}]}}
+        third = client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+        assert third.json()["forecast"] == {"periods": [{"name": "Tonight"}]}
@@ -0,0 +1,36 @@
+import pytest
+from mcp_nws.gazetteer import Gazetteer, build
+
+PLACES = "USPS\tGEOID\tNAME\tALAND\tINTPTLAT\tINTPTLONG\n" \
+    "MA\t2507000\tBoston city\t125000000\t42.3386\t-71.0187\n" \
+    "GA\t1309016\tBoston city\t5000000\t30.7919\t-83.7896\n" \
+    "CO\t0820000\tDenver city\t400000000\t39.7621\t-104.8759\n"
+ZCTAS = "GEOID\tALAND\tINTPTLAT\tINTPTLONG\n02108\t1000\t42.3576\t-71.0644\n"
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    (tmp_path / "places.txt").write_text(PLACES)
+    (tmp_path / "zcta.txt").write_text(ZCTAS)
+    path = str(tmp_path / "gazetteer.idx")
+    assert build([str(tmp_path / "places.txt"), str(tmp_path / "zcta.txt")], path) == 6
+    g = Gazetteer(path)
+    yield g
+    g.close()
+
+
+def test_exact_lookup_matches_geocode_shape(gazetteer):
+    result = gazetteer.exact("Boston, MA")
+    assert result == {"lat": 42.3386, "lon": -71.0187, "city": "Boston", "state": "Massachusetts"}
+    assert gazetteer.exact("boston ga")["state"] == "Georgia"
+    # A bare name resolves to the largest place
+    assert gazetteer.exact("Boston")["state"] == "Massachusetts"
+    assert gazetteer.exact("02108")["lat"] == 42.3576
+    assert gazetteer.exact("Springfield, IL") is None
+
+
+def test_prefix_and_fuzzy_lookup(gazetteer):
+    assert {r["state"] for r in gazetteer.prefix("bost")} == {"Massachusetts", "Georgia"}
+    assert gazetteer.fuzzy("Bostn, MA")[0]["city"] == "Boston"
+    assert gazetteer.resolve("Denvr, Colorado")["city"] == "Denver"
+    assert gazetteer.resolve("Denvr, TX") is None
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from mcp_nws.governor import HostGovernor, UpstreamOverloaded, flow, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_fair_flows():
+    governor = HostGovernor("example.com", rate=1000, burst=1000, max_concurrency=1)
+    order = []
+
+    async def request(name, label):
+        flow.set(name)
+        await governor.acquire()
+        order.append(label)
+        await asyncio.sleep(0)
+        governor.release()
+
+    await governor.acquire()  # hold the only slot while the queue fills
+    tasks = [asyncio.ensure_future(request("background", f"b{i}")) for i in range(3)]
+    tasks += [asyncio.ensure_future(request("live", f"l{i}")) for i in range(6)]
+    await asyncio.sleep(0)
+    assert governor.waiting() == 9
+    governor.release()
+    await asyncio.gather(*tasks)
+    # Live requests get four slots for each background one, FIFO within a flow
+    assert order[:5] == ["b0", "l0", "l1", "l2", "l3"]
+    assert [x for x in order if x.startswith("b")] == ["b0", "b1", "b2"]
+    assert governor.active == 0
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_fails_fast():
+    governor = HostGovernor("example.com", rate=1000, burst=1000, max_concurrency=1, max_queue=1)
+    await governor.acquire()
+    waiter = asyncio.ensure_future(governor.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(UpstreamOverloaded):
+        await governor.acquire()
+    assert governor.rejected == 1
+    governor.release()
+    await waiter
+    governor.release()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_and_retry_after():
+    governor = HostGovernor("example.com", rate=20, burst=1, max_concurrency=10, max_wait=1.0)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(3):
+        await governor.acquire()
+        governor.release()
+    # One token up front, then one every 50 ms
+    assert loop.time() - start >= 0.09
+    governor.back_off(30)
+    with pytest.raises(UpstreamOverloaded) as excinfo:
+        await governor.acquire()
+    assert excinfo.value.retry_after > 29
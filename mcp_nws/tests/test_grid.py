@@ -0,0 +1,125 @@
+import math
+import random
+import numpy as np
+from mcp_nws.cache import SQLiteStore
+from mcp_nws.grid import GRID_SPACING, GridEngine, point_in_polygon, project
+
+# A synthetic office whose grid origin is known, standing in for /points answers
+ORIGIN_X, ORIGIN_Y = 1_950_123.4, 700_456.7
+
+
+def true_cell(lat, lon):
+    px, py = project(lat, lon)
+    return math.floor((px - ORIGIN_X) / GRID_SPACING), math.floor((py - ORIGIN_Y) / GRID_SPACING)
+
+
+def trained_engine(store=None, samples=200):
+    rng = random.Random(1)
+    engine = GridEngine(store)
+    for _ in range(samples):
+        lat, lon = rng.uniform(41.5, 43.0), rng.uniform(-72.5, -70.0)
+        engine.learn(lat, lon, "BOX", *true_cell(lat, lon))
+    return engine
+
+
+def test_locate_matches_points_after_learning():
+    engine = trained_engine()
+    rng = random.Random(2)
+    resolved = 0
+    for _ in range(200):
+        lat, lon = rng.uniform(41.7, 42.8), rng.uniform(-72.3, -70.2)
+        located = engine.locate(lat, lon)
+        if located is not None:
+            assert located == ("BOX", *true_cell(lat, lon))
+            resolved += 1
+    assert resolved > 150
+    # Outside every known office: defer to /points
+    assert engine.locate(35.0, -100.0) is None
+
+
+def test_untrained_office_is_not_trusted():
+    engine = GridEngine()
+    engine.learn(42.36, -71.06, "BOX", *true_cell(42.36, -71.06))
+    assert engine.locate(42.36, -71.06) is None
+
+
+def test_locate_many_agrees_with_locate():
+    engine = trained_engine()
+    rng = np.random.default_rng(3)
+    lats, lons = rng.uniform(41.7, 42.8, 100), rng.uniform(-72.3, -70.2, 100)
+    offices, xs, ys, resolved = engine.locate_many(lats, lons)
+    assert resolved.sum() > 50
+    for lat, lon, office, x, y, ok in zip(lats, lons, offices, xs, ys, resolved):
+        located = engine.locate(lat, lon)
+        assert located == ((office, x, y) if ok else None)
+
+    # Both paths count their hits and boundary cases the same way
+    stats = engine.stats()
+    assert stats["local_hits"] == 2 * resolved.sum()
+    assert stats["boundary_cases"] == 2 * (len(resolved) - resolved.sum())
+
+
+def test_learn_reindexes_only_its_office():
+    engine = trained_engine()
+    for i in range(3):
+        engine.learn(35.0 + i, -100.0 + i % 2, "AMA", 10 + i, 10)
+    # A sample outside BOX's hull grows its bounding box
+    engine.learn(44.0, -69.5, "BOX", *true_cell(44.0, -69.5))
+    incremental = {cell: sorted(offices) for cell, offices in engine._index.items()}
+    engine._reindex()
+    assert incremental == {cell: sorted(offices) for cell, offices in engine._index.items()}
+
+
+def test_definitions_persist(tmp_path):
+    store = SQLiteStore(str(tmp_path / "grid.sqlite3"))
+    trained_engine(store, samples=50)
+    reloaded = GridEngine(store)
+    assert reloaded.offices["BOX"].samples == 50
+    assert reloaded.locate(42.3, -71.5) in (None, ("BOX", *true_cell(42.3, -71.5)))
+
+
+def test_office_time_zone_is_learned_and_persisted(tmp_path):
+    store = SQLiteStore(str(tmp_path / "grid.sqlite3"))
+    engine = GridEngine(store)
+    engine.learn(42.36, -71.06, "BOX", *true_cell(42.36, -71.06), "America/New_York")
+    assert GridEngine(store).time_zone("BOX") == "America/New_York"
+    # An office seen in two zones has no single timezone
+    engine.learn(42.5, -71.5, "BOX", *true_cell(42.5, -71.5), "America/Chicago")
+    assert engine.time_zone("BOX") is None
+    assert engine.time_zone("ALY") is None
+
+
+def test_point_in_polygon_margin():
+    square = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    assert point_in_polygon(0.5, 0.5, square, margin=0.1)
+    assert point_in_polygon(0.05, 0.5, square)
+    assert not point_in_polygon(0.05, 0.5, square, margin=0.1)
+    assert not point_in_polygon(1.5, 0.5, square)
+
+
+def test_hull_needs_many_samples_without_a_boundary():
+    engine = trained_engine(samples=10)
+    assert engine.locate(42.3, -71.5) is None
+    assert engine.stats()["usable_offices"] == 0
+
+
+def test_point_claimed_by_two_hulls_is_left_to_points():
+    # BOX's samples form an L whose convex hull spills over the corner that
+    # ALY actually covers; the overlap must not be answered locally
+    engine = GridEngine()
+    rng = random.Random(4)
+    for _ in range(150):
+        lat, lon = rng.uniform(41.5, 42.5), rng.uniform(-73.5, -70.0)
+        engine.learn(lat, lon, "BOX", *true_cell(lat, lon))
+        lat, lon = rng.uniform(42.5, 44.0), rng.uniform(-71.5, -70.0)
+        engine.learn(lat, lon, "BOX", *true_cell(lat, lon))
+    assert engine.locate(43.0, -72.3) is not None
+    for _ in range(100):
+        lat, lon = rng.uniform(42.6, 43.5), rng.uniform(-73.4, -71.7)
+        engine.learn(lat, lon, "ALY", *true_cell(lat, lon))
+    assert point_in_polygon(-72.3, 43.0, engine.offices["BOX"].polygon)
+    assert engine.locate(43.0, -72.3) is None
+    _, _, _, resolved = engine.locate_many(np.array([43.0]), np.array([-72.3]))
+    assert not resolved[0]
+    # Well inside one office only: still local
+    assert engine.locate(42.0, -71.0) == ("BOX", *true_cell(42.0, -71.0))
@@ -0,0 +1,49 @@
+import httpx
+from mcp_nws.http_cache import HTTPCache, freshness_lifetime
+
+
+def test_freshness_lifetime_directives():
+    assert freshness_lifetime({"cache-control": "public, max-age=300, s-maxage=600"}) == 600
+    assert freshness_lifetime({"cache-control": "max-age=300", "age": "100"}) == 200
+    assert freshness_lifetime({"cache-control": "no-store"}) is None
+    assert freshness_lifetime({"cache-control": "no-cache, max-age=300"}) == 0
+    assert freshness_lifetime({
+        "date": "Sun, 18 Oct 2026 12:00:00 GMT",
+        "expires": "Sun, 18 Oct 2026 12:05:00 GMT",
+    }) == 300
+    assert freshness_lifetime({}) == 0
+
+
+def test_store_revalidate_and_evict():
+    cache = HTTPCache(max_entries=2)
+    resp = httpx.Response(200, content=b"{}", headers={"cache-control": "max-age=0", "etag": '"v1"'})
+    entry = cache.store("a", resp, {})
+    assert not entry.is_fresh()
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    cache.revalidated("a", httpx.Response(304, headers={"cache-control": "max-age=60"}))
+    assert cache.get("a").is_fresh()
+    assert cache.revalidations == 1
+    cache.store("b", resp, {})
+    cache.store("c", resp, {})
+    assert cache.get("a") is None
+    assert cache.evictions == 1
+
+
+def test_stale_while_revalidate_window():
+    cache = HTTPCache(stale_while_revalidate=30)
+    entry = cache.store("a", httpx.Response(200, content=b"{}", headers={"cache-control": "max-age=0"}), {})
+    assert entry.is_usable_stale()
+    entry = cache.store("b", httpx.Response(200, content=b"{}", headers={"cache-control": "max-age=0, stale-while-revalidate=0"}), {})
+    assert not entry.is_usable_stale()
+    entry = cache.store("c", httpx.Response(200, content=b"{}", headers={"cache-control": "max-age=0, must-revalidate"}), {})
+    assert not entry.is_usable_stale()
+
+
+def test_default_stale_window_needs_explicit_freshness():
+    cache = HTTPCache(stale_while_revalidate=30)
+    entry = cache.store("a", httpx.Response(200, content=b"{}"), {})
+    assert not entry.is_usable_stale()
+    entry = cache.store("b", httpx.Response(200, content=b"{}", headers={"last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"}), {})
+    assert entry.stale_until == entry.expires_at
+    entry = cache.store("c", httpx.Response(200, content=b"{}", headers={"expires": "Mon, 01 Jan 2024 00:00:00 GMT"}), {})
+    assert entry.is_usable_stale(entry.expires_at)
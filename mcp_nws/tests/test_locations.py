@@ -0,0 +1,20 @@
+import pytest
+from mcp_nws.locations import normalize_location, state_abbreviation
+
+
+@pytest.mark.parametrize("query", ["Boston, MA", "boston ma", "Boston,MA", " BOSTON,  Massachusetts ", "Boston, MA, USA"])
+def test_normalize_equivalent_queries(query):
+    assert normalize_location(query) == "boston ma"
+
+
+def test_normalize_multiword_state_and_zip():
+    assert normalize_location("Albany, New York") == "albany ny"
+    assert normalize_location("02101-1234") == "02101"
+    # A bare state name is left alone since it may also be a city
+    assert normalize_location("Washington") == "washington"
+
+
+def test_state_abbreviation():
+    assert state_abbreviation("Massachusetts") == "MA"
+    assert state_abbreviation("tx") == "TX"
+    assert state_abbreviation("Atlantis") == ""
@@ -1,7 +1,9 @@
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 from mcp_nws.main import app
+from mcp_nws.governor import UpstreamOverloaded
 
 client = TestClient(app)
 
@@ -51,3 +53,54 @@ def test_nws_weather_by_name_geocode_none():
             data = resp.json()
             assert data["status"] == "error"
             assert "location" in data["message"].lower()
+
+# Simulate the forecast leg failing while observations succeed: partial result with per-leg timings
+def test_nws_weather_forecast_leg_error_is_partial():
+    import httpx
+    with patch('mcp_nws.main.get_points') as mock_points, \
+         patch('mcp_nws.main.get_forecast', side_effect=httpx.ConnectError("boom")), \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": {"textDescription": "Clear"}}):
+        mock_points.return_value = {
+            "properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}
+        }
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["status"] == "ok"
+        assert data["forecast"] == {}
+        assert data["current"] == {"textDescription": "Clear"}
+        assert "forecast" in data["message"]
+        timing = resp.headers["server-timing"]
+        assert "points;dur=" in timing and "forecast;dur=" in timing and "observation;dur=" in timing
+
+# Simulate the upstream governor shedding load: 503 with the error envelope and Retry-After
+def test_nws_weather_upstream_overloaded():
+    with patch('mcp_nws.main.get_points', side_effect=UpstreamOverloaded("api.weather.gov", 2.5)):
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "3"
+        data = resp.json()
+        assert data["status"] == "error"
+        assert "retry after 3 seconds" in data["message"]
+
+# An overloaded upstream still gets the cached forecast, however old; without one it is overloaded
+@pytest.mark.asyncio
+async def test_overloaded_upstream_falls_back_to_the_cached_forecast(monkeypatch):
+    from mcp_nws import nws_client
+    from mcp_nws.http_cache import HTTPCache
+    forecast = {"properties": {"periods": []}}
+
+    async def fake_get(url, params=None, headers=None):
+        if overloaded:
+            raise UpstreamOverloaded("api.weather.gov", 2.5)
+        return httpx.Response(200, json=forecast, headers={"cache-control": "max-age=0"})
+
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    monkeypatch.setitem(nws_client.response_caches, "forecast", HTTPCache())
+    overloaded = True
+    with pytest.raises(UpstreamOverloaded):
+        await nws_client.get_forecast("BOX", 70, 76)
+    overloaded = False
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast
+    overloaded = True
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast
@@ -0,0 +1,173 @@
+import asyncio
+import httpx
+import pytest
+from mcp_nws import nws_client
+from mcp_nws.cache import LRUCache, TieredCache
+from mcp_nws.http_cache import HTTPCache
+
+
+@pytest.mark.asyncio
+async def test_shared_client_reused_and_closed():
+    client = nws_client.get_client()
+    assert nws_client.get_client() is client
+    assert nws_client.timeout_for("https://nominatim.openstreetmap.org/search") is nws_client.HOST_TIMEOUTS["nominatim.openstreetmap.org"]
+    assert nws_client.timeout_for("https://example.com/") is nws_client.DEFAULT_TIMEOUT
+    await nws_client.close_client()
+    assert client.is_closed
+    assert nws_client.get_client() is not client
+    await nws_client.close_client()
+
+
+@pytest.mark.asyncio
+async def test_get_points_served_from_cache(monkeypatch):
+    points = {"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}
+    nws_client.points_cache.memory.set(nws_client.points_key(42.36001, -71.06), points)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("upstream should not be called on a cache hit")
+
+    monkeypatch.setattr(nws_client, "_get", fail)
+    assert await nws_client.get_points(42.36, -71.06) == points
+    nws_client.points_cache.memory.clear()
+
+
+@pytest.mark.asyncio
+async def test_local_grid_cell_without_time_zone_falls_back_when_needed(monkeypatch):
+    class Engine:
+        zone = None
+
+        def locate(self, lat, lon):
+            return "BOX", 70, 76
+
+        def time_zone(self, office):
+            return self.zone
+
+    fetched = {"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76, "timeZone": "America/New_York"}}
+
+    async def fetch(lat, lon, key):
+        return fetched
+
+    engine = Engine()
+    monkeypatch.setattr(nws_client, "grid_engine", engine)
+    monkeypatch.setattr(nws_client, "LOCAL_GRID_ENABLED", True)
+    monkeypatch.setattr(nws_client, "_fetch_points", fetch)
+    assert "timeZone" not in (await nws_client.get_points(42.36, -71.06))["properties"]
+    assert await nws_client.get_points(42.36, -71.06, need_time_zone=True) is fetched
+    engine.zone = "America/New_York"
+    assert (await nws_client.get_points(42.36, -71.06, need_time_zone=True))["properties"]["timeZone"] == "America/New_York"
+
+
+@pytest.mark.asyncio
+async def test_locate_points_resolves_a_batch_in_one_pass(monkeypatch):
+    class Engine:
+        vectorized = True
+        calls = []
+
+        def locate_many(self, lats, lons):
+            self.calls.append((list(lats), list(lons)))
+            return ["BOX", ""], [70, 0], [76, 0], [True, False]
+
+        def time_zone(self, office):
+            return "America/New_York"
+
+    cached = {"properties": {"gridId": "ALY", "gridX": 1, "gridY": 2}}
+    nws_client.points_cache.memory.set(nws_client.points_key(42.65, -73.75), cached)
+    engine = Engine()
+    monkeypatch.setattr(nws_client, "grid_engine", engine)
+    monkeypatch.setattr(nws_client, "LOCAL_GRID_ENABLED", True)
+    located = await nws_client.locate_points([(42.36, -71.06), (10.0, -10.0), (42.65, -73.75), (42.36, -71.06)])
+    nws_client.points_cache.memory.clear()
+    assert engine.calls == [([42.36, 10.0], [-71.06, -10.0])]
+    assert located == {
+        "42.36,-71.06": {"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76, "timeZone": "America/New_York"}},
+        "10.0,-10.0": None,
+        "42.65,-73.75": cached,
+    }
+    monkeypatch.setattr(nws_client, "LOCAL_GRID_ENABLED", False)
+    assert await nws_client.locate_points([(42.36, -71.06)]) == {}
+
+
+@pytest.mark.asyncio
+async def test_geocode_cache_normalizes_and_caches_misses(monkeypatch):
+    calls = []
+
+    async def fake_get(url, params=None):
+        calls.append(params["q"])
+        if params["q"].startswith("Nowhere"):
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[{"lat": "42.36", "lon": "-71.06", "address": {"city": "Boston", "state": "Massachusetts"}}])
+
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    monkeypatch.setattr(nws_client, "geocode_cache", TieredCache(LRUCache()))
+    first = await nws_client.geocode_location("Boston, MA")
+    assert await nws_client.geocode_location("boston ma") == first
+    assert await nws_client.geocode_location("Nowhere, ZZ") is None
+    assert await nws_client.geocode_location("nowhere zz") is None
+    assert calls == ["Boston, MA", "Nowhere, ZZ"]
+
+
+class FakeGazetteer:
+    def __init__(self):
+        self.fuzzy_calls = 0
+
+    def exact(self, query):
+        return None
+
+    def close_match(self, query):
+        self.fuzzy_calls += 1
+        return {"lat": 39.74, "lon": -104.99, "city": "Denver", "state": "Colorado"} if query.startswith("Denvr") else None
+
+
+@pytest.mark.asyncio
+async def test_geocode_fuzzy_match_runs_once_per_name(monkeypatch):
+    gazetteer = FakeGazetteer()
+
+    async def fake_get(url, params=None):
+        return httpx.Response(200, json=[])
+
+    monkeypatch.setattr(nws_client, "get_gazetteer", lambda: gazetteer)
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    monkeypatch.setattr(nws_client, "geocode_cache", TieredCache(LRUCache()))
+    assert (await nws_client.geocode_location("Denvr, CO"))["city"] == "Denver"
+    assert (await nws_client.geocode_location("denvr co"))["city"] == "Denver"
+    assert await nws_client.geocode_location("Nowhere, ZZ") is None
+    assert await nws_client.geocode_location("Nowhere, ZZ") is None
+    # Cached names, found or not, stop before the fuzzy scan
+    assert gazetteer.fuzzy_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_forecast_revalidates_with_etag(monkeypatch):
+    requests = []
+    forecast = {"properties": {"periods": []}}
+
+    async def fake_get(url, params=None, headers=None):
+        requests.append(headers)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"cache-control": "max-age=60"})
+        return httpx.Response(200, json=forecast, headers={"cache-control": "max-age=0", "etag": '"v1"'})
+
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    monkeypatch.setitem(nws_client.response_caches, "forecast", HTTPCache())
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast  # stale: revalidated, 304
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast  # fresh: served locally
+    assert requests == [{}, {"If-None-Match": '"v1"'}]
+
+
+@pytest.mark.asyncio
+async def test_stale_forecast_served_while_refreshed(monkeypatch):
+    versions = iter([{"properties": {"v": 1}}, {"properties": {"v": 2}}])
+
+    async def fake_get(url, params=None, headers=None):
+        return httpx.Response(200, json=next(versions), headers={"cache-control": "max-age=0, stale-while-revalidate=60"})
+
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    cache = HTTPCache()
+    monkeypatch.setitem(nws_client.response_caches, "forecast", cache)
+    assert await nws_client.get_forecast("BOX", 70, 76) == {"properties": {"v": 1}}
+    # Stale within the window: the old body comes back at once and a refresh runs in the background
+    assert await nws_client.get_forecast("BOX", 70, 76) == {"properties": {"v": 1}}
+    assert cache.stale_hits == 1
+    await asyncio.gather(*nws_client._background)
+    assert cache.get(nws_client.forecast_url("BOX", 70, 76)).body == {"properties": {"v": 2}}
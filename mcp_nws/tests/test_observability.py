@@ -0,0 +1,50 @@
+import json
+import logging
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from mcp_nws.main import app
+from mcp_nws.observability import Counter, Histogram, JSONFormatter
+
+client = TestClient(app)
+
+
+def test_histogram_and_counter_exposition():
+    histogram = Histogram("h_seconds", "help", buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="points")
+    histogram.observe(0.5, stage="points")
+    lines = histogram.render()
+    assert 'h_seconds_bucket{stage="points",le="0.1"} 1' in lines
+    assert 'h_seconds_bucket{stage="points",le="+Inf"} 2' in lines
+    assert 'h_seconds_count{stage="points"} 2' in lines
+    counter = Counter("c_total", "help")
+    counter.inc(host="api.weather.gov", status="200")
+    assert 'c_total{host="api.weather.gov",status="200"} 1' in counter.render()
+
+
+def test_json_log_formatter_includes_fields():
+    record = logging.LogRecord("mcp_nws", logging.INFO, __file__, 1, "request", None, None)
+    record.fields = {"endpoint": "/resources", "status": 200}
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["msg"] == "request" and entry["status"] == 200
+
+
+def test_metrics_endpoint_reports_stages_and_caches():
+    with patch('mcp_nws.main.get_points', return_value={"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}), \
+         patch('mcp_nws.main.get_forecast', return_value={"properties": {"periods": []}}), \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": {}}):
+        client.get("/resources/nws-weather?lat=42.36&lon=-71.06")
+    text = client.get("/metrics").text
+    assert 'mcp_nws_request_duration_seconds_count{endpoint="/resources/nws-weather"}' in text
+    assert 'mcp_nws_stage_duration_seconds_count{stage="forecast"}' in text
+    assert 'mcp_nws_cache_hit_ratio{cache="points"}' in text
+    assert "mcp_nws_singleflight_coalesced_total" in text
+
+
+def test_metrics_export_totals_as_labelled_counters():
+    text = client.get("/metrics").text
+    assert "# TYPE mcp_nws_cache_hits_total counter" in text
+    assert "# TYPE mcp_nws_singleflight_calls_total counter" in text
+    assert "# TYPE mcp_nws_singleflight_inflight gauge" in text
+    assert "# TYPE mcp_nws_prefetch_cycles_total counter" in text
+    assert 'mcp_nws_hedge_delay_seconds{kind="forecast"}' in text
+    assert "mcp_nws_hedge_delay_seconds_forecast" not in text
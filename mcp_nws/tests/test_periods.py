@@ -0,0 +1,65 @@
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from mcp_nws.main import app
+from mcp_nws.periods import PeriodIndex, index_for, resolve_range
+
+PERIODS = [
+    {"name": "Tonight", "startTime": "2026-10-18T18:00:00-04:00", "isDaytime": False},
+    {"name": "Monday", "startTime": "2026-10-19T06:00:00-04:00", "isDaytime": True},
+    {"name": "Monday Night", "startTime": "2026-10-19T18:00:00-04:00", "isDaytime": False},
+    {"name": "Tuesday", "startTime": "2026-10-20T06:00:00-04:00", "isDaytime": True},
+]
+TODAY = date(2026, 10, 18)  # a Sunday
+
+
+def test_index_groups_by_local_date_and_daypart():
+    index = PeriodIndex(PERIODS)
+    assert [p["name"] for p in index.select(date(2026, 10, 19), date(2026, 10, 19))] == ["Monday", "Monday Night"]
+    assert [p["name"] for p in index.select(date(2026, 10, 18), date(2026, 10, 20), "day")] == ["Monday", "Tuesday"]
+    # 02:00 UTC on the 19th is still the evening of the 18th in the forecast's timezone
+    assert index.today(datetime(2026, 10, 19, 2, tzinfo=timezone.utc)) == TODAY
+
+
+def test_index_reused_for_same_forecast():
+    forecast = {"periods": PERIODS}
+    assert index_for(forecast) is index_for(forecast)
+    assert index_for({"periods": PERIODS}) is not index_for(forecast)
+
+
+def test_resolve_range():
+    assert resolve_range("today", None, TODAY) == (TODAY, TODAY)
+    assert resolve_range(None, 3, TODAY) == (TODAY, date(2026, 10, 20))
+    assert resolve_range("tomorrow", 2, TODAY) == (date(2026, 10, 19), date(2026, 10, 20))
+    assert resolve_range("monday..2026-10-21", None, TODAY) == (date(2026, 10, 19), date(2026, 10, 21))
+    assert resolve_range("2026-10-21..monday", None, TODAY) == (date(2026, 10, 21), date(2026, 10, 26))
+    assert resolve_range("2026-10-21..2026-10-19", None, TODAY) is None
+    assert resolve_range(None, 15, TODAY) is None
+    assert resolve_range("9999-12-31", 2, TODAY) is None
+
+
+def test_weekend_range_on_the_weekend():
+    saturday = date(2026, 10, 17)
+    assert resolve_range("friday..sunday", None, saturday) == (date(2026, 10, 23), date(2026, 10, 25))
+    assert resolve_range("saturday..sunday", None, saturday) == (saturday, date(2026, 10, 18))
+    assert resolve_range("saturday..sunday", None, TODAY) == (date(2026, 10, 24), date(2026, 10, 25))
+
+
+def test_days_beyond_the_limit_is_rejected():
+    response = TestClient(app).get("/resources/nws-weather?lat=42.36&lon=-71.06&days=10000000")
+    assert response.status_code == 422
+    assert resolve_range("today..friday", 2, TODAY) is None
+    assert resolve_range("someday", None, TODAY) is None
+
+
+def test_weather_date_range_and_daypart():
+    client = TestClient(app)
+    with patch('mcp_nws.main.get_points', return_value={"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}), \
+         patch('mcp_nws.main.get_forecast', return_value={"properties": {"periods": PERIODS}}), \
+         patch('mcp_nws.main.get_current_weather', return_value=None):
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06&date=2026-10-19..2026-10-20&daypart=day")
+        assert [p["name"] for p in resp.json()["forecast"]["periods"]] == ["Monday", "Tuesday"]
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06&date=2026-10-19&days=2")
+        assert len(resp.json()["forecast"]["periods"]) == 3
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06&date=2026-10-20..2026-10-19")
+        assert resp.json()["status"] == "error"
@@ -0,0 +1,40 @@
+import pytest
+from mcp_nws import nws_client
+from mcp_nws.prefetch import PopularityTracker, Prefetcher
+
+
+def test_tracker_ranks_by_decayed_popularity():
+    tracker = PopularityTracker(maxsize=2, half_life=60)
+    for _ in range(4):
+        tracker.record(40.0, -105.0, "BOU", 62, 61, now=0)
+    tracker.record(42.36, -71.06, "BOX", 70, 76, now=0)
+    assert [hot.grid_id for hot in tracker.top(2, now=0)] == ["BOU", "BOX"]
+    # Four requests two hours ago rank below two requests now
+    tracker.record(42.36, -71.06, "BOX", 70, 76, now=7200)
+    assert [hot.grid_id for hot in tracker.top(2, now=7200)] == ["BOX", "BOU"]
+    # Full: a new location evicts the coldest one
+    tracker.record(47.6, -122.3, "SEW", 124, 67, now=7200)
+    assert len(tracker) == 2
+    assert "BOU" not in {hot.grid_id for hot in tracker.top(2, now=7200)}
+
+
+@pytest.mark.asyncio
+async def test_prefetch_refreshes_due_entries_within_budget(monkeypatch):
+    refreshed = []
+
+    async def fake_refresh(url, kind):
+        refreshed.append(kind)
+
+    tracker = PopularityTracker()
+    tracker.record(40.0, -105.0, "BOU", 62, 61)
+    tracker.record(42.36, -71.06, "BOX", 70, 76)
+    monkeypatch.setattr(nws_client, "refresh", fake_refresh)
+    monkeypatch.setattr(nws_client, "expires_in", lambda url, kind: 600.0 if kind == "observation" else None)
+    prefetcher = Prefetcher(tracker, max_per_cycle=1)
+    assert await prefetcher.run_once() == 1
+    assert refreshed == ["forecast"]
+
+    # Busy with live traffic: the cycle is skipped
+    monkeypatch.setattr(nws_client.singleflight, "inflight", lambda: 100)
+    assert await prefetcher.run_once() == 0
+    assert prefetcher.stats()["skipped_cycles"] == 1
@@ -0,0 +1,77 @@
+import asyncio
+import httpx
+import pytest
+from mcp_nws import nws_client
+from mcp_nws.http_cache import HTTPCache
+from mcp_nws.resilience import CircuitBreaker, CircuitOpen, LatencyTracker, Resilience, RetryBudget
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(initial=1.0, floor=0.01, min_samples=10)
+    assert tracker.delay() == 1.0
+    for i in range(100):
+        tracker.observe(i / 100)
+    assert tracker.delay() == 0.95
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0)
+    assert breaker.allow()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    # Reset timeout passed: exactly one probe goes through
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_stalled_attempt():
+    policy = Resilience(hedge_initial_delay=0.01)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return "hedged"
+
+    assert await policy.call("forecast", "BOX", attempt) == "hedged"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_limited_by_budget():
+    policy = Resilience(hedging=False, max_retries=3, backoff=0, budget=RetryBudget(ratio=0, min_per_second=0, capacity=1))
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        raise httpx.ConnectError("boom")
+
+    with pytest.raises(httpx.ConnectError):
+        await policy.call("points", "points", attempt)
+    # One try plus the single retry the budget allowed
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_falls_back_to_cached_forecast(monkeypatch):
+    forecast = {"properties": {"periods": []}}
+    responses = iter([httpx.Response(200, json=forecast, headers={"cache-control": "max-age=0"})])
+
+    async def fake_get(url, params=None, headers=None):
+        return next(responses, httpx.Response(500))
+
+    policy = Resilience(hedging=False, max_retries=0, breaker_threshold=1)
+    monkeypatch.setattr(nws_client, "_get", fake_get)
+    monkeypatch.setattr(nws_client, "resilience", policy)
+    monkeypatch.setitem(nws_client.response_caches, "forecast", HTTPCache())
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast  # 500: served from cache, circuit opens
+    assert policy.breaker("BOX").state == CircuitBreaker.OPEN
+    assert await nws_client.get_forecast("BOX", 70, 76) == forecast  # short-circuited, still cached
+    with pytest.raises(CircuitOpen):
+        await nws_client.get_forecast("BOX", 1, 1)  # nothing cached to fall back to
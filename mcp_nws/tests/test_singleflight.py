@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from mcp_nws.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    executions = 0
+
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    results = await asyncio.gather(*(flight.do("boston", fetch) for _ in range(10)))
+    assert all(r == {"ok": True} for r in results)
+    assert executions == 1
+    assert flight.stats() == {"calls": 10, "executions": 1, "coalesced": 9, "inflight": 0}
+    # Once finished, the next call goes upstream again
+    await flight.do("boston", fetch)
+    assert executions == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancellation_is_isolated():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return 42
+
+    impatient = asyncio.ensure_future(flight.do("s", slow))
+    patient = asyncio.ensure_future(flight.do("s", slow))
+    await asyncio.sleep(0)
+    impatient.cancel()
+    assert await patient == 42
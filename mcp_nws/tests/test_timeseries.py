@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+import numpy as np
+from fastapi.testclient import TestClient
+from mcp_nws.governor import UpstreamOverloaded
+from mcp_nws.main import app
+from mcp_nws.mcp_schema import MCPTimeSeriesResponse
+from mcp_nws.timeseries import daily, decode_layer, duration_hours
+
+START = datetime(2026, 10, 18, 0, tzinfo=timezone.utc)
+TEMPERATURE = {
+    "uom": "wmoUnit:degC",
+    "values": [
+        {"validTime": "2026-10-17T22:00:00+00:00/PT3H", "value": 10.0},
+        {"validTime": "2026-10-18T01:00:00+00:00/PT1H", "value": 0.0},
+        {"validTime": "2026-10-18T04:00:00+00:00/P1DT2H", "value": 20.0},
+    ],
+}
+
+
+def test_duration_hours():
+    assert duration_hours("PT3H") == 3
+    assert duration_hours("P1D") == 24
+    assert duration_hours("P1DT6H") == 30
+
+
+def test_decode_layer_expands_intervals_and_converts_units():
+    values, unit = decode_layer(TEMPERATURE, START, 6)
+    assert unit == "F"
+    # 22:00/PT3H covers 00:00 only; 02:00-03:00 have no data
+    np.testing.assert_allclose(values, [50.0, 32.0, np.nan, np.nan, 68.0, 68.0])
+
+
+def test_accumulations_are_spread_over_their_hours():
+    layer = {"uom": "wmoUnit:mm", "values": [{"validTime": "2026-10-18T00:00:00+00:00/PT2H", "value": 25.4}]}
+    values, unit = decode_layer(layer, START, 2, "quantitativePrecipitation")
+    assert unit == "in"
+    np.testing.assert_allclose(values, [0.5, 0.5])
+
+
+def test_daily_aggregates_by_local_day():
+    series = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0])
+    # 00:00-05:00 UTC is 20:00-01:00 in New York: four hours on the 17th, two on the 18th
+    result = daily(series, START, ZoneInfo("America/New_York"), accumulated=True)
+    assert result["date"] == ["2026-10-17", "2026-10-18"]
+    assert result["min"] == [1.0, 5.0]
+    assert result["max"] == [4.0, 6.0]
+    assert result["mean"] == [2.33, 5.5]
+    assert result["sum"] == [7.0, 11.0]
+
+
+def test_hourly_resource():
+    client = TestClient(app)
+    with patch('mcp_nws.main.get_points', return_value={"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76, "timeZone": "America/New_York"}}), \
+         patch('mcp_nws.main.get_gridpoint', return_value={"properties": {"temperature": TEMPERATURE}}):
+        resp = client.get("/resources/nws-hourly?lat=42.36&lon=-71.06&layers=temperature,skyCover&hours=24&aggregate=daily")
+    data = resp.json()
+    assert data["status"] == "ok"
+    assert data["time_zone"] == "America/New_York"
+    assert data["units"] == {"temperature": "F"}
+    assert len(data["series"]["temperature"]) == 24
+    assert set(data["daily"]["temperature"]) == {"date", "min", "max", "mean"}
+
+
+def test_hourly_overloaded_uses_the_time_series_envelope():
+    client = TestClient(app)
+    with patch('mcp_nws.main.get_points', side_effect=UpstreamOverloaded("api.weather.gov", 2.5)):
+        resp = client.get("/resources/nws-hourly?lat=42.36&lon=-71.06")
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "3"
+    data = resp.json()
+    assert set(data) == set(MCPTimeSeriesResponse.model_fields)
+    assert data["status"] == "error" and "retry after 3 seconds" in data["message"]
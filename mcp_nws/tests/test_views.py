@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from mcp_nws.main import app
+from mcp_nws.views import parse_fields, project_fields, shape_response
+
+client = TestClient(app)
+
+PERIOD = {
+    "number": 1,
+    "name": "Tonight",
+    "startTime": "2026-10-18T18:00:00-04:00",
+    "endTime": "2026-10-19T06:00:00-04:00",
+    "isDaytime": False,
+    "temperature": 48,
+    "temperatureUnit": "F",
+    "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": 30},
+    "windSpeed": "6 mph",
+    "windDirection": "W",
+    "icon": "https://api.weather.gov/icons/land/night/bkn?size=medium",
+    "shortForecast": "Mostly Cloudy",
+    "detailedForecast": "Mostly cloudy, with a low around 48. West wind around 6 mph.",
+}
+FORECAST = {"updateTime": "2026-10-18T12:00:00+00:00", "elevation": {"value": 3.9}, "periods": [PERIOD]}
+CURRENT = {
+    "timestamp": "2026-10-18T17:54:00+00:00",
+    "textDescription": "Clear",
+    "temperature": {"unitCode": "wmoUnit:degC", "value": 10.0},
+    "windSpeed": {"unitCode": "wmoUnit:km_h-1", "value": 16.09},
+    "relativeHumidity": {"unitCode": "wmoUnit:percent", "value": 55.0},
+}
+
+
+def test_compact_and_summary_views():
+    current, forecast = shape_response("compact", None, CURRENT, FORECAST)
+    assert forecast["periods"][0]["precipitation"] == 30
+    assert forecast["periods"][0]["wind"] == "6 mph W"
+    assert "detailedForecast" not in forecast["periods"][0]
+    assert current["temperature"] == 50.0
+    assert current["wind_speed"] == 10.0
+    current, forecast = shape_response("summary", None, CURRENT, FORECAST)
+    assert set(forecast["periods"][0]) == {"name", "temperature", "precipitation", "shortForecast"}
+    assert set(current) == {"timestamp", "description", "temperature"}
+
+
+def test_field_projection():
+    assert parse_fields("forecast.updateTime, periods.name,current") == {
+        "current": [""], "forecast": ["updateTime", "periods.name"]
+    }
+    assert project_fields(FORECAST, ["periods.name", "periods.temperature"]) == {
+        "periods": [{"name": "Tonight", "temperature": 48}]
+    }
+    current, forecast = shape_response("full", "periods.shortForecast", CURRENT, FORECAST)
+    assert current == {}
+    assert forecast == {"periods": [{"shortForecast": "Mostly Cloudy"}]}
+
+
+def test_view_query_parameter():
+    with patch('mcp_nws.main.get_points', return_value={"properties": {"gridId": "BOX", "gridX": 70, "gridY": 76}}), \
+         patch('mcp_nws.main.get_forecast', return_value={"properties": FORECAST}), \
+         patch('mcp_nws.main.get_current_weather', return_value={"properties": CURRENT}):
+        resp = client.get("/resources/nws-weather?lat=42.36&lon=-71.06&view=summary&fields=periods.name")
+        assert resp.status_code == 200
+        assert resp.json()["forecast"] == {"periods": [{"name": "Tonight"}]}
+        assert client.get("/resources/nws-weather?lat=42.36&lon=-71.06&view=tiny").status_code == 422
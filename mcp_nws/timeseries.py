@@ -0,0 +1,178 @@
+"""Hourly series decoded from NWS raw gridpoint data.
+
+``/gridpoints/{wfo}/{x},{y}`` returns each weather element as a list of
+``{"validTime": "2026-10-18T06:00:00+00:00/PT3H", "value": 12.2}`` entries,
+one per run of hours with the same value. ``decode_layer`` expands those runs
+onto a regular hourly axis with NumPy (no per-hour Python loop), converts
+units and leaves hours without data as NaN. ``daily`` reduces an hourly
+series to min/max/mean (and sum, for accumulations) per local day.
+"""
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_nws.cache import MISSING, LRUCache
+from mcp_nws.config import env_int
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the hourly resources
+    np = None
+
+DEFAULT_LAYERS = ("temperature", "probabilityOfPrecipitation", "windSpeed")
+# Values are amounts over the whole interval, so they are spread evenly across its hours
+ACCUMULATED = {"quantitativePrecipitation", "snowfallAmount", "iceAccumulation"}
+MAX_HOURS = 168
+
+# uom suffix -> (converted unit, scale, offset)
+CONVERSIONS = {
+    "degC": ("F", 9 / 5, 32.0),
+    "km_h-1": ("mph", 0.621371, 0.0),
+    "mm": ("in", 1 / 25.4, 0.0),
+    "m": ("mi", 1 / 1609.344, 0.0),
+    "percent": ("%", 1.0, 0.0),
+    "degree_(angle)": ("deg", 1.0, 0.0),
+}
+
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+def duration_hours(text: str) -> int:
+    """Whole hours in an ISO-8601 duration such as 'PT3H', 'P1D' or 'P1DT6H'."""
+    match = _DURATION.match(text)
+    if not match:
+        raise ValueError(f"Unsupported duration: {text}")
+    days, hours, minutes = (int(g or 0) for g in match.groups())
+    return days * 24 + hours + (1 if minutes else 0)
+
+
+def _intervals(values: List[Dict[str, Any]]):
+    """validTime strings -> (start epoch hours, length in hours, values) arrays."""
+    starts = []
+    texts = []
+    for item in values:
+        start, _, duration = item["validTime"].partition("/")
+        starts.append(start)
+        texts.append(duration)
+    # Gridpoint times are UTC ('+00:00'); datetime64 wants them without the offset
+    stamps = np.array([s[:19] for s in starts], dtype="datetime64[h]")
+    offsets = np.array([_offset_hours(s[19:]) for s in starts], dtype=np.int64)
+    # A layer uses only a handful of distinct durations, so parse each once
+    unique, inverse = np.unique(np.array(texts), return_inverse=True)
+    lengths = np.array([duration_hours(t) for t in unique], dtype=np.int64)[inverse]
+    data = np.array([item.get("value") for item in values], dtype=float)
+    return stamps.astype(np.int64) - offsets, lengths, data
+
+
+def _offset_hours(suffix: str) -> int:
+    if not suffix or suffix == "Z":
+        return 0
+    sign = -1 if suffix[0] == "-" else 1
+    return sign * int(suffix[1:3])
+
+
+def decode_layer(layer: Dict[str, Any], start: datetime, hours: int, name: str = "") -> Tuple[Any, str]:
+    """Expand one gridpoint layer onto ``hours`` hourly slots from ``start`` (UTC).
+
+    Returns (float array with NaN for missing hours, unit).
+    """
+    if np is None:
+        raise RuntimeError("hourly series require numpy")
+    unit_code = (layer.get("uom") or "").split(":")[-1]
+    unit, scale, offset = CONVERSIONS.get(unit_code, (unit_code, 1.0, 0.0))
+    out = np.full(hours, np.nan)
+    values = layer.get("values") or []
+    if not values:
+        return out, unit
+    starts, lengths, data = _intervals(values)
+    if name in ACCUMULATED:
+        data = data / np.maximum(lengths, 1)
+    base = int(np.datetime64(start.astimezone(timezone.utc).replace(tzinfo=None), "h").astype(np.int64))
+    # One slot per covered hour: repeat each run's start and value, then add 0..length-1
+    total = int(lengths.sum())
+    run_starts = np.repeat(starts - base, lengths)
+    steps = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    slots = run_starts + steps
+    slot_values = np.repeat(data, lengths)
+    inside = (slots >= 0) & (slots < hours)
+    out[slots[inside]] = slot_values[inside] * scale + offset
+    return out, unit
+
+
+def daily(series, start: datetime, tz: tzinfo, accumulated: bool = False) -> Dict[str, List[Any]]:
+    """Min/max/mean (and sum for accumulations) per local date of an hourly series."""
+    hours = len(series)
+    first = start.astimezone(tz)
+    last = (start + timedelta(hours=hours - 1)).astimezone(tz)
+    if first.utcoffset() == last.utcoffset():
+        local = np.arange(hours) + int(first.utcoffset().total_seconds() // 3600)
+    else:
+        # The series crosses a DST change: take each hour's own offset
+        local = np.array([
+            i + int((start + timedelta(hours=i)).astimezone(tz).utcoffset().total_seconds() // 3600) for i in range(hours)
+        ])
+    base_hour = start.astimezone(timezone.utc).hour
+    day = (local + base_hour) // 24
+    # Hours are in order, so each day is one contiguous run
+    bounds = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    present = ~np.isnan(series)
+    counts = np.add.reduceat(present.astype(np.int64), bounds)
+    sums = np.add.reduceat(np.where(present, series, 0.0), bounds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = {
+            "date": [(first.date() + timedelta(days=int(d - day[0]))).isoformat() for d in day[bounds]],
+            "min": _to_list(np.fmin.reduceat(series, bounds)),
+            "max": _to_list(np.fmax.reduceat(series, bounds)),
+            "mean": _to_list(np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)),
+        }
+    if accumulated:
+        result["sum"] = _to_list(np.where(counts > 0, sums, np.nan))
+    return result
+
+
+def _to_list(values) -> List[Optional[float]]:
+    """JSON-ready list: rounded, with NaN as null."""
+    rounded = np.round(values, 2).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+
+# Decoded series keyed by the identity of the gridpoint properties the HTTP
+# cache hands out, plus the requested window and layers
+_decoded = LRUCache(maxsize=env_int("MCP_NWS_SERIES_CACHE_SIZE", 256))
+
+
+def hourly_series(
+    properties: Dict[str, Any],
+    layers: List[str],
+    start: datetime,
+    hours: int,
+    tz: tzinfo,
+    aggregate: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Decode ``layers`` into JSON-ready hourly lists and optional daily aggregates."""
+    key = (id(properties), tuple(layers), start, hours, str(tz), aggregate)
+    cached = _decoded.get(key)
+    if cached is not MISSING and cached[0] is properties:
+        return cached[1]
+    series: Dict[str, Any] = {}
+    units: Dict[str, str] = {}
+    days: Dict[str, Any] = {}
+    for name in layers:
+        layer = properties.get(name)
+        if not isinstance(layer, dict):
+            continue
+        values, units[name] = decode_layer(layer, start, hours, name)
+        series[name] = _to_list(values)
+        if aggregate == "daily":
+            days[name] = daily(values, start, tz, accumulated=name in ACCUMULATED)
+    result = {
+        "start": start.isoformat(),
+        "step": "PT1H",
+        "hours": hours,
+        "units": units,
+        "series": series,
+        "daily": days,
+    }
+    _decoded.set(key, (properties, result))
+    return result
@@ -0,0 +1,140 @@
+"""Response shaping: compact/summary views and field projection.
+
+The raw NWS forecast and observation properties are large (geometry,
+elevation, quality-control flags, long detailed text); most consumers only
+need a handful of fields per period.
+"""
+from typing import Any, Dict, List, Optional
+
+VIEWS = ("full", "compact", "summary")
+
+
+def _value(quantity: Any) -> Any:
+    """Unwrap an NWS quantitative value ({"unitCode": ..., "value": ...})."""
+    return quantity.get("value") if isinstance(quantity, dict) else quantity
+
+
+def _convert(quantity: Any) -> Optional[float]:
+    """NWS observation quantity converted to the response units (F, mph, mi, inHg)."""
+    value = _value(quantity)
+    if value is None or not isinstance(quantity, dict):
+        return value
+    unit = quantity.get("unitCode", "")
+    if unit.endswith("degC"):
+        return round(value * 9 / 5 + 32, 1)
+    if unit.endswith("km_h-1"):
+        return round(value * 0.621371, 1)
+    if unit.endswith(":m") and not unit.endswith("degm"):
+        return round(value / 1609.344, 2)
+    if unit.endswith(":Pa"):
+        return round(value / 3386.389, 2)
+    return value
+
+
+def compact_period(period: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": period.get("name"),
+        "startTime": period.get("startTime"),
+        "endTime": period.get("endTime"),
+        "isDaytime": period.get("isDaytime"),
+        "temperature": period.get("temperature"),
+        "precipitation": _value(period.get("probabilityOfPrecipitation")),
+        "wind": f"{period.get('windSpeed', '')} {period.get('windDirection', '')}".strip(),
+        "shortForecast": period.get("shortForecast"),
+    }
+
+
+def summary_period(period: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": period.get("name"),
+        "temperature": period.get("temperature"),
+        "precipitation": _value(period.get("probabilityOfPrecipitation")),
+        "shortForecast": period.get("shortForecast"),
+    }
+
+
+def compact_current(current: Dict[str, Any]) -> Dict[str, Any]:
+    if not current:
+        return {}
+    return {
+        "timestamp": current.get("timestamp"),
+        "description": current.get("textDescription"),
+        "temperature": _convert(current.get("temperature")),
+        "dewpoint": _convert(current.get("dewpoint")),
+        "humidity": _convert(current.get("relativeHumidity")),
+        "wind_speed": _convert(current.get("windSpeed")),
+        "wind_direction": _convert(current.get("windDirection")),
+        "visibility": _convert(current.get("visibility")),
+    }
+
+
+def apply_view(view: str, current: Dict[str, Any], forecast: Dict[str, Any]):
+    """Return (current, forecast) reshaped for the requested view."""
+    if view == "full":
+        return current, forecast
+    shape = compact_period if view == "compact" else summary_period
+    shaped_forecast = {
+        "updateTime": forecast.get("updateTime"),
+        "periods": [shape(p) for p in forecast.get("periods", [])],
+    } if forecast else {}
+    shaped_current = compact_current(current)
+    if view == "summary" and shaped_current:
+        shaped_current = {k: shaped_current[k] for k in ("timestamp", "description", "temperature")}
+    return shaped_current, shaped_forecast
+
+
+def _field_tree(paths: List[str]) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _select(data: Any, tree: Dict[str, Any]) -> Any:
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [_select(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: _select(data[key], sub) for key, sub in tree.items() if key in data}
+    return data
+
+
+def parse_fields(fields: Optional[str]) -> Dict[str, List[str]]:
+    """Split 'forecast.periods.name,current.temperature,periods.temperature' per section.
+
+    Paths without a 'current.' or 'forecast.' prefix apply to the forecast.
+    """
+    sections: Dict[str, List[str]] = {"current": [], "forecast": []}
+    for path in (fields or "").split(","):
+        path = path.strip()
+        if not path:
+            continue
+        section, _, rest = path.partition(".")
+        if section in sections and rest:
+            sections[section].append(rest)
+        elif section in sections:
+            sections[section].append("")
+        else:
+            sections["forecast"].append(path)
+    return sections
+
+
+def project_fields(data: Dict[str, Any], paths: List[str]) -> Dict[str, Any]:
+    """Keep only the dotted paths in ``data``; lists are projected element-wise."""
+    if not paths or "" in paths:
+        return data
+    return _select(data, _field_tree(paths))
+
+
+def shape_response(view: str, fields: Optional[str], current: Dict[str, Any], forecast: Dict[str, Any]):
+    """Apply the view, then any field projection. Returns (current, forecast)."""
+    current, forecast = apply_view(view, current, forecast)
+    if fields:
+        sections = parse_fields(fields)
+        # A section with no requested paths is dropped entirely
+        current = project_fields(current, sections["current"]) if sections["current"] else {}
+        forecast = project_fields(forecast, sections["forecast"]) if sections["forecast"] else {}
+    return current, forecast
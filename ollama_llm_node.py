@@ -1,5 +1,8 @@
+import logging
 import ollama
 
+logger = logging.getLogger(__name__)
+
 def ollama_llm_node(state):
     """
     LangGraph node for calling the local Llama 3.2 model via Ollama.
@@ -34,7 +37,7 @@ def ollama_llm_node(state):
                 raw_output = str(parsed)
         except Exception:
             pass  # If not JSON, leave as is
-    print("[DEBUG] LLM raw output:", raw_output)
+    logger.debug("LLM raw output: %s", raw_output)
     state = dict(state)
     state["output"] = output
     return state
@@ -1,22 +1,87 @@
+import time
+
+RERUN_START = time.perf_counter()
+
+import logging
+import os
+import threading
 import streamlit as st
 from langgraph.graph import StateGraph, END
-from langgraph_nodes import ollama_llm_node, llm_router_node, weather_tool_node
+from langgraph_nodes import intent_router_node, ollama_client, ollama_llm_node, llm_router_node, warm_up_model, weather_tool_node
+import weather_tools
+from answer_cache import answer_cache
 from typing import TypedDict, Any
 
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger(__name__)
+
 # --- State schema ---
 class ChatState(TypedDict, total=False):
     input: str
+    messages: list
     system_prompt: str
     output: str
     tool_args: dict
+    tool_calls: list
     weather_result: Any
+    answer_key: str
+    answer_cached: bool
+    preamble: str
 
 # --- Load system prompt ---
 def load_system_prompt():
     with open("chatbot_system_prompt.md", "r", encoding="utf-8") as f:
         return f.read()
 
-system_prompt = load_system_prompt()
+# --- LangGraph workflow ---
+def build_graph():
+    graph = StateGraph(state_schema=ChatState)
+    graph.add_node("intent", intent_router_node)
+    graph.add_node("llm", ollama_llm_node)
+    graph.add_node("router", llm_router_node)
+    graph.add_node("get_weather", weather_tool_node)
+
+    # Recognized questions go straight to the weather tool; the rest start with the LLM
+    graph.add_conditional_edges("intent", lambda state: state["next"])
+    graph.add_edge("llm", "router")
+    graph.add_conditional_edges("router", lambda state: state["next"])
+    # A cached answer for the same question and forecast ends the run without a second LLM call
+    graph.add_conditional_edges("get_weather", lambda state: END if state.get("answer_cached") else "llm")
+    graph.set_entry_point("intent")
+    return graph.compile()
+
+# Load the model and open the weather backend in the background at startup (WARM_UP=0 to skip)
+WARM_UP = os.environ.get("WARM_UP", "1") != "0"
+
+
+class Runtime:
+    """Process-wide resources shared by every session and rerun."""
+
+    def __init__(self):
+        start = time.perf_counter()
+        self.system_prompt = load_system_prompt()
+        self.graph = build_graph()
+        self.ollama = ollama_client()
+        self.weather_backend = weather_tools.backend()
+        self.timings = {"startup_ms": (time.perf_counter() - start) * 1000}
+        logger.info("runtime ready in %.0f ms (weather backend: %s)", self.timings["startup_ms"], self.weather_backend)
+
+    def warm_up(self):
+        start = time.perf_counter()
+        try:
+            weather_tools.warm_up()
+            self.timings["weather_warm_up_ms"] = (time.perf_counter() - start) * 1000
+            self.timings["model_warm_up_ms"] = warm_up_model() * 1000
+        except Exception as e:
+            logger.warning("warm-up failed: %s", e)
+
+
+@st.cache_resource(show_spinner=False)
+def get_runtime():
+    runtime = Runtime()
+    if WARM_UP:
+        threading.Thread(target=runtime.warm_up, name="warm-up", daemon=True).start()
+    return runtime
 
 # --- Streamlit page config ---
 st.set_page_config(
@@ -30,6 +95,10 @@ st.set_page_config(
 st.title("☁️ Weather Chatbot (Llama 3.2 + MCP)")
 st.caption("Ask about the weather anywhere in the US. Powered by local Llama 3 via Ollama, and your MCP server.")
 
+runtime = get_runtime()
+system_prompt = runtime.system_prompt
+chat_graph = runtime.graph
+
 # --- Ensure chat history is initialized ---
 if "messages" not in st.session_state:
     st.session_state["messages"] = []
@@ -37,44 +106,71 @@ if "messages" not in st.session_state:
 for msg in st.session_state["messages"]:
     st.chat_message(msg["role"]).write(msg["content"])
 
-# --- LangGraph workflow ---
-graph = StateGraph(state_schema=ChatState)
-graph.add_node("llm", ollama_llm_node)
-graph.add_node("router", llm_router_node)
-graph.add_node("get_weather", weather_tool_node)
+# Render the answer token by token as the graph streams it (LLM_STREAM=0 waits for the whole answer)
+STREAM_RESPONSES = os.environ.get("LLM_STREAM", "1") != "0"
+
+
+def answer_tokens(state, final):
+    """Yield answer tokens from the streaming graph; the final state is copied into ``final``."""
+    for mode, chunk in chat_graph.stream(state, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            token = chunk.get("token") if isinstance(chunk, dict) else None
+            if token:
+                yield token
+        else:
+            final.clear()
+            final.update(chunk)
 
-graph.add_edge("llm", "router")
-graph.add_conditional_edges("router", lambda state: state["next"])
-graph.add_edge("get_weather", "llm")
-graph.set_entry_point("llm")
-chat_graph = graph.compile()
 
 # --- User input ---
 if prompt := st.chat_input("Ask me about the weather..."):
     st.session_state["messages"].append({"role": "user", "content": prompt})
     st.chat_message("user").write(prompt)
+    shown = False
+    # The assistant's bubble; an answer that was not streamed (e.g. a cached one) is written into it
+    bubble = None
     try:
-        with st.spinner("Llama 3.2 is thinking..."):
-            state = {"input": prompt, "system_prompt": system_prompt}
-            print("[DEBUG] Invoking chat_graph with state:", state["input"])
-            try:
-                result = chat_graph.invoke(state)
-                print("[DEBUG] chat_graph result:", result["output"])
-            except Exception as e:
-                st.error(f"[ERROR] Workflow execution failed: {e}")
-                st.session_state["messages"].append({"role": "assistant", "content": "Sorry, something went wrong while processing your request. Please try again."})
-                st.chat_message("assistant").write("Sorry, something went wrong while processing your request. Please try again.")
-                raise
-            response = result.get("output", "")
-            if not response:
-                st.warning("No response generated by the assistant.")
-                response = "Sorry, I couldn't generate a response. Please try again."
+        # A copy of the session history (ending with this prompt): the nodes append to it
+        state = {"input": prompt, "system_prompt": system_prompt, "messages": list(st.session_state["messages"])}
+        logger.debug("invoking chat_graph: %d chars", len(state["input"]))
+        try:
+            if STREAM_RESPONSES:
+                result = {}
+                bubble = st.chat_message("assistant").empty()
+                with bubble.container():
+                    shown = bool(st.write_stream(answer_tokens(state, result)))
+            else:
+                with st.spinner("Llama 3.2 is thinking..."):
+                    result = chat_graph.invoke(state)
+            logger.debug("chat_graph result: %d chars", len(result.get("output", "")))
+        except Exception as e:
+            st.error(f"[ERROR] Workflow execution failed: {e}")
+            st.session_state["messages"].append({"role": "assistant", "content": "Sorry, something went wrong while processing your request. Please try again."})
+            (bubble or st.chat_message("assistant")).write("Sorry, something went wrong while processing your request. Please try again.")
+            raise
+        response = result.get("output", "")
+        if not response:
+            st.warning("No response generated by the assistant.")
+            response = "Sorry, I couldn't generate a response. Please try again."
+            shown = False
     except Exception as e:
         st.error(f"[ERROR] Unexpected error: {e}")
         response = "Sorry, an unexpected error occurred. Please try again."
+        shown = False
     st.session_state["messages"].append({"role": "assistant", "content": response})
-    st.chat_message("assistant").write(response)
+    if not shown:
+        (bubble or st.chat_message("assistant")).write(response)
 
 
 # --- Dark mode note ---
 st.markdown("<style>body { background-color: #18191A !important; color: #fff !important; }</style>", unsafe_allow_html=True)
+
+# --- Timings ---
+rerun_ms = (time.perf_counter() - RERUN_START) * 1000
+logger.info("rerun: %.0f ms", rerun_ms)
+with st.sidebar.expander("Timings"):
+    st.caption(f"Last rerun: {rerun_ms:.0f} ms")
+    for name, value in runtime.timings.items():
+        st.caption(f"{name.replace('_ms', '').replace('_', ' ').capitalize()}: {value:.0f} ms")
+    cache = answer_cache.stats()
+    st.caption(f"Answer cache: {cache['hit_rate']:.0%} hit rate ({cache['hits']} hits, {cache['size']} answers)")
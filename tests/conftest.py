@@ -0,0 +1,5 @@
+import os
+
+# As in mcp_nws/tests: the in-process weather backend imports mcp_nws, whose
+# persistent stores must stay out of the developer's ~/.cache/mcp_nws.
+os.environ["MCP_NWS_CACHE_DIR"] = ""
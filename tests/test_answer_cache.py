@@ -0,0 +1,73 @@
+import time
+from datetime import datetime, timedelta, timezone
+from answer_cache import AnswerCache, answer_key, normalize_question
+from mcp_nws import periods
+
+EDT = timezone(timedelta(hours=-4))
+
+
+def result(update_time="2026-10-18T12:00:00+00:00", observed="2026-10-18T13:00:00+00:00", **extra):
+    return {
+        "status": "ok",
+        "lat": 42.3601,
+        "lon": -71.0589,
+        "forecast": {
+            "updateTime": update_time,
+            "periods": [{"name": "Tonight", "startTime": "2026-10-18T18:00:00-04:00", "isDaytime": False}],
+        },
+        "current": {"timestamp": observed},
+        **extra,
+    }
+
+
+def test_normalize_question():
+    assert normalize_question("  Weather in BOSTON, MA?? ") == "weather in boston ma"
+
+
+def test_key_ignores_case_punctuation_and_argument_spelling():
+    key = answer_key("Weather in Boston?", [{"location": "Boston"}], [result()])
+    assert key == answer_key("weather in boston", [{"location": "boston, ma"}], [result()])
+    assert key != answer_key("weather in Denver", [{"location": "Boston"}], [result()])
+
+
+def test_key_changes_with_fresher_data():
+    key = answer_key("weather in boston", [{"location": "Boston"}], [result()])
+    assert key != answer_key("weather in boston", [{"location": "Boston"}], [result(update_time="2026-10-18T15:00:00+00:00")])
+    assert key != answer_key("weather in boston", [{"location": "Boston"}], [result(observed="2026-10-18T14:00:00+00:00")])
+
+
+def test_key_uses_the_resolved_date():
+    tomorrow = (datetime.now(EDT).date() + timedelta(days=1)).isoformat()
+    assert answer_key("q", [{"location": "Boston", "date": "Tomorrow"}], [result()]) == answer_key(
+        "q", [{"location": "Boston", "date": tomorrow}], [result()]
+    )
+    assert answer_key("q", [{"location": "Boston", "date": "tomorrow"}], [result()]) != answer_key(
+        "q", [{"location": "Boston", "date": "tomorrow", "days": "2"}], [result()]
+    )
+
+
+def test_key_leaves_the_shared_period_index_alone():
+    before = len(periods._indexes)
+    for _ in range(5):
+        answer_key("q", [{"location": "Boston", "date": "tomorrow"}], [result()])
+    assert len(periods._indexes) == before
+
+
+def test_no_key_without_a_usable_result():
+    assert answer_key("q", [{"location": "Boston"}], [{"status": "error", "message": "Location not found"}]) is None
+    assert answer_key("q", [{"location": "Boston"}], [result(update_time=None)]) is None
+    assert answer_key("q", [], []) is None
+
+
+def test_cache_ttl_lru_and_hit_rate():
+    cache = AnswerCache(maxsize=2, ttl=0.05)
+    cache.set("a", "answer a")
+    assert cache.get("a") == "answer a"
+    assert cache.get("b") is None
+    cache.set("b", "answer b")
+    cache.set("c", "answer c")
+    assert cache.get("a") is None  # least recently used, evicted
+    time.sleep(0.06)
+    assert cache.get("c") is None  # expired
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 0.25
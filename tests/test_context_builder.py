@@ -0,0 +1,79 @@
+from context_builder import build_context, estimate_tokens, message_tokens, weather_context, weather_digest
+
+RESULT = {
+    "status": "ok",
+    "resolved_city": "Boston",
+    "resolved_state": "MA",
+    "lat": 42.3601,
+    "lon": -71.0589,
+    "forecast": {
+        "updateTime": "2026-10-18T12:00:00+00:00",
+        "periods": [
+            {"name": f"Period {i}", "temperature": 60 + i, "temperatureUnit": "F", "shortForecast": "Sunny"}
+            for i in range(12)
+        ],
+    },
+}
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 4
+    assert estimate_tokens('{"a": 1}') == 7
+
+
+def test_weather_digest_is_short_and_capped():
+    digest = weather_digest(RESULT)
+    assert digest.startswith("Weather for Boston, MA (42.36,-71.06):")
+    assert "- Period 0: 60F, Sunny" in digest
+    assert "Period 8" not in digest and "4 later periods omitted" in digest
+    assert weather_digest({"status": "error", "location": "Nowhere", "message": "Location not found"}) == (
+        "Weather lookup for Nowhere failed: Location not found"
+    )
+    assert weather_context([RESULT, RESULT]).count("Weather for Boston") == 2
+
+
+def test_weather_result_is_deduplicated_against_history():
+    digest = weather_digest(RESULT)
+    history = [
+        {"role": "user", "content": "weather in Boston?"},
+        {"role": "system", "content": digest},
+        {"role": "assistant", "content": "Sunny."},
+        {"role": "user", "content": "and tomorrow?"},
+    ]
+    messages = build_context("sys", history, RESULT)
+    assert [m["content"] for m in messages].count(digest) == 1
+    # The latest copy is the one kept
+    assert messages[-1]["content"] == digest
+
+
+def test_history_is_trimmed_to_the_budget_with_a_recap():
+    history = []
+    for i in range(30):
+        history.append({"role": "user", "content": f"question number {i} about the weather in some town"})
+        history.append({"role": "assistant", "content": "A fairly long answer about the weather there. " * 5})
+    messages = build_context("You are WeatherBot.", history, budget=400)
+    assert sum(message_tokens(m) for m in messages) <= 400
+    assert messages[0] == {"role": "system", "content": "You are WeatherBot."}
+    assert messages[1]["content"].startswith("Earlier in this conversation the user asked: ")
+    assert messages[-1] == history[-1]
+    # The recap ends with the newest question that was dropped
+    dropped = history[:history.index(messages[2])]
+    last_dropped = [m["content"] for m in dropped if m["role"] == "user"][-1]
+    assert messages[1]["content"].endswith(last_dropped)
+
+
+def test_newest_message_is_kept_over_budget():
+    history = [{"role": "user", "content": "old question"}, {"role": "user", "content": "word " * 500}]
+    messages = build_context("sys", history, budget=50)
+    assert messages[-1] == history[-1]
+    assert history[0] not in messages
+
+
+def test_history_within_budget_is_untouched():
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello", "extra": 1}, "junk"]
+    assert build_context("sys", history) == [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
@@ -0,0 +1,69 @@
+from datetime import date
+import pytest
+import intent
+from intent import extract_intent
+
+TODAY = date(2026, 10, 18)  # a Sunday
+
+
+@pytest.fixture(autouse=True)
+def no_gazetteer(monkeypatch):
+    monkeypatch.setattr(intent, "get_gazetteer", lambda: None)
+
+
+@pytest.mark.parametrize("question, call", [
+    ("What's the weather in Boston, MA?", {"location": "Boston, MA"}),
+    ("weather in boston ma please", {"location": "Boston, MA"}),
+    ("Forecast for Denver, Colorado on Monday", {"location": "Denver, CO", "date": "monday"}),
+    ("What is the forecast for tomorrow in Boston MA?", {"location": "Boston, MA", "date": "tomorrow"}),
+    ("How is the weather in Boston, MA at night?", {"location": "Boston, MA", "date": "today", "daypart": "night"}),
+    ("Is it hot in Phoenix AZ in the afternoon?", {"location": "Phoenix, AZ", "date": "today", "daypart": "day"}),
+    ("Will it rain in Seattle, WA tomorrow night?", {"location": "Seattle, WA", "date": "tomorrow", "daypart": "night"}),
+    ("weather in Chicago, IL next Monday", {"location": "Chicago, IL", "date": "2026-10-26"}),
+    ("weather in Chicago IL this weekend", {"location": "Chicago, IL", "date": "saturday", "days": "2"}),
+    ("will it rain in 02139 tomorrow", {"location": "02139", "date": "tomorrow"}),
+    ("weather at 42.36, -71.06 tonight", {"lat": "42.36", "lon": "-71.06", "date": "today", "daypart": "night"}),
+    ("temperature in St. Louis, MO on 2026-10-20", {"location": "St. Louis, MO", "date": "2026-10-20"}),
+])
+def test_confident_calls(question, call):
+    found = extract_intent(question, TODAY)
+    assert found.confident, found
+    assert found.calls == [call]
+
+
+@pytest.mark.parametrize("question, reason", [
+    ("How windy is it at the beach today?", "no single place"),
+    ("Is it cold in my area?", "no single place"),
+    ("What is the weather near me?", "no single place"),
+    ("umbrella at work tomorrow", "no single place"),
+    ("cold at home tonight", "no single place"),
+    ("hot for you today", "no single place"),
+    ("forecast in LA", "rules"),
+    ("What's the weather in Boston?", "rules"),
+    ("weather in Boston and Denver", "needs the LLM"),
+    ("What was the weather yesterday in Boston?", "needs the LLM"),
+    ("Tell me a joke about Boston", "no weather wording"),
+    ("", "empty"),
+])
+def test_left_to_the_llm(question, reason):
+    found = extract_intent(question, TODAY)
+    assert not found.confident and found.reason == reason
+
+
+def test_unconfirmed_place_is_left_to_the_llm():
+    found = extract_intent("weather in New Port Richey", TODAY)
+    assert found.calls == [{"location": "New Port Richey"}] and not found.confident
+    assert extract_intent("forecast in LA", TODAY).confidence == 0.0
+
+
+def test_gazetteer_confirms_places(monkeypatch):
+    class Gazetteer:
+        def exact(self, query):
+            return {"city": query} if query in ("New Port Richey", "Boston", "La") else None
+
+    monkeypatch.setattr(intent, "get_gazetteer", Gazetteer)
+    assert extract_intent("weather in New Port Richey", TODAY).confident
+    assert extract_intent("weather in Boston", TODAY).calls == [{"location": "Boston"}]
+    assert extract_intent("weather in Boston", TODAY).confident
+    assert not extract_intent("forecast in LA", TODAY).confident
+    assert not extract_intent("weather in Atlantis", TODAY).confident
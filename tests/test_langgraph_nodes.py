@@ -0,0 +1,146 @@
+import threading
+import pytest
+
+pytest.importorskip("ollama")
+import langgraph_nodes as n  # noqa: E402
+
+
+def stream(filter_, chunks):
+    return "".join(filter_.feed(chunk) for chunk in chunks) + filter_.flush()
+
+
+@pytest.mark.parametrize("output, calls", [
+    ("<<CALL_WEATHER location=Boston date=tomorrow>>", [{"location": "Boston", "date": "tomorrow"}]),
+    ("<<CALL_WEATHER lat=42.36 lon=-71.06>>\n<<CALL_WEATHER location=Denver>>",
+     [{"lat": "42.36", "lon": "-71.06"}, {"location": "Denver"}]),
+    ("<<CALL_WEATHER location=Boston>> <<CALL_WEATHER location=Boston>>", [{"location": "Boston"}]),
+    ("It will be sunny in Boston.", []),
+    ("<<CALL_WEATHER location=Boston", []),
+])
+def test_parse_tool_calls(output, calls):
+    assert n.parse_tool_calls(output) == calls
+
+
+@pytest.mark.parametrize("chunks, shown", [
+    (["Sunny and ", "mild."], "Sunny and mild."),
+    (["a < b and x<<y"], "a < b and x<<y"),
+    # A turn that only calls the tool shows nothing, however the tag is split
+    (["<<CALL_WEATHER location=Boston>>"], ""),
+    (["  <", "<CA", "LL_WEA", "THER location=Bos", "ton>", ">"], ""),
+    (["<<CALL_WEATHER location=Boston>>", " Let me check."], ""),
+    # Text before a call is shown, the markup is not
+    (["Checking. <<CALL_", "WEATHER location=Boston>", "> done"], "Checking.  done"),
+    (["Ends with <<CA"], "Ends with <<CA"),
+])
+def test_tool_markup_filter(chunks, shown):
+    assert stream(n.ToolMarkupFilter(), chunks) == shown
+
+
+class FakeClient:
+    """Stands in for ollama.Client: each chat call streams the next scripted turn."""
+
+    def __init__(self, *turns):
+        self.turns = list(turns)
+        self.calls = []
+
+    def chat(self, model, messages, stream=False, keep_alive=None):
+        self.calls.append(messages)
+        chunks = self.turns.pop(0)
+        if stream:
+            return ({"message": {"content": chunk}} for chunk in chunks)
+        return {"message": {"content": "".join(chunks)}}
+
+    def generate(self, model, prompt, keep_alive=None):
+        self.generated = (model, prompt, keep_alive)
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    tokens = []
+    monkeypatch.setattr(n, "_stream_writer", lambda: lambda chunk: tokens.append(chunk["token"]))
+    monkeypatch.setattr(n, "LLM_STREAM", True)
+    return tokens
+
+
+def test_streamed_answer_matches_output(monkeypatch, streaming):
+    monkeypatch.setattr(n, "_client", FakeClient(["<<CALL_WEATHER ", "location=Boston>>", "\nOne moment."]))
+    state = n.ollama_llm_node({"input": "weather in Boston?", "system_prompt": "sys"})
+    assert streaming == [] and n.llm_router_node(state)["next"] == "get_weather"
+
+    n._client.turns.append(["Sunny, ", "high of 70."])
+    state = n.ollama_llm_node(state)
+    assert state["output"] == "".join(streaming) == "Sunny, high of 70."
+
+
+def test_preamble_before_a_tool_call_leads_the_answer(monkeypatch, streaming):
+    monkeypatch.setattr(n, "_client", FakeClient(["Let me check. ", "<<CALL_WEATHER location=Boston>>"], ["Sunny."]))
+    state = n.ollama_llm_node({"input": "weather in Boston?", "system_prompt": "sys"})
+    state = n.ollama_llm_node(state)
+    assert state["output"] == "".join(streaming) == "Let me check. Sunny."
+
+
+def test_session_history_reaches_the_model(monkeypatch):
+    monkeypatch.setattr(n, "_client", FakeClient(["Cooler."]))
+    monkeypatch.setattr(n, "LLM_STREAM", False)
+    history = [
+        {"role": "user", "content": "weather in Boston?"},
+        {"role": "assistant", "content": "Sunny."},
+        {"role": "user", "content": "and tomorrow?"},
+    ]
+    state = n.ollama_llm_node({"input": "and tomorrow?", "system_prompt": "sys", "messages": list(history)})
+    assert n._client.calls[0][1:] == history
+    assert state["messages"][-1] == {"role": "assistant", "content": "Cooler."}
+
+
+def test_tool_results_follow_the_question_without_history(monkeypatch, streaming):
+    monkeypatch.setattr(n, "_client", FakeClient(["<<CALL_WEATHER location=Boston>>"], ["Sunny."]))
+    monkeypatch.setattr(n, "get_weather", lambda **args: {"status": "ok"})
+    state = n.ollama_llm_node({"input": "weather in Boston?", "system_prompt": "sys"})
+    state = n.weather_tool_node({**state, "tool_calls": n.parse_tool_calls(state["output"])})
+    n.ollama_llm_node(state)
+    assert n._client.calls[1][1] == {"role": "user", "content": "weather in Boston?"}
+
+
+def test_concurrent_tool_calls_keep_order_and_isolate_failures(monkeypatch):
+    started = threading.Barrier(2, timeout=5)
+
+    def get_weather(location=None, lat=None, lon=None, date=None, days=None, daypart=None):
+        started.wait()  # both calls are in flight at once
+        if location == "Atlantis":
+            raise RuntimeError("no such place")
+        return {"status": "ok", "location": location}
+
+    monkeypatch.setattr(n, "get_weather", get_weather)
+    state = n.weather_tool_node({"input": "Boston or Atlantis?", "tool_calls": [
+        {"location": "Atlantis"}, {"location": "Boston", "city": "Boston"},
+    ]})
+    assert state["weather_result"] == [
+        {"status": "error", "message": "no such place"},
+        {"status": "ok", "location": "Boston"},
+    ]
+    assert not state["answer_cached"]
+
+
+def test_warm_up_model_loads_with_keep_alive(monkeypatch):
+    monkeypatch.setattr(n, "_client", FakeClient())
+    assert n.warm_up_model() >= 0
+    assert n._client.generated == (n.OLLAMA_MODEL, "", n.OLLAMA_KEEP_ALIVE)
+
+
+def test_ollama_client_is_shared(monkeypatch):
+    monkeypatch.setattr(n, "_client", None)
+    assert n.ollama_client() is n.ollama_client()
+
+
+def test_calls_keep_the_model_loaded(monkeypatch):
+    calls = []
+
+    class Client(FakeClient):
+        def chat(self, model, messages, stream=False, keep_alive=None):
+            calls.append((model, keep_alive))
+            return super().chat(model, messages, stream, keep_alive)
+
+    monkeypatch.setattr(n, "_client", Client(["Sunny."]))
+    monkeypatch.setattr(n, "LLM_STREAM", False)
+    assert n.ollama_llm_node({"input": "hi", "system_prompt": "sys"})["output"] == "Sunny."
+    assert calls == [(n.OLLAMA_MODEL, n.OLLAMA_KEEP_ALIVE)]
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import pytest
+import weather_tools
+
+FORECAST = {"periods": [{"name": "Tonight", "temperature": 50}], "updateTime": "2026-10-18T12:00:00+00:00"}
+
+
+@pytest.fixture
+def inprocess(monkeypatch):
+    """The in-process backend with mcp_nws.main.fetch_weather replaced by ``calls``' fake."""
+    import mcp_nws.main
+    calls = {"result": {"status": "ok", "forecast": FORECAST}, "delay": 0.0, "cancelled": threading.Event()}
+
+    async def fetch_weather(location, lat, lon, date, days, daypart):
+        calls["args"] = (location, lat, lon, date, days, daypart)
+        try:
+            await asyncio.sleep(calls["delay"])
+        except asyncio.CancelledError:
+            calls["cancelled"].set()
+            raise
+        return calls["result"]
+
+    monkeypatch.setattr(mcp_nws.main, "fetch_weather", fetch_weather)
+    monkeypatch.setattr(weather_tools, "_backend", "inprocess")
+    return calls
+
+
+def test_request_paths_and_params():
+    assert weather_tools._request("Boston, MA", None, None, "today", None, None) == (
+        "/resources/nws-weather-by-name", {"location": "Boston, MA", "date": "today"}
+    )
+    assert weather_tools._request(None, 42.36, -71.06, None, 3, "day") == (
+        "/resources/nws-weather", {"lat": 42.36, "lon": -71.06, "days": 3, "daypart": "day"}
+    )
+    assert weather_tools._request(None, 42.36, None, None, None, None) is None
+
+
+def test_missing_location_is_an_error_copy():
+    result = weather_tools.get_weather()
+    assert result == weather_tools.NO_LOCATION and result is not weather_tools.NO_LOCATION
+
+
+def test_inprocess_result_does_not_share_cached_objects(inprocess):
+    result = weather_tools.get_weather(lat="42.36", lon="-71.06", days="2")
+    assert inprocess["args"] == (None, 42.36, -71.06, None, 2, None)
+    assert result == {"status": "ok", "forecast": FORECAST}
+    result["forecast"]["periods"].clear()
+    assert FORECAST["periods"]
+
+
+def test_inprocess_rejects_non_numeric_arguments(inprocess):
+    assert weather_tools.get_weather(lat="north", lon="-71.06")["status"] == "error"
+
+
+@pytest.mark.parametrize("args", [{"days": "0"}, {"days": 15}, {"daypart": "evening"}])
+def test_inprocess_rejects_what_the_endpoints_reject(inprocess, args):
+    assert weather_tools.get_weather(location="Boston", **args)["status"] == "error"
+    assert "args" not in inprocess
+
+
+def test_inprocess_timeout_cancels_the_call(inprocess, monkeypatch):
+    monkeypatch.setattr(weather_tools, "WEATHER_TIMEOUT", 0.05)
+    inprocess["delay"] = 5
+    assert weather_tools.get_weather(location="Boston")["status"] == "error"
+    assert inprocess["cancelled"].wait(1)
+
+
+@pytest.mark.asyncio
+async def test_async_inprocess(inprocess):
+    result = await weather_tools.aget_weather(location="Boston", date="tomorrow")
+    assert inprocess["args"] == ("Boston", None, None, "tomorrow", None, None)
+    assert result["forecast"] == FORECAST
+
+
+def test_http_backend_uses_the_pooled_session(monkeypatch):
+    class Response:
+        status_code = 200
+        content = b"{}"
+
+        def json(self):
+            return {"status": "ok"}
+
+    class Session:
+        def get(self, url, params, timeout):
+            self.request = (url, params)
+            return Response()
+
+    session = Session()
+    monkeypatch.setattr(weather_tools, "_backend", "http")
+    monkeypatch.setattr(weather_tools, "_http_session", lambda: session)
+    assert weather_tools.get_weather(location="Boston") == {"status": "ok"}
+    assert session.request == (weather_tools.MCP_SERVER_URL + "/resources/nws-weather-by-name", {"location": "Boston"})
+
+
+def test_http_backend_reports_failures(monkeypatch):
+    class Session:
+        def get(self, url, params, timeout):
+            raise ConnectionError("refused")
+
+    monkeypatch.setattr(weather_tools, "_backend", "http")
+    monkeypatch.setattr(weather_tools, "_http_session", lambda: Session())
+    assert weather_tools.get_weather(location="Boston") == {"status": "error", "message": "refused"}
+
+
+def test_unknown_backend_falls_back_to_http(monkeypatch):
+    monkeypatch.setattr(weather_tools, "_backend", None)
+    monkeypatch.setattr(weather_tools, "WEATHER_BACKEND", "grpc")
+    assert weather_tools.backend() == "http"
+
+
+def test_auto_backend_prefers_inprocess(monkeypatch):
+    monkeypatch.setattr(weather_tools, "_backend", None)
+    monkeypatch.setattr(weather_tools, "WEATHER_BACKEND", "auto")
+    assert weather_tools.backend() == "inprocess"
+
+
+def test_warm_up_opens_the_http_session(monkeypatch):
+    opened = []
+    monkeypatch.setattr(weather_tools, "_backend", "http")
+    monkeypatch.setattr(weather_tools, "_http_session", lambda: opened.append(True))
+    weather_tools.warm_up()
+    assert opened
+
+
+def test_warm_up_starts_the_inprocess_client(monkeypatch):
+    from mcp_nws import nws_client
+    started = []
+    monkeypatch.setattr(weather_tools, "_backend", "inprocess")
+    monkeypatch.setattr(nws_client, "get_client", lambda: started.append(asyncio.get_running_loop()))
+    weather_tools.warm_up()
+    assert started == [weather_tools._event_loop()]
@@ -1,23 +1,179 @@
-def get_weather(location: str = None, lat: float = None, lon: float = None, date: str = None):
-    """Call the MCP server to get weather data by name or coordinates."""
-    import requests
-    print(f"[DEBUG][Tool] get_weather called with location={location}, lat={lat}, lon={lon}, date={date}")
+"""The ``get_weather`` tool used by the chatbot graph.
+
+``WEATHER_BACKEND`` selects how the MCP weather resources are reached:
+
+- ``http`` (default): GET the MCP server at ``MCP_SERVER_URL`` over a pooled
+  ``requests.Session`` (keep-alive).
+- ``inprocess``: call the ``mcp_nws`` resource logic directly, sharing its
+  caches, request coalescing and pooled upstream client. The work runs on one
+  private event loop thread so sync and async callers share the same client.
+- ``auto``: ``inprocess`` when ``mcp_nws`` and its dependencies import,
+  otherwise ``http``.
+
+``get_weather`` is for sync graph nodes; ``aget_weather`` is the async variant.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+WEATHER_BACKEND = os.environ.get("WEATHER_BACKEND", "http").strip().lower()
+MCP_SERVER_URL = os.environ.get("MCP_SERVER_URL", "http://localhost:8000").rstrip("/")
+WEATHER_TIMEOUT = float(os.environ.get("WEATHER_TIMEOUT", "10"))
+WEATHER_POOL_SIZE = int(os.environ.get("WEATHER_POOL_SIZE", "10"))
+
+NO_LOCATION = {"status": "error", "message": "Must provide location name or lat/lon."}
+
+_lock = threading.Lock()
+_backend = None
+_session = None
+_loop = None
+
+
+def backend() -> str:
+    """The backend in use, resolving ``auto`` on first call."""
+    global _backend
+    if _backend is None:
+        choice = WEATHER_BACKEND
+        if choice not in ("auto", "inprocess", "http"):
+            logger.warning("Unknown WEATHER_BACKEND=%s; using http", choice)
+            choice = "http"
+        if choice == "auto":
+            try:
+                import mcp_nws.main  # noqa: F401
+                choice = "inprocess"
+            except ImportError as e:
+                logger.info("mcp_nws not importable (%s); using the HTTP backend", e)
+                choice = "http"
+        logger.info("get_weather backend: %s", choice)
+        _backend = choice
+    return _backend
+
+
+def warm_up():
+    """Ready the backend before the first question: the pooled session, or the event loop thread and upstream client."""
+    if backend() == "http":
+        _http_session()
+        return
+    from mcp_nws import nws_client
+
+    async def start():
+        nws_client.get_client()
+
+    asyncio.run_coroutine_threadsafe(start(), _event_loop()).result(timeout=WEATHER_TIMEOUT)
+
+
+def _request(location, lat, lon, date, days, daypart):
+    """(resource path, query params) for a call, or None without a location."""
     if location:
         params = {"location": location}
-        if date:
-            params["date"] = date
-        url = "http://localhost:8000/resources/nws-weather-by-name"
+        path = "/resources/nws-weather-by-name"
     elif lat is not None and lon is not None:
         params = {"lat": lat, "lon": lon}
-        if date:
-            params["date"] = date
-        url = "http://localhost:8000/resources/nws-weather"
+        path = "/resources/nws-weather"
     else:
-        return {"status": "error", "message": "Must provide location name or lat/lon."}
+        return None
+    for name, value in (("date", date), ("days", days), ("daypart", daypart)):
+        if value:
+            params[name] = value
+    return path, params
+
+
+def _http_session():
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=WEATHER_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def _get_http(path: str, params: dict) -> dict:
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        print(f"[DEBUG][Tool] MCP server response: {resp.text}")
+        resp = _http_session().get(MCP_SERVER_URL + path, params=params, timeout=WEATHER_TIMEOUT)
+        logger.debug("MCP server response: %d %d bytes", resp.status_code, len(resp.content))
         return resp.json()
     except Exception as e:
-        print(f"[ERROR][Tool] MCP call failed: {e}")
+        logger.error("MCP call failed: %s", e)
         return {"status": "error", "message": str(e)}
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """The private loop the in-process backend runs on, started on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="weather-tools-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+async def _inprocess(location, lat, lon, date, days, daypart) -> dict:
+    from mcp_nws.encoding import dumps
+    from mcp_nws.main import fetch_weather
+    from mcp_nws.periods import MAX_DAYS
+    try:
+        lat = float(lat) if lat is not None else None
+        lon = float(lon) if lon is not None else None
+        days = int(days) if days else None
+    except (TypeError, ValueError):
+        return {"status": "error", "message": "lat, lon and days must be numbers."}
+    # The checks the HTTP endpoints' query validation makes
+    if days is not None and not 1 <= days <= MAX_DAYS:
+        return {"status": "error", "message": f"days must be between 1 and {MAX_DAYS}."}
+    if daypart and daypart not in ("day", "night"):
+        return {"status": "error", "message": "daypart must be 'day' or 'night'."}
+    result = await fetch_weather(location, lat, lon, date, days, daypart or None)
+    # A JSON round trip, as over HTTP: the forecast and observation bodies are
+    # the server's cached objects and must not be handed out for mutation
+    return json.loads(dumps(result))
+
+
+def _submit(location, lat, lon, date, days, daypart):
+    return asyncio.run_coroutine_threadsafe(_inprocess(location, lat, lon, date, days, daypart), _event_loop())
+
+
+def get_weather(
+    location: str = None, lat: float = None, lon: float = None, date: str = None, days: int = None, daypart: str = None
+):
+    """Get weather data by name or coordinates from the configured backend."""
+    logger.debug("get_weather location=%s lat=%s lon=%s date=%s days=%s daypart=%s", location, lat, lon, date, days, daypart)
+    request = _request(location, lat, lon, date, days, daypart)
+    if request is None:
+        return dict(NO_LOCATION)
+    if backend() == "http":
+        return _get_http(*request)
+    future = _submit(location, lat, lon, date, days, daypart)
+    try:
+        return future.result(timeout=WEATHER_TIMEOUT)
+    except Exception as e:
+        future.cancel()  # don't leave a timed-out call running on the loop
+        logger.error("In-process weather call failed: %s", e)
+        return {"status": "error", "message": str(e) or type(e).__name__}
+
+
+async def aget_weather(
+    location: str = None, lat: float = None, lon: float = None, date: str = None, days: int = None, daypart: str = None
+):
+    """Async variant of ``get_weather`` for async graph nodes."""
+    logger.debug("aget_weather location=%s lat=%s lon=%s date=%s days=%s daypart=%s", location, lat, lon, date, days, daypart)
+    request = _request(location, lat, lon, date, days, daypart)
+    if request is None:
+        return dict(NO_LOCATION)
+    if backend() == "http":
+        return await asyncio.to_thread(_get_http, *request)
+    try:
+        future = asyncio.wrap_future(_submit(location, lat, lon, date, days, daypart))
+        return await asyncio.wait_for(future, WEATHER_TIMEOUT)
+    except Exception as e:
+        logger.error("In-process weather call failed: %s", e)
+        return {"status": "error", "message": str(e) or type(e).__name__}